@@ -0,0 +1,158 @@
+"""
+Measure dynamic chain build time and Maya command count against chain length.
+
+Three builds are compared on a fresh scene per run: the original per-element expression
+build (objExists/createNode/isConnected/connectAttr/setAttr for every element), the batched
+expression build and the batched dynamicChainNode build. The batched builds apply their
+plan with one dynamicChainApplyPlan command, so their command count stays flat and the
+planned count is the number of DG modifier operations. Needs Maya's interpreter:
+
+    mayapy nr_dynamicChain/benchmarks/chain_build.py --lengths 10 50 100 500
+
+Without Maya only the planned operation counts of the batched builds are printed.
+"""
+import argparse
+import os
+import sys
+import time as clock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dynamic_chain_core
+
+TRANSFORM = "rotate"
+AXES = ["X", "Y", "Z"]
+
+
+class CountingCommands(object):
+    """
+    Forward every maya.cmds call and count it.
+    """
+
+    def __init__(self, commands):
+        self.commands = commands
+        self.count = 0
+
+    def __getattr__(self, name):
+        command = getattr(self.commands, name)
+
+        def call(*args, **kwargs):
+            self.count += 1
+            return command(*args, **kwargs)
+        return call
+
+
+def legacy_build(cmds, chain_elements, transform, axes):
+    """
+    The per-element expression build the tool used before plans, kept as the reference.
+    """
+    def create_or_get_node(node_type, node_name):
+        if not cmds.objExists(node_name):
+            return cmds.createNode(node_type, name=node_name)
+        return node_name
+
+    prefix = chain_elements[0].replace("|", "_")
+    expression = ""
+    for attr, default in (("Delay", 2.0), ("Amplitude", 1.0)):
+        if not cmds.attributeQuery(attr, node=chain_elements[0], exists=True):
+            cmds.addAttr(chain_elements[0], longName=attr, attributeType='double', defaultValue=default, keyable=True)
+
+    inverse_md_node = create_or_get_node('multDoubleLinear', f'{prefix}_inverse_md')
+    if not cmds.isConnected(f"{chain_elements[0]}.Delay", f"{inverse_md_node}.input1"):
+        cmds.connectAttr(f"{chain_elements[0]}.Delay", f"{inverse_md_node}.input1")
+    cmds.setAttr(f"{inverse_md_node}.input2", -1.0)
+
+    for index, element in enumerate(chain_elements):
+        if index != 0:
+            delay_md_node = create_or_get_node('multDoubleLinear', f"{prefix}_{element}_delay_md")
+            if not cmds.isConnected(f"{inverse_md_node}.output", f"{delay_md_node}.input1"):
+                cmds.connectAttr(f"{inverse_md_node}.output", f"{delay_md_node}.input1")
+            cmds.setAttr(f"{delay_md_node}.input2", index)
+
+            time_ad_node = create_or_get_node('addDoubleLinear', f"{prefix}_{element}_time_ad")
+            if not cmds.isConnected(f"{delay_md_node}.output", f"{time_ad_node}.input1"):
+                cmds.connectAttr(f"{delay_md_node}.output", f"{time_ad_node}.input1")
+            if not cmds.isConnected("time1.outTime", f"{time_ad_node}.input2"):
+                cmds.connectAttr("time1.outTime", f"{time_ad_node}.input2")
+
+            for axis in axes:
+                expression += f"{element}.{transform}{axis} = `getAttr - time ({time_ad_node}.output) {chain_elements[0]}.{transform}{axis}` * {chain_elements[0]}.Amplitude;\n"
+
+    cmds.expression(name=f'{prefix}_dynamicChain_EXP', string=expression)
+
+
+def plan_commands(plan):
+    """
+    Return the number of DG modifier operations a plan queues on a fresh scene.
+    """
+    return len(plan.nodes) + len(plan.connections) + len(plan.values) + (1 if plan.expression else 0)
+
+
+def print_plans(lengths):
+    print(f"{'length':>8}{'expression plan':>18}{'node plan':>12}")
+    for length in lengths:
+        chain = [f"joint{index}" for index in range(1, length + 1)]
+        expression = plan_commands(dynamic_chain_core.expression_chain_plan(chain, TRANSFORM, AXES))
+        node = plan_commands(dynamic_chain_core.node_chain_plan(chain, TRANSFORM, AXES))
+        print(f"{length:>8}{expression:>18,}{node:>12,}")
+
+
+def build_scene(cmds, length):
+    """
+    Create a fresh scene with an animated chain of `length` joints and return their names.
+    """
+    cmds.file(new=True, force=True)
+    chain = []
+    cmds.select(clear=True)
+    for index in range(length):
+        chain.append(cmds.joint(name=f"chain{index}", position=(index, 0, 0)))
+    for frame, value in ((1, 0.0), (12, 40.0), (24, 0.0)):
+        for axis in AXES:
+            cmds.setKeyframe(chain[0], attribute=f"{TRANSFORM}{axis}", time=frame, value=value)
+    return chain
+
+
+def run_maya(lengths):
+    import maya.cmds as cmds
+    import dynamic_chain_build
+
+    print(f"{'length':>8}{'build':>12}{'commands':>10}{'ms':>10}")
+    for length in lengths:
+        for name in ("legacy", "expression", "node"):
+            chain = build_scene(cmds, length)
+            counter = CountingCommands(cmds)
+            start = clock.perf_counter()
+            if name == "legacy":
+                legacy_build(counter, chain, TRANSFORM, AXES)
+            else:
+                dynamic_chain_build.cmds = counter
+                try:
+                    mode = dynamic_chain_core.BUILD_NODE if name == "node" else dynamic_chain_core.BUILD_EXPRESSION
+                    dynamic_chain_build.build_dynamic_chain(chain, TRANSFORM, AXES, mode)
+                finally:
+                    dynamic_chain_build.cmds = cmds
+            elapsed = clock.perf_counter() - start
+            print(f"{length:>8}{name:>12}{counter.count:>10,}{elapsed * 1000:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lengths", type=int, nargs="+", default=[10, 50, 100, 500], help="chain lengths to build")
+    args = parser.parse_args()
+
+    try:
+        import maya.standalone
+    except ImportError:
+        print("Maya is not available, printing the planned operation counts only.")
+        print_plans(args.lengths)
+        return
+
+    maya.standalone.initialize()
+    try:
+        run_maya(args.lengths)
+    finally:
+        maya.standalone.uninitialize()
+
+
+if __name__ == "__main__":
+    main()
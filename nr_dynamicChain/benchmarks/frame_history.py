@@ -0,0 +1,88 @@
+"""
+Compare delayed sampling of a dynamic chain with and without the FrameHistory ring buffer.
+
+A synthetic source curve stands in for the anim curves the dynamicChainNode samples. The
+direct path evaluates the source once per follower per frame, as the node does with
+cacheHistory off; the history path records the current frame and reads the delayed frames
+back. Runs without Maya:
+
+    python nr_dynamicChain/benchmarks/frame_history.py --followers 100 --frames 240 --delay 2
+"""
+import argparse
+import math
+import os
+import sys
+import time as clock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dynamic_chain_core
+
+
+class SourceCurve(object):
+    """
+    Three-channel source with a per-call cost comparable to a small anim curve evaluation.
+    """
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, frame):
+        self.calls += 1
+        t = frame / 24.0
+        return [30 * math.sin(t * 2.1) + 5 * math.sin(t * 7.3),
+                20 * math.cos(t * 1.7),
+                10 * math.sin(t * 3.1 + 0.5) * math.cos(t * 0.9)]
+
+
+def play_direct(source, frames, followers, delay):
+    results = []
+    for frame in frames:
+        results.append([source(frame - delay * follower) for follower in range(1, followers + 1)])
+    return results
+
+
+def play_history(source, frames, followers, delay):
+    history = dynamic_chain_core.FrameHistory()
+    results = []
+    for frame in frames:
+        history.reserve(delay * followers)
+        history.record(frame, source(frame))
+        results.append([history.sample(frame - delay * follower, source) for follower in range(1, followers + 1)])
+    return results, history
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--followers", type=int, default=100, help="chain elements after the source")
+    parser.add_argument("--frames", type=int, default=240, help="frames played forward")
+    parser.add_argument("--delay", type=float, default=2.0, help="delay in frames between followers")
+    parser.add_argument("--loops", type=int, default=2, help="times the frame range is played")
+    args = parser.parse_args()
+
+    frames = [float(frame) for frame in range(1, args.frames + 1)] * args.loops
+
+    direct_source = SourceCurve()
+    start = clock.perf_counter()
+    expected = play_direct(direct_source, frames, args.followers, args.delay)
+    direct_time = clock.perf_counter() - start
+
+    history_source = SourceCurve()
+    start = clock.perf_counter()
+    actual, history = play_history(history_source, frames, args.followers, args.delay)
+    history_time = clock.perf_counter() - start
+
+    error = max(abs(a - b)
+                for frame_expected, frame_actual in zip(expected, actual)
+                for follower_expected, follower_actual in zip(frame_expected, frame_actual)
+                for a, b in zip(follower_expected, follower_actual))
+    stats = history.stats()
+
+    print(f"{'path':<10}{'source evals':>14}{'ms':>10}{'speedup':>10}")
+    print(f"{'direct':<10}{direct_source.calls:>14,}{direct_time * 1000:>10.1f}{1.0:>9.1f}x")
+    print(f"{'history':<10}{history_source.calls:>14,}{history_time * 1000:>10.1f}{direct_time / history_time:>9.1f}x")
+    print(f"history: {history.capacity} frames, hit rate {stats['hit_rate']:.3f}, max abs difference {error:.3g}")
+
+
+if __name__ == "__main__":
+    main()
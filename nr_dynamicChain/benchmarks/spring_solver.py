@@ -0,0 +1,93 @@
+"""
+Measure what the SpringSolver frame cache saves when scrubbing and after a source edit.
+
+The uncached path re-simulates from the start frame for every lookup, which is what a
+solver without a cache has to do when time moves backwards. The cached path keeps every
+simulated frame; after the source changes at --edit-frame it is cut there instead of
+being thrown away. Runs without Maya:
+
+    python nr_dynamicChain/benchmarks/spring_solver.py --followers 50 --frames 240 --scrubs 200
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time as clock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dynamic_chain_core
+
+CHANNELS = 3
+
+
+def source(edit_frame=None):
+    """
+    Return a three-channel source, offset from `edit_frame` on to stand in for a key edit.
+    """
+    def sample(frame):
+        offset = 5.0 if edit_frame is not None and frame >= edit_frame else 0.0
+        t = frame / 24.0
+        return [30 * math.sin(t * 2.1) + offset, 20 * math.cos(t * 1.7), 10 * math.sin(t * 3.1)]
+    return sample
+
+
+def new_solver(followers):
+    solver = dynamic_chain_core.SpringSolver(0.3, 0.2, 1)
+    solver.configure(0.3, 0.2, 1, followers, CHANNELS)
+    return solver
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--followers", type=int, default=50, help="chain elements after the source")
+    parser.add_argument("--frames", type=int, default=240, help="frames played forward first")
+    parser.add_argument("--scrubs", type=int, default=200, help="random frames looked up afterwards")
+    parser.add_argument("--edit-frame", type=int, default=200, help="frame the source edit starts at")
+    args = parser.parse_args()
+
+    random.seed(1)
+    lookups = list(range(1, args.frames + 1)) + [random.randint(1, args.frames) for _ in range(args.scrubs)]
+
+    # Play and scrub
+    steps = 0
+    start = clock.perf_counter()
+    for frame in lookups:
+        solver = new_solver(args.followers)
+        expected = solver.evaluate(frame, source())
+        steps += solver.steps
+    uncached_time = clock.perf_counter() - start
+    uncached_steps = steps
+
+    cached = new_solver(args.followers)
+    start = clock.perf_counter()
+    for frame in lookups:
+        actual = cached.evaluate(frame, source())
+    cached_time = clock.perf_counter() - start
+    error = max(abs(a - b) for a, b in zip(expected, actual))
+
+    # Edit the source and evaluate the last frame again
+    before = cached.steps
+    start = clock.perf_counter()
+    cached.revalidate(source(args.edit_frame))
+    incremental = cached.evaluate(args.frames, source(args.edit_frame))
+    incremental_time = clock.perf_counter() - start
+    incremental_steps = cached.steps - before
+
+    full = new_solver(args.followers)
+    start = clock.perf_counter()
+    reference = full.evaluate(args.frames, source(args.edit_frame))
+    full_time = clock.perf_counter() - start
+    edit_error = max(abs(a - b) for a, b in zip(reference, incremental))
+
+    print(f"{'case':<26}{'frames simulated':>18}{'ms':>10}")
+    print(f"{'scrub, no cache':<26}{uncached_steps:>18,}{uncached_time * 1000:>10.1f}")
+    print(f"{'scrub, cached':<26}{cached.steps - incremental_steps:>18,}{cached_time * 1000:>10.1f}")
+    print(f"{'edit, full re-simulation':<26}{full.steps:>18,}{full_time * 1000:>10.1f}")
+    print(f"{'edit, from first dirty':<26}{incremental_steps:>18,}{incremental_time * 1000:>10.1f}")
+    print(f"max abs difference: scrub {error:.3g}, edit {edit_error:.3g}")
+
+
+if __name__ == "__main__":
+    main()
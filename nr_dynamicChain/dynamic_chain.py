@@ -3,15 +3,20 @@ from PySide2 import QtWidgets, QtCore
 from shiboken2 import wrapInstance
 import maya.cmds as cmds
 
+from dynamic_chain_core import BUILD_NODE, BUILD_EXPRESSION, BUILD_SPRING
+from dynamic_chain_build import (
+    bake_dynamic_chain,
+    bake_dynamic_chains,
+    build_dynamic_chain,
+    build_dynamic_chains,
+    hierarchy_chains,
+)
+
 # Constants for window dimensions and title
 WINDOW_TITLE = "Dynamic Chain UI"
 MIN_WIDTH = 300
 MIN_HEIGHT = 200
 
-# Constants for attribute names
-DELAY_ATTR = 'Delay'
-AMPLITUDE_ATTR = 'Amplitude'
-
 
 def maya_main_window() -> QtWidgets.QWidget:
     """
@@ -39,6 +44,8 @@ class DynamicChain(QtWidgets.QDialog):
         selected_items (list): List of the names of selected items.
         transform_choice (str): The chosen transformation type ('translate' or 'rotate').
         axis_selection (list): The list of selected axes (X, Y, Z).
+        build_mode (str): BUILD_NODE, BUILD_SPRING or BUILD_EXPRESSION.
+        batch (bool): Whether every selected item is the root of its own chain.
     """
 
     def __init__(self, parent: QtWidgets.QWidget = maya_main_window()):
@@ -57,6 +64,8 @@ class DynamicChain(QtWidgets.QDialog):
         self.selected_items = []  # Stores the names of selected objects
         self.transform_choice = ""  # Stores whether the user selected "translate" or "rotate"
         self.axis_selection = []  # Stores the list of selected axes (e.g., X, Y, Z)
+        self.build_mode = BUILD_NODE  # Stores whether the chain is driven by a node or an expression
+        self.batch = False  # Stores whether each selected item is the root of its own chain
 
         self.create_ui()
 
@@ -79,6 +88,10 @@ class DynamicChain(QtWidgets.QDialog):
         self.note_label = QtWidgets.QLabel("First element is treated as animation source")
         left_layout.addWidget(self.note_label)
 
+        self.batch_cb = QtWidgets.QCheckBox("Batch: each element is a chain root")
+        self.batch_cb.setToolTip("Build one chain per element from its hierarchy, all driven by one shared evaluator")
+        left_layout.addWidget(self.batch_cb)
+
         self.selection_list = QtWidgets.QListWidget()
         self.selection_list.setSelectionMode(QtWidgets.QAbstractItemView.NoSelection)
 
@@ -127,12 +140,50 @@ class DynamicChain(QtWidgets.QDialog):
         self.y_cb.setChecked(True)  # Default to Y checked
         self.z_cb.setChecked(True)  # Default to Z checked
 
+        # Build mode selection (delay node, spring node or expression)
+        build_group = QtWidgets.QGroupBox("Build")
+        build_group.setStyleSheet("font-weight: bold;")
+        build_layout = QtWidgets.QVBoxLayout(build_group)
+        self.node_rb = QtWidgets.QRadioButton("Delay Node")
+        self.spring_rb = QtWidgets.QRadioButton("Spring Node")
+        self.expression_rb = QtWidgets.QRadioButton("Expression")
+        build_layout.addWidget(self.node_rb)
+        build_layout.addWidget(self.spring_rb)
+        build_layout.addWidget(self.expression_rb)
+        right_layout.addWidget(build_group)
+
+        self.node_rb.setChecked(True)  # Default choice is the delay node
+
         self.create_btn = QtWidgets.QPushButton("Create")
         self.create_btn.setStyleSheet("background-color: #32c86e; color: white; font-size: 12px; font-weight: bold;")
         self.create_btn.clicked.connect(self.collect_data)
 
         right_layout.addWidget(self.create_btn)
 
+        # Bake the chain to keyframes over a frame range
+        bake_group = QtWidgets.QGroupBox("Bake")
+        bake_group.setStyleSheet("font-weight: bold;")
+        bake_layout = QtWidgets.QVBoxLayout(bake_group)
+        range_layout = QtWidgets.QHBoxLayout()
+        self.start_sb = QtWidgets.QSpinBox()
+        self.end_sb = QtWidgets.QSpinBox()
+        for spin_box in (self.start_sb, self.end_sb):
+            spin_box.setRange(-100000, 100000)
+            range_layout.addWidget(spin_box)
+        self.start_sb.setValue(int(cmds.playbackOptions(query=True, minTime=True)))
+        self.end_sb.setValue(int(cmds.playbackOptions(query=True, maxTime=True)))
+        self.delete_helpers_cb = QtWidgets.QCheckBox("Delete helper nodes")
+        self.delete_helpers_cb.setChecked(True)
+        bake_layout.addLayout(range_layout)
+        bake_layout.addWidget(self.delete_helpers_cb)
+        right_layout.addWidget(bake_group)
+
+        self.bake_btn = QtWidgets.QPushButton("Bake")
+        self.bake_btn.setStyleSheet("background-color: #32c86e; color: white; font-size: 12px; font-weight: bold;")
+        self.bake_btn.clicked.connect(self.bake_data)
+
+        right_layout.addWidget(self.bake_btn)
+
         # Add the widgets to the splitter
         splitter.addWidget(left_widget)
         splitter.addWidget(right_widget)
@@ -165,111 +216,79 @@ class DynamicChain(QtWidgets.QDialog):
             for obj in selected_objects:
                 self.selection_list.addItem(obj)
 
-    def collect_data(self):
+    def read_settings(self) -> bool:
         """
-        Collect the data from the UI and trigger the dynamic chain creation.
+        Read the selection, transform, axis and build choices from the UI.
 
-        This method checks the user input, verifies that a valid selection exists,
-        and gathers the necessary transformation and axis choices. It then calls 
-        the method to create the dynamic chain.
-
-        Raises:
-            RuntimeError: If no valid selection is made or no axes are selected.
+        Returns:
+            bool: False, after warning the user, if the selection or the axes are missing.
         """
         if self.selection_list.count() == 0 or self.selection_list.item(0).text() == "No selection":
             QtWidgets.QMessageBox.warning(self, "Selection Error", "Please load a valid selection before creating the dynamic chain.")
-            return
+            return False
 
         self.selected_items = [self.selection_list.item(i).text() for i in range(self.selection_list.count())]
         self.transform_choice = "translate" if self.translate_rb.isChecked() else "rotate"
         self.axis_selection = [axis for axis, checkbox in {"X": self.x_cb, "Y": self.y_cb, "Z": self.z_cb}.items() if checkbox.isChecked()]
+        if self.node_rb.isChecked():
+            self.build_mode = BUILD_NODE
+        elif self.spring_rb.isChecked():
+            self.build_mode = BUILD_SPRING
+        else:
+            self.build_mode = BUILD_EXPRESSION
+        self.batch = self.batch_cb.isChecked()
 
         # Ensure that at least one axis is selected before proceeding
         if not self.axis_selection:
             QtWidgets.QMessageBox.warning(self, "Axis Selection Error", "Please select at least one axis for transformation.")
-            return
-
-        self.create_dynamic_chain()
+            return False
+        return True
 
-    def create_or_get_node(self, node_type: str, node_name: str) -> str:
+    def collect_data(self):
         """
-        Create or retrieve a node by name.
-
-        Args:
-            node_type (str): The type of the node to create (e.g., 'multDoubleLinear').
-            node_name (str): The name of the node to create or find.
+        Collect the data from the UI and trigger the dynamic chain creation.
 
-        Returns:
-            str: The name of the node.
+        This method checks the user input, verifies that a valid selection exists,
+        and gathers the necessary transformation and axis choices. It then calls 
+        the method to create the dynamic chain.
         """
-        if not cmds.objExists(node_name):
-            return cmds.createNode(node_type, name=node_name)
-        return node_name
+        if self.read_settings():
+            self.create_dynamic_chain()
 
-    def create_dynamic_chain(self):
+    def bake_data(self):
         """
-        Create the dynamic chain by establishing relationships between the selected nodes.
+        Collect the data from the UI and bake the dynamic chain to keyframes.
 
-        This function establishes connections between nodes based on the chosen 
-        transformation (translate or rotate) and axis selections. The first selected 
-        object is used as the "source" for animation, and other objects in the chain 
-        follow the transformation.
+        The followers get one key per frame of the bake range, computed from the source
+        animation, and optionally lose the nodes and expression that drove them.
         """
-        chain_elements = self.selected_items
-        expression = ""
-
-        if chain_elements:
-            prefix = chain_elements[0].replace("|", "_")
-            inverse_md_node_name = f'{prefix}_inverse_md'
-
-            self.ensure_attributes_exist(chain_elements[0])
-
-            # Create inverse node for delay and amplitude
-            inverse_md_node = self.create_or_get_node('multDoubleLinear', inverse_md_node_name)
-
-            if not cmds.isConnected(f"{chain_elements[0]}.Delay", f"{inverse_md_node}.input1"):
-                cmds.connectAttr(f"{chain_elements[0]}.Delay", f"{inverse_md_node}.input1")
-            cmds.setAttr(f"{inverse_md_node}.input2", -1.0)
-
-        # Create dynamic chain nodes for each element
-        for index, element in enumerate(chain_elements):
-            if index != 0:
-                delay_md_node_name = f"{prefix}_{element}_delay_md"
-                time_ad_node_name = f"{prefix}_{element}_time_ad"
-
-                delay_md_node = self.create_or_get_node('multDoubleLinear', delay_md_node_name)
-                if not cmds.isConnected(f"{inverse_md_node}.output", f"{delay_md_node}.input1"):
-                    cmds.connectAttr(f"{inverse_md_node}.output", f"{delay_md_node}.input1")
-                cmds.setAttr(f"{delay_md_node}.input2", index)
-
-                time_ad_node = self.create_or_get_node('addDoubleLinear', time_ad_node_name)
-                if not cmds.isConnected(f"{delay_md_node}.output", f"{time_ad_node}.input1"):
-                    cmds.connectAttr(f"{delay_md_node}.output", f"{time_ad_node}.input1")
-
-                if not cmds.isConnected("time1.outTime", f"{time_ad_node}.input2"):
-                    cmds.connectAttr("time1.outTime", f"{time_ad_node}.input2")
-
-                for axis in self.axis_selection:
-                    expression += f"{element}.{self.transform_choice}{axis} = `getAttr - time ({time_ad_node}.output) {chain_elements[0]}.{self.transform_choice}{axis}` * {chain_elements[0]}.Amplitude;\n"
+        if not self.read_settings():
+            return
+        if self.end_sb.value() < self.start_sb.value():
+            QtWidgets.QMessageBox.warning(self, "Range Error", "The bake end frame must not be before the start frame.")
+            return
 
-        expression_name = f'{prefix}_dynamicChain_EXP'
-        if cmds.objExists(expression_name):
-            cmds.expression(expression_name, edit=True, string=expression)
+        if self.batch:
+            bake_dynamic_chains(hierarchy_chains(self.selected_items), self.transform_choice, self.axis_selection,
+                                self.start_sb.value(), self.end_sb.value(), self.delete_helpers_cb.isChecked())
         else:
-            cmds.expression(name=expression_name, string=expression)
+            bake_dynamic_chain(self.selected_items, self.transform_choice, self.axis_selection,
+                               self.start_sb.value(), self.end_sb.value(), self.delete_helpers_cb.isChecked())
 
-    def ensure_attributes_exist(self, node_name: str):
+    def create_dynamic_chain(self):
         """
-        Ensures that the Delay and Amplitude attributes exist for the first element.
+        Create the dynamic chain with the chosen build mode.
 
-        Args:
-            node_name (str): The name of the node to check and add attributes if needed.
+        The first selected object is used as the "source" for animation, and other
+        objects in the chain follow the transformation with a growing delay. In batch mode
+        every selected object is the source of its own chain, made of its hierarchy, and
+        all chains share one evaluator. The whole build is a single undo step (see
+        dynamic_chain_build.build_dynamic_chain and build_dynamic_chains).
         """
-        if not cmds.attributeQuery(DELAY_ATTR, node=node_name, exists=True):
-            cmds.addAttr(node_name, longName=DELAY_ATTR, attributeType='double', defaultValue=2.0, keyable=True)
-
-        if not cmds.attributeQuery(AMPLITUDE_ATTR, node=node_name, exists=True):
-            cmds.addAttr(node_name, longName=AMPLITUDE_ATTR, attributeType='double', defaultValue=1.0, keyable=True)
+        if self.batch:
+            build_dynamic_chains(hierarchy_chains(self.selected_items), self.transform_choice, self.axis_selection, self.build_mode)
+        else:
+            build_dynamic_chain(self.selected_items, self.transform_choice, self.axis_selection, self.build_mode)
 
     def clear_selection(self):
         """
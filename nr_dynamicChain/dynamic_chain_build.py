@@ -0,0 +1,451 @@
+import os
+
+import maya.cmds as cmds
+import maya.OpenMaya as om
+
+from dynamic_chain_node import find_anim_curve, find_plug
+
+from dynamic_chain_core import (
+    AMPLITUDE_ATTR,
+    BUILD_NODE,
+    BUILD_SPRING,
+    DELAY_ATTR,
+    NODE_TYPE,
+    PENDING_PLANS,
+    SOLVER_DELAY,
+    SOLVER_SPRING,
+    BuildPlan,
+    bake_chain,
+    bake_spring_chain,
+    bake_window,
+    chain_evaluator,
+    chain_helper_nodes,
+    expression_chain_plan,
+    expression_chains_plan,
+    hierarchy_chain,
+    node_chain_plan,
+    node_chains_plan,
+)
+
+# Base name of the evaluator shared by a batch of chains; each batch gets the first free name
+BATCH_NAME = 'dynamicChains'
+
+# Anim curve type written for each transform when baking
+BAKE_CURVE_TYPES = {'translate': 'animCurveTL', 'rotate': 'animCurveTA'}
+
+# Plugin providing the dynamicChainNode and the dynamicChainApplyPlan command, shipped next to this file
+PLUGIN_NAME = 'dynamic_chain_node'
+
+
+def load_dynamic_chain_plugin():
+    """
+    Load the plugin providing the dynamicChainNode and the plan command if it is not loaded yet.
+
+    The plugin is looked up next to this file first and on MAYA_PLUG_IN_PATH otherwise.
+    """
+    if cmds.pluginInfo(PLUGIN_NAME, query=True, loaded=True):
+        return
+    try:
+        plugin_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), f"{PLUGIN_NAME}.py")
+    except NameError:  # Run from the Script Editor
+        plugin_path = ""
+    cmds.loadPlugin(plugin_path if os.path.exists(plugin_path) else PLUGIN_NAME, quiet=True)
+
+
+def ensure_attributes_exist(node_name: str):
+    """
+    Ensures that the Delay and Amplitude attributes exist for the first element.
+
+    Args:
+        node_name (str): The name of the node to check and add attributes if needed.
+    """
+    if not cmds.attributeQuery(DELAY_ATTR, node=node_name, exists=True):
+        cmds.addAttr(node_name, longName=DELAY_ATTR, attributeType='double', defaultValue=2.0, keyable=True)
+
+    if not cmds.attributeQuery(AMPLITUDE_ATTR, node=node_name, exists=True):
+        cmds.addAttr(node_name, longName=AMPLITUDE_ATTR, attributeType='double', defaultValue=1.0, keyable=True)
+
+
+def existing_connections(nodes: list) -> set:
+    """
+    Return every incoming connection of `nodes` as (source plug, destination plug) pairs.
+
+    One listConnections call covers all the nodes; unit conversion nodes are skipped so the
+    pairs match the plugs a plan connects.
+    """
+    if not nodes:
+        return set()
+    pairs = cmds.listConnections(nodes, source=True, destination=False, connections=True, plugs=True, skipConversionNodes=True) or []
+    return set(zip(pairs[1::2], pairs[0::2]))
+
+
+def element_plugs(plug: str) -> list:
+    """
+    Return every multi element a plug name goes through, e.g. node.chain[0] and
+    node.chain[0].source[1] for node.chain[0].source[1].
+    """
+    return [plug[:index + 1] for index, character in enumerate(plug) if character == "]"]
+
+
+def owned_leftovers(plan, existing: set) -> tuple:
+    """
+    Find what an earlier build left on the owned multis of the plan's existing nodes.
+
+    An element is left over when no planned connection or value uses it. An outgoing
+    connection is left over when it is not planned and the plan does not rewire its
+    destination anyway; connections of removed elements go with them.
+
+    Args:
+        plan (BuildPlan): The plan being applied.
+        existing (set): The plan's nodes that already exist.
+
+    Returns:
+        tuple: (elements to remove, destination plugs to disconnect).
+    """
+    planned = [plug for pair in plan.connections for plug in pair] + [plug for plug, _ in plan.values]
+    used = set(element for plug in planned for element in element_plugs(plug))
+    owned = [multi for multi in plan.owned if multi.split(".")[0] in existing]
+
+    removes = []
+    found = set()
+    for multi in owned:
+        # Nested multis are only queried under elements that exist
+        parent = multi[:multi.rfind("]") + 1]
+        if parent and parent not in found:
+            continue
+        for index in cmds.getAttr(multi, multiIndices=True) or []:
+            element = f"{multi}[{index}]"
+            found.add(element)
+            if element not in used:
+                removes.append(element)
+
+    disconnects = []
+    removed = set(removes)
+    planned_pairs = set(plan.connections)
+    rewired = set(destination for _, destination in plan.connections)
+    for node in set(multi.split(".")[0] for multi in owned):
+        pairs = cmds.listConnections(node, source=False, destination=True, connections=True, plugs=True, skipConversionNodes=True) or []
+        for own, destination in zip(pairs[0::2], pairs[1::2]):
+            if (not any(own.startswith(f"{multi}[") for multi in owned) or (own, destination) in planned_pairs
+                    or destination in rewired or removed.intersection(element_plugs(own))):
+                continue
+            disconnects.append(destination)
+    return removes, disconnects
+
+
+def apply_plan(plan):
+    """
+    Apply a BuildPlan to the scene as a single undoable DG modification.
+
+    Existing nodes and connections are looked up once for the whole plan instead of one
+    objExists/isConnected call per element. The changes the scene is missing go into a
+    second plan that the dynamicChainApplyPlan command applies through one MDGModifier,
+    so a build is one command however many elements it has. Rebuilding into an existing
+    node also removes the elements and follower connections of the previous build that
+    the plan no longer has (see BuildPlan.owned).
+
+    Args:
+        plan (BuildPlan): The plan from node_chain_plan or expression_chain_plan.
+    """
+    load_dynamic_chain_plugin()
+    changes = BuildPlan()
+    changes.deletes = cmds.ls(plan.deletes) if plan.deletes else []
+
+    names = [name for _, name in plan.nodes]
+    existing = set(cmds.ls(names)) if names else set()
+    changes.nodes = [(node_type, name) for node_type, name in plan.nodes if name not in existing]
+
+    # New nodes have no connections yet, so only destinations that already existed are queried
+    destinations = set(plug.split(".")[0] for _, plug in plan.connections)
+    connected = existing_connections([node for node in destinations if node in existing or node not in names])
+    changes.connections = [pair for pair in plan.connections if pair not in connected]
+    changes.removes, changes.disconnects = owned_leftovers(plan, existing)
+    changes.values = list(plan.values)
+    changes.expression = plan.expression
+
+    PENDING_PLANS.append(changes)
+    cmds.dynamicChainApplyPlan()
+
+
+def build_dynamic_chain(chain_elements: list, transform: str, axes: list, build_mode: str = BUILD_NODE):
+    """
+    Build a dynamic chain in one undo step.
+
+    The first element is the animation source; the others follow its transform channels
+    with a delay growing along the chain.
+
+    Args:
+        chain_elements (list): The source followed by the followers.
+        transform (str): 'translate' or 'rotate'.
+        axes (list): Axes to drive, e.g. ['X', 'Y', 'Z'].
+        build_mode (str): BUILD_NODE or BUILD_SPRING for a dynamicChainNode with the delay or
+            spring solver, BUILD_EXPRESSION for the expression.
+    """
+    if build_mode in (BUILD_NODE, BUILD_SPRING):
+        solver = SOLVER_SPRING if build_mode == BUILD_SPRING else SOLVER_DELAY
+        plan = node_chain_plan(chain_elements, transform, axes, solver)
+    else:
+        plan = expression_chain_plan(chain_elements, transform, axes)
+    apply_chain_plan(plan, [chain_elements])
+
+
+def unique_batch_name(base: str = BATCH_NAME) -> str:
+    """
+    Return `base`, or `base` followed by the first free number, so that neither the name
+    nor its _EXP expression exists yet.
+    """
+    name, number = base, 1
+    while cmds.objExists(name) or cmds.objExists(f"{name}_EXP"):
+        name = f"{base}{number}"
+        number += 1
+    return name
+
+
+def build_dynamic_chains(chains: list, transform: str, axes: list, build_mode: str = BUILD_NODE, name: str = None) -> str:
+    """
+    Build many dynamic chains in one pass, all driven by a single evaluator.
+
+    In node mode every chain is an element of one dynamicChainNode, in expression mode all
+    chains share one expression, so the per-frame overhead grows with the total number of
+    elements rather than with the number of chains. Each batch gets its own evaluator, so
+    building a second batch never touches the chains of the first. The whole build is one
+    undo step.
+
+    Args:
+        chains (list): One list per chain: the source followed by the followers.
+        transform (str): 'translate' or 'rotate'.
+        axes (list): Axes to drive, e.g. ['X', 'Y', 'Z'].
+        build_mode (str): BUILD_NODE or BUILD_SPRING for a dynamicChainNode with the delay or
+            spring solver, BUILD_EXPRESSION for the expression.
+        name (str, optional): Name of the shared node; the shared expression is named
+            name + "_EXP". Defaults to the first free BATCH_NAME. Passing the name of an
+            earlier batch rebuilds that batch in place.
+
+    Returns:
+        str: The name of the shared node.
+    """
+    name = name or unique_batch_name()
+    if build_mode in (BUILD_NODE, BUILD_SPRING):
+        solver = SOLVER_SPRING if build_mode == BUILD_SPRING else SOLVER_DELAY
+        plan = node_chains_plan(chains, transform, axes, name, solver)
+    else:
+        plan = expression_chains_plan(chains, transform, axes, f"{name}_EXP")
+    apply_chain_plan(plan, chains)
+    return name
+
+
+def apply_chain_plan(plan, chains: list):
+    """
+    Add the Delay and Amplitude attributes to every chain source and apply the plan, as one undo step.
+    """
+    cmds.undoInfo(openChunk=True, chunkName="dynamicChain")
+    try:
+        for chain_elements in chains:
+            ensure_attributes_exist(chain_elements[0])
+        apply_plan(plan)
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+
+def hierarchy_chains(roots: list) -> list:
+    """
+    Turn each root into a chain made of the root and its hierarchy.
+
+    Only descendants of the root's node type are used (joints below a joint, transforms
+    below a transform) and they are ordered parents first.
+
+    Args:
+        roots (list): The chain roots, e.g. the current selection.
+
+    Returns:
+        list: One list of node names per root.
+    """
+    chains = []
+    for root in roots:
+        root_path = cmds.ls(root, long=True)[0]
+        descendants = cmds.listRelatives(root_path, allDescendents=True, fullPath=True, type=cmds.nodeType(root_path)) or []
+        paths = hierarchy_chain(root_path, descendants)
+        short_names = dict(zip(cmds.ls(paths, long=True), cmds.ls(paths)))
+        chains.append([short_names[path] for path in paths])
+    return chains
+
+
+def ui_unit_converter(plug) -> callable:
+    """
+    Return a function converting values of `plug` from internal to UI units (radians to
+    degrees, centimeters to the scene unit), as getAttr returns them and setAttr takes them.
+    """
+    attribute = plug.attribute()
+    if attribute.hasFn(om.MFn.kUnitAttribute):
+        unit_type = om.MFnUnitAttribute(attribute).unitType()
+        if unit_type == om.MFnUnitAttribute.kAngle:
+            unit = om.MAngle.uiUnit()
+            return lambda value: om.MAngle(value).asUnits(unit)
+        if unit_type == om.MFnUnitAttribute.kDistance:
+            unit = om.MDistance.uiUnit()
+            return lambda value: om.MDistance(value).asUnits(unit)
+    return lambda value: value
+
+
+def sample_plugs(plugs: list, frames: list) -> list:
+    """
+    Return the value of every plug in `plugs` at every frame, in UI units.
+
+    Plugs without an incoming connection are read once. Plugs driven by an anim curve
+    (directly or through unit conversions) are read from the curve with
+    MFnAnimCurve.evaluate, without going through the DG. The rest are pulled through the
+    DG with one MDGContext per frame shared by all of them.
+
+    Args:
+        plugs (list): The plugs to sample, e.g. ['joint1.rotateX', 'joint1.rotateY'].
+        frames (list): The frames to sample at.
+
+    Returns:
+        list: One list of values per plug, one value per frame.
+    """
+    unit = om.MTime.uiUnit()
+    times = [om.MTime(frame, unit) for frame in frames]
+    values = [None] * len(plugs)
+    evaluated = []
+    for index, name in enumerate(plugs):
+        if not cmds.listConnections(name, source=True, destination=False):
+            values[index] = [cmds.getAttr(name)] * len(frames)
+            continue
+        plug = find_plug(name)
+        to_ui = ui_unit_converter(plug)
+        curve, factor = find_anim_curve(plug)
+        if curve is not None:
+            values[index] = [to_ui(curve.evaluate(time) * factor) for time in times]
+        else:
+            evaluated.append((index, plug, to_ui))
+
+    if evaluated:
+        rows = []
+        for time in times:
+            context = om.MDGContext(time)
+            rows.append([to_ui(plug.asDouble(context)) for _, plug, to_ui in evaluated])
+        for column, (index, _, _) in enumerate(evaluated):
+            values[index] = [row[column] for row in rows]
+    return values
+
+
+def bake_dynamic_chain(chain_elements: list, transform: str, axes: list, start: float, end: float, delete_helpers: bool = True, evaluator: str = None) -> list:
+    """
+    Replace a dynamic chain with plain keyframes on every follower, as a single undo step.
+
+    The source channels, Delay and Amplitude are sampled once over the frame range, from
+    their anim curves where they have one (sample_plugs), every
+    follower's curve is computed in one vectorized pass (dynamic_chain_core.bake_chain) and
+    each curve is written with one setAttr on its keys. The followers are then driven by
+    anim curves only. Chains whose evaluator uses the spring solver are simulated with the
+    evaluator's stiffness, damping and start frame instead (bake_spring_chain).
+
+    Args:
+        chain_elements (list): The source followed by the followers.
+        transform (str): 'translate' or 'rotate'.
+        axes (list): Axes to bake, e.g. ['X', 'Y', 'Z'].
+        start (float): First frame to key.
+        end (float): Last frame to key.
+        delete_helpers (bool): Delete the dynamicChainNode, the expression and the
+            _inverse_md/_delay_md/_time_ad nodes of the chain.
+        evaluator (str, optional): The dynamicChainNode driving the chain. Defaults to the
+            chain's own node.
+
+    Returns:
+        list: The created anim curves.
+    """
+    source = chain_elements[0]
+    followers = chain_elements[1:]
+    frames = list(range(int(start), int(end) + 1))
+
+    ensure_attributes_exist(source)
+    delays, amplitudes = sample_plugs([f"{source}.{DELAY_ATTR}", f"{source}.{AMPLITUDE_ATTR}"], frames)
+    evaluator = evaluator or chain_evaluator(chain_elements)
+    solver = SOLVER_DELAY
+    if cmds.objExists(evaluator) and cmds.attributeQuery("solver", node=evaluator, exists=True):
+        solver = cmds.getAttr(f"{evaluator}.solver")
+
+    if solver == SOLVER_SPRING:
+        start_frame = cmds.getAttr(f"{evaluator}.startFrame")
+        first, last = min(start_frame, frames[0]), frames[-1]
+        grid = list(range(first, last + 1))
+        source_values = sample_plugs([f"{source}.{transform}{axis}" for axis in axes], grid)
+        baked = bake_spring_chain(first, source_values, frames, amplitudes, len(followers),
+                                  cmds.getAttr(f"{evaluator}.stiffness"), cmds.getAttr(f"{evaluator}.damping"), start_frame)
+    else:
+        first, last = bake_window(frames, delays, len(followers))
+        grid = list(range(first, last + 1))
+        source_values = sample_plugs([f"{source}.{transform}{axis}" for axis in axes], grid)
+        baked = bake_chain(first, 1.0, source_values, frames, delays, amplitudes, len(followers))
+
+    curves = []
+    cmds.undoInfo(openChunk=True, chunkName="dynamicChainBake")
+    try:
+        if delete_helpers:
+            helpers = cmds.ls(chain_helper_nodes(chain_elements))
+            if helpers:
+                cmds.delete(helpers)
+
+        for element, channels in zip(followers, baked):
+            # Curves are named after the short name, without the DAG path and namespace
+            short_name = element.split('|')[-1].split(':')[-1]
+            for axis, values in zip(axes, channels):
+                curve = cmds.createNode(BAKE_CURVE_TYPES[transform], name=f"{short_name}_{transform}{axis}", skipSelect=True)
+                keys = [item for frame, value in zip(frames, values) for item in (frame, value)]
+                cmds.setAttr(f"{curve}.ktv[0:{len(frames) - 1}]", *keys)
+                cmds.connectAttr(f"{curve}.output", f"{element}.{transform}{axis}", force=True)
+                curves.append(curve)
+
+        if curves:
+            cmds.keyTangent(curves, inTangentType="linear", outTangentType="linear")
+    finally:
+        cmds.undoInfo(closeChunk=True)
+    return curves
+
+
+def source_evaluators(source: str) -> list:
+    """
+    Return the dynamicChainNodes and expressions reading from a chain source.
+    """
+    evaluators = []
+    for node_type in (NODE_TYPE, 'expression'):
+        evaluators += cmds.listConnections(source, source=False, destination=True, type=node_type, skipConversionNodes=True) or []
+    return list(dict.fromkeys(evaluators))
+
+
+def bake_dynamic_chains(chains: list, transform: str, axes: list, start: float, end: float, delete_helpers: bool = True, name: str = None) -> list:
+    """
+    Bake a batch of dynamic chains to keyframes as a single undo step.
+
+    Args:
+        chains (list): One list per chain: the source followed by the followers.
+        transform (str): 'translate' or 'rotate'.
+        axes (list): Axes to bake, e.g. ['X', 'Y', 'Z'].
+        start (float): First frame to key.
+        end (float): Last frame to key.
+        delete_helpers (bool): Also delete every chain's helper nodes, and the shared
+            evaluators once they no longer drive anything.
+        name (str, optional): Name of the shared node the batch was built with. Defaults to
+            the evaluators found reading from each chain source.
+
+    Returns:
+        list: The created anim curves.
+    """
+    curves = []
+    shared = [name, f"{name}_EXP"] if name else []
+    cmds.undoInfo(openChunk=True, chunkName="dynamicChainBake")
+    try:
+        for chain_elements in chains:
+            evaluators = [name] if name else source_evaluators(chain_elements[0])
+            evaluator = next((node for node in evaluators if cmds.objExists(node) and cmds.nodeType(node) == NODE_TYPE), None)
+            shared.extend(evaluators)
+            curves.extend(bake_dynamic_chain(chain_elements, transform, axes, start, end, delete_helpers, evaluator))
+        if delete_helpers:
+            # Chains of the batch that were not baked keep their evaluator
+            unused = [node for node in dict.fromkeys(cmds.ls(shared))
+                      if not cmds.listConnections(f"{node}.output", source=False, destination=True, skipConversionNodes=True)]
+            if unused:
+                cmds.delete(unused)
+    finally:
+        cmds.undoInfo(closeChunk=True)
+    return curves
@@ -0,0 +1,653 @@
+"""
+Maya-free building blocks of the dynamic chain, shared by the plugin, the tool and the benchmarks.
+"""
+import math
+
+# NumPy is optional and imported on first use, see load_numpy
+np = None
+_numpy_checked = False
+
+# Attributes added to the chain source
+DELAY_ATTR = 'Delay'
+AMPLITUDE_ATTR = 'Amplitude'
+
+# Build modes: a dynamicChainNode with the delay or the spring solver, or the original getAttr -time expression
+BUILD_NODE = 'node'
+BUILD_EXPRESSION = 'expression'
+BUILD_SPRING = 'spring'
+
+# Node type provided by the dynamic_chain_node plugin
+NODE_TYPE = 'dynamicChainNode'
+
+# Solvers of the dynamicChainNode: pure time offset, or damped springs along the chain
+SOLVER_DELAY = 0
+SOLVER_SPRING = 1
+
+# Values closer than this are treated as the same sample when checking the history
+HISTORY_TOLERANCE = 1e-6
+
+# Resolved plans queued for the dynamicChainApplyPlan command, see dynamic_chain_node.py
+PENDING_PLANS = []
+
+
+def load_numpy():
+    """
+    Import NumPy on first use and return the module, or None when it is not installed.
+    """
+    global np, _numpy_checked
+    if not _numpy_checked:
+        _numpy_checked = True
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            np = None
+    return np
+
+
+class FrameHistory(object):
+    """
+    Bounded ring buffer of source channel values, one entry per frame on a fixed step.
+
+    Frame index i (frame i * step) lives in slot i % capacity, tagged with i so a stale
+    slot is recognised. Reading a frame is therefore a single list lookup, and delayed
+    samples between two frames are linearly interpolated from their neighbours. Frames
+    missing from the history are produced by a fill callback once and then recorded.
+
+    Attributes:
+        step (float): Distance in frames between two recorded samples.
+        capacity (int): Number of frames the history holds.
+        hits (int): Lookups served from the history.
+        misses (int): Lookups that had to call the fill callback.
+    """
+
+    def __init__(self, capacity=256, step=1.0):
+        if capacity < 2:
+            raise ValueError(f"FrameHistory needs a capacity of at least 2 frames, got {capacity}")
+        if step <= 0:
+            raise ValueError(f"FrameHistory needs a positive step, got {step}")
+        self.step = float(step)
+        self.capacity = int(capacity)
+        self.frames = [None] * self.capacity
+        self.values = [None] * self.capacity
+        self.hits = 0
+        self.misses = 0
+
+    def clear(self):
+        """
+        Forget every recorded frame, e.g. after the source animation changed.
+        """
+        self.frames = [None] * self.capacity
+        self.values = [None] * self.capacity
+
+    def reserve(self, window):
+        """
+        Grow the buffer so it holds at least `window` frames plus the two interpolation neighbours.
+
+        Recorded frames are kept; the buffer never shrinks.
+
+        Args:
+            window (float): The longest delay, in frames, that will be looked up.
+        """
+        capacity = int(math.ceil(abs(window) / self.step)) + 2
+        if capacity <= self.capacity:
+            return
+        frames, values = self.frames, self.values
+        self.capacity = capacity
+        self.frames = [None] * capacity
+        self.values = [None] * capacity
+        for index, value in zip(frames, values):
+            if index is not None:
+                self.frames[index % capacity] = index
+                self.values[index % capacity] = value
+
+    def record(self, frame, values):
+        """
+        Store the source values evaluated at `frame`.
+
+        Off-step frames (sub-frame playback) are not recorded. If the frame is already in the
+        history with different values the source has changed, so the history is cleared first.
+
+        Args:
+            frame (float): The frame the values were evaluated at.
+            values (sequence): One value per channel.
+
+        Returns:
+            bool: True if the values were recorded.
+        """
+        position = frame / self.step
+        index = int(round(position))
+        if abs(position - index) > 1e-6:
+            return False
+        slot = index % self.capacity
+        if self.frames[slot] == index:
+            recorded = self.values[slot]
+            if len(recorded) != len(values) or any(abs(a - b) > HISTORY_TOLERANCE for a, b in zip(recorded, values)):
+                self.clear()
+        self.frames[slot] = index
+        self.values[slot] = list(values)
+        return True
+
+    def frame_values(self, index, fill):
+        """
+        Return the values of frame index `index`, calling fill(frame) and recording the result on a miss.
+        """
+        slot = index % self.capacity
+        if self.frames[slot] == index:
+            self.hits += 1
+            return self.values[slot]
+        self.misses += 1
+        values = list(fill(index * self.step))
+        self.frames[slot] = index
+        self.values[slot] = values
+        return values
+
+    def sample(self, frame, fill):
+        """
+        Return the channel values at `frame`, linearly interpolated between the two closest steps.
+
+        Args:
+            frame (float): The (delayed) frame to sample.
+            fill (callable): fill(frame) -> channel values, used for frames not in the history.
+
+        Returns:
+            list: One value per channel.
+        """
+        position = frame / self.step
+        index = math.floor(position)
+        weight = position - index
+        before = self.frame_values(index, fill)
+        if weight < 1e-9:
+            return before
+        after = self.frame_values(index + 1, fill)
+        return [a + (b - a) * weight for a, b in zip(before, after)]
+
+    def stats(self):
+        """
+        Return the history counters.
+
+        Returns:
+            dict: hits, misses, frames (currently recorded) and hit_rate.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "frames": sum(1 for index in self.frames if index is not None),
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class SpringSolver(object):
+    """
+    Damped spring chain integrated with position Verlet, one step per frame, caching every simulated frame.
+
+    The source anchors the chain: follower 1 springs towards it and follower i towards
+    follower i - 1, which gives the overshoot and settle a pure time offset cannot. Each step is
+
+        x_new = x + (x - x_previous) * (1 - damping) + (target - x) * stiffness
+
+    Frame start_frame + k is simulated from frame start_frame + k - 1, so the state of every
+    simulated frame is kept: scrubbing backwards or replaying reads the cache and only
+    frames past the last cached one are simulated. The source values each step used are
+    kept too, so after an edit the cache is cut at the first frame whose source changed
+    instead of being thrown away.
+
+    The chain is linear in the source, so amplitude is not part of the simulation: callers
+    scale the positions by the amplitude at the frame they read, as the delay solver does,
+    and an animated amplitude keeps the cache.
+
+    Attributes:
+        stiffness (float): Pull towards the target per frame, from 0 to 1.
+        damping (float): Velocity lost per frame, from 0 to 1.
+        start_frame (int): Frame the chain starts at rest on the source.
+        inputs (list): Source values used for each simulated frame.
+        states (list): (positions, previous positions) of each simulated frame, flat
+            follower by follower.
+        steps (int): Number of frames simulated so far.
+    """
+
+    def __init__(self, stiffness=0.3, damping=0.2, start_frame=1):
+        self.stiffness = stiffness
+        self.damping = damping
+        self.start_frame = int(start_frame)
+        self.followers = 0
+        self.channels = 0
+        self.inputs = []
+        self.states = []
+        self.steps = 0
+
+    def configure(self, stiffness, damping, start_frame, followers, channels):
+        """
+        Set the solver parameters; any change invalidates the whole cache.
+        """
+        settings = (stiffness, damping, int(start_frame), followers, channels)
+        if settings != (self.stiffness, self.damping, self.start_frame, self.followers, self.channels):
+            self.stiffness, self.damping, self.start_frame, self.followers, self.channels = settings
+            self.invalidate(self.start_frame)
+
+    def invalidate(self, frame):
+        """
+        Drop the cached frames from `frame` on; earlier frames stay valid.
+        """
+        keep = max(0, int(math.floor(frame)) - self.start_frame)
+        del self.inputs[keep:]
+        del self.states[keep:]
+
+    def record(self, frame, values):
+        """
+        Check the source values evaluated at `frame` against the ones the cache was built with.
+
+        If they differ the source has changed, and the cache is cut at that frame.
+        """
+        index = int(round(frame)) - self.start_frame
+        if abs(frame - round(frame)) > 1e-6 or not 0 <= index < len(self.inputs):
+            return
+        if any(abs(a - b) > HISTORY_TOLERANCE for a, b in zip(self.inputs[index], values)):
+            self.invalidate(frame)
+
+    def first_dirty_frame(self, sample):
+        """
+        Return the first cached frame whose source values no longer match sample(frame), or None.
+
+        Sampling the source is far cheaper than simulating, so after a curve edit this finds
+        where the cache stops being valid without re-simulating anything.
+        """
+        for index, recorded in enumerate(self.inputs):
+            frame = self.start_frame + index
+            if any(abs(a - b) > HISTORY_TOLERANCE for a, b in zip(recorded, sample(frame))):
+                return frame
+        return None
+
+    def revalidate(self, sample):
+        """
+        Cut the cache at the first frame whose source changed, see first_dirty_frame.
+        """
+        frame = self.first_dirty_frame(sample)
+        if frame is not None:
+            self.invalidate(frame)
+
+    def rest(self, source):
+        """
+        Return the chain at rest on the given source values.
+        """
+        return list(source) * self.followers
+
+    def state(self, index, sample):
+        """
+        Return the positions at frame start_frame + index, simulating the missing frames.
+        """
+        while len(self.states) <= index:
+            frame = self.start_frame + len(self.states)
+            source = list(sample(frame))
+            if not self.states:
+                positions = self.rest(source)
+                self.states.append((positions, positions))
+            else:
+                positions, previous = self.states[-1]
+                keep = 1.0 - self.damping
+                channels = self.channels
+                updated = []
+                for i in range(len(positions)):
+                    target = source[i] if i < channels else updated[i - channels]
+                    x = positions[i]
+                    updated.append(x + (x - previous[i]) * keep + (target - x) * self.stiffness)
+                self.states.append((updated, positions))
+            self.inputs.append(source)
+            self.steps += 1
+        return self.states[index][0]
+
+    def evaluate(self, frame, sample):
+        """
+        Return the simulated positions at `frame`, follower by follower.
+
+        Frames before start_frame are the chain at rest on the source; fractional frames
+        are interpolated between the two whole frames around them.
+
+        Args:
+            frame (float): The frame to evaluate.
+            sample (callable): sample(frame) -> source channel values.
+
+        Returns:
+            list: followers * channels values; channel c of follower i is at (i - 1) * channels + c.
+        """
+        if frame < self.start_frame:
+            return self.rest(sample(frame))
+        index = int(math.floor(frame)) - self.start_frame
+        weight = frame - math.floor(frame)
+        before = self.state(index, sample)
+        if weight < 1e-9:
+            return before
+        after = self.state(index + 1, sample)
+        return [a + (b - a) * weight for a, b in zip(before, after)]
+
+
+class BuildPlan(object):
+    """
+    Everything a dynamic chain build does to the scene, resolved up front.
+
+    The plan only holds names, so it can be built and inspected without Maya; applying
+    it is dynamic_chain_build.apply_plan, which hands the changes the scene is missing to
+    the dynamicChainApplyPlan command as a plan of the same shape.
+
+    Attributes:
+        nodes (list): (node type, node name) of every helper node, created if missing.
+        connections (list): (source plug, destination plug) pairs, connected if not already.
+        values (list): (plug, value) pairs to set; int values go to integer and enum
+            attributes, float values to double ones.
+        deletes (list): Nodes removed first if they exist, e.g. the other build mode's expression.
+        expression (tuple): (expression name, expression string), or None.
+        owned (list): Multi plugs whose elements and outgoing connections the plan fully
+            describes. On a node that already exists, every other element is removed and
+            every other outgoing connection broken, so a rebuild leaves nothing stale.
+        removes (list): Multi elements removed with their connections; filled in by apply_plan.
+        disconnects (list): Destination plugs whose incoming connection is broken; filled in
+            by apply_plan.
+    """
+
+    def __init__(self):
+        self.nodes = []
+        self.connections = []
+        self.values = []
+        self.deletes = []
+        self.expression = None
+        self.owned = []
+        self.removes = []
+        self.disconnects = []
+
+
+def chain_prefix(source):
+    """
+    Return the prefix used to name the helper nodes of the chain driven by `source`.
+    """
+    return source.replace("|", "_")
+
+
+def chain_evaluator(chain_elements):
+    """
+    Return the name of the dynamicChainNode of a single chain; its expression adds "_EXP".
+    """
+    return f'{chain_prefix(chain_elements[0])}_dynamicChain'
+
+
+def stale_evaluators(chains, keep):
+    """
+    Return every evaluator a build of `chains` replaces, except `keep`.
+
+    That is the node and the expression of each chain built on its own, plus the
+    other-mode twin of `keep`, so a chain is never driven by two evaluators.
+    """
+    names = []
+    for chain_elements in chains:
+        evaluator = chain_evaluator(chain_elements)
+        names.extend((evaluator, f'{evaluator}_EXP'))
+    base = keep[:-len('_EXP')] if keep.endswith('_EXP') else keep
+    names.extend((base, f'{base}_EXP'))
+    return [name for index, name in enumerate(names) if name != keep and name not in names[:index]]
+
+
+def node_chains_plan(chains, transform, axes, node_name, solver=SOLVER_DELAY):
+    """
+    Plan one dynamicChainNode driving every chain in `chains`.
+
+    Chain k uses the node's chain[k] element and its followers take the outputs after
+    those of chains 0..k-1. The evaluators and time offset nodes of earlier builds of the
+    chains are deleted. The plan owns the node's chain, source and output multis, so
+    rebuilding into an existing node drops the chains, channels and follower connections
+    of the previous build that are not part of this one.
+
+    Args:
+        chains (list): One list per chain: the source followed by the followers.
+        transform (str): 'translate' or 'rotate'.
+        axes (list): Axes to drive, e.g. ['X', 'Y', 'Z'].
+        node_name (str): Name of the shared dynamicChainNode.
+        solver (int): SOLVER_DELAY or SOLVER_SPRING.
+
+    Returns:
+        BuildPlan: The plan.
+    """
+    plan = BuildPlan()
+    plan.deletes.extend(stale_evaluators(chains, node_name))
+    # Time offset nodes left by an expression build of the same chains
+    for chain_elements in chains:
+        plan.deletes.extend(name for name in chain_helper_nodes(chain_elements)
+                            if name != node_name and name not in plan.deletes)
+    plan.nodes.append((NODE_TYPE, node_name))
+    plan.connections.append(("time1.outTime", f"{node_name}.time"))
+    plan.values.append((f"{node_name}.solver", solver))
+    plan.owned.extend((f"{node_name}.chain", f"{node_name}.output"))
+
+    offset = 0
+    for chain_index, chain_elements in enumerate(chains):
+        source = chain_elements[0]
+        chain_plug = f"{node_name}.chain[{chain_index}]"
+        plan.owned.append(f"{chain_plug}.source")
+        plan.connections.append((f"{source}.{DELAY_ATTR}", f"{chain_plug}.delay"))
+        plan.connections.append((f"{source}.{AMPLITUDE_ATTR}", f"{chain_plug}.amplitude"))
+        for channel, axis in enumerate(axes):
+            plan.connections.append((f"{source}.{transform}{axis}", f"{chain_plug}.source[{channel}]"))
+        plan.values.append((f"{chain_plug}.followers", len(chain_elements) - 1))
+
+        for element in chain_elements[1:]:
+            for axis in axes:
+                plan.connections.append((f"{node_name}.output[{offset}]", f"{element}.{transform}{axis}"))
+                offset += 1
+    return plan
+
+
+def node_chain_plan(chain_elements, transform, axes, solver=SOLVER_DELAY):
+    """
+    Plan a chain driven by its own dynamicChainNode.
+
+    Args:
+        chain_elements (list): The source followed by the followers.
+        transform (str): 'translate' or 'rotate'.
+        axes (list): Axes to drive, e.g. ['X', 'Y', 'Z'].
+        solver (int): SOLVER_DELAY or SOLVER_SPRING.
+
+    Returns:
+        BuildPlan: The plan; output[i * len(axes) + c] drives axis c of follower i + 1.
+    """
+    return node_chains_plan([chain_elements], transform, axes, chain_evaluator(chain_elements), solver)
+
+
+def expression_chains_plan(chains, transform, axes, expression_name):
+    """
+    Plan the `getAttr -time` expression and time offset nodes of every chain, sharing one expression.
+
+    Args:
+        chains (list): One list per chain: the source followed by the followers.
+        transform (str): 'translate' or 'rotate'.
+        axes (list): Axes to drive, e.g. ['X', 'Y', 'Z'].
+        expression_name (str): Name of the shared expression.
+
+    Returns:
+        BuildPlan: The plan.
+    """
+    plan = BuildPlan()
+    plan.deletes.extend(stale_evaluators(chains, expression_name))
+
+    expression = ""
+    for chain_elements in chains:
+        source = chain_elements[0]
+        prefix = chain_prefix(source)
+        inverse_md_node = f'{prefix}_inverse_md'
+
+        # Inverse node for delay and amplitude
+        plan.nodes.append(('multDoubleLinear', inverse_md_node))
+        plan.connections.append((f"{source}.{DELAY_ATTR}", f"{inverse_md_node}.input1"))
+        plan.values.append((f"{inverse_md_node}.input2", -1.0))
+
+        for index, element in enumerate(chain_elements):
+            if index != 0:
+                delay_md_node = f"{prefix}_{element}_delay_md"
+                time_ad_node = f"{prefix}_{element}_time_ad"
+
+                plan.nodes.append(('multDoubleLinear', delay_md_node))
+                plan.connections.append((f"{inverse_md_node}.output", f"{delay_md_node}.input1"))
+                plan.values.append((f"{delay_md_node}.input2", float(index)))
+
+                plan.nodes.append(('addDoubleLinear', time_ad_node))
+                plan.connections.append((f"{delay_md_node}.output", f"{time_ad_node}.input1"))
+                plan.connections.append(("time1.outTime", f"{time_ad_node}.input2"))
+
+                for axis in axes:
+                    expression += f"{element}.{transform}{axis} = `getAttr - time ({time_ad_node}.output) {source}.{transform}{axis}` * {source}.{AMPLITUDE_ATTR};\n"
+
+    plan.expression = (expression_name, expression)
+    return plan
+
+
+def expression_chain_plan(chain_elements, transform, axes):
+    """
+    Plan a chain driven by its own `getAttr -time` expression and time offset nodes.
+
+    Args:
+        chain_elements (list): The source followed by the followers.
+        transform (str): 'translate' or 'rotate'.
+        axes (list): Axes to drive, e.g. ['X', 'Y', 'Z'].
+
+    Returns:
+        BuildPlan: The plan.
+    """
+    return expression_chains_plan([chain_elements], transform, axes, f'{chain_evaluator(chain_elements)}_EXP')
+
+
+def hierarchy_chain(root, descendants):
+    """
+    Order a root and its descendants into a chain, parents before children.
+
+    Args:
+        root (str): Full path of the chain root.
+        descendants (list): Full paths of the nodes below it.
+
+    Returns:
+        list: The root followed by the descendants sorted by depth (then by path, so
+        siblings of a branching hierarchy keep a stable order).
+    """
+    return [root] + sorted(descendants, key=lambda path: (path.count("|"), path))
+
+
+def chain_helper_nodes(chain_elements):
+    """
+    Return the names of every helper node either build mode may have created for a chain.
+
+    Args:
+        chain_elements (list): The source followed by the followers.
+
+    Returns:
+        list: The dynamicChainNode, the expression and the _inverse_md/_delay_md/_time_ad nodes.
+    """
+    prefix = chain_prefix(chain_elements[0])
+    evaluator = chain_evaluator(chain_elements)
+    names = [evaluator, f'{evaluator}_EXP', f'{prefix}_inverse_md']
+    for element in chain_elements[1:]:
+        names.append(f"{prefix}_{element}_delay_md")
+        names.append(f"{prefix}_{element}_time_ad")
+    return names
+
+
+def bake_window(frames, delays, followers):
+    """
+    Return the first and last frame the source has to be sampled on to bake `frames`.
+
+    Args:
+        frames (sequence): The frames that get keys.
+        delays (sequence): The Delay value at each of those frames.
+        followers (int): Number of followers in the chain.
+
+    Returns:
+        tuple: (first frame, last frame), both whole frames.
+    """
+    earliest = min(frame - max(delay * followers, 0.0) for frame, delay in zip(frames, delays))
+    latest = max(frame - min(delay * followers, 0.0) for frame, delay in zip(frames, delays))
+    return math.floor(earliest), math.ceil(latest)
+
+
+def bake_chain(source_start, step, source_values, frames, delays, amplitudes, followers):
+    """
+    Compute every follower's delayed, amplitude-scaled channels from one sampling of the source.
+
+    Follower i (1-based) at frame f gets amplitudes[f] * source(f - delays[f] * i), with the
+    source linearly interpolated between its samples. Delayed frames outside the sampled
+    range use the first or last sample. All followers and frames are evaluated in a single
+    vectorized pass when NumPy is available.
+
+    Args:
+        source_start (float): Frame of the first source sample.
+        step (float): Distance in frames between two source samples.
+        source_values (list): One sequence of samples per channel.
+        frames (sequence): The frames to bake.
+        delays (sequence): The Delay value at each frame.
+        amplitudes (sequence): The Amplitude value at each frame.
+        followers (int): Number of followers in the chain.
+
+    Returns:
+        list: baked[i][c] is the list of values of channel c of follower i + 1, one per frame.
+    """
+    if load_numpy() is not None:
+        frames = np.asarray(frames, dtype=np.float64)
+        delays = np.asarray(delays, dtype=np.float64)
+        amplitudes = np.asarray(amplitudes, dtype=np.float64)
+        indices = np.arange(1, followers + 1, dtype=np.float64)[:, None]
+        times = frames[None, :] - delays[None, :] * indices
+        baked = []
+        for values in source_values:
+            values = np.asarray(values, dtype=np.float64)
+            grid = source_start + step * np.arange(len(values))
+            baked.append(np.interp(times, grid, values) * amplitudes[None, :])
+        return [[channel[follower].tolist() for channel in baked] for follower in range(followers)]
+
+    def interpolate(values, time):
+        position = min(max((time - source_start) / step, 0.0), len(values) - 1.0)
+        index = min(int(position), len(values) - 2) if len(values) > 1 else 0
+        weight = position - index
+        if weight <= 0.0:
+            return values[index]
+        return values[index] + (values[index + 1] - values[index]) * weight
+
+    baked = []
+    for follower in range(1, followers + 1):
+        times = [frame - delay * follower for frame, delay in zip(frames, delays)]
+        baked.append([[interpolate(values, time) * amplitude for time, amplitude in zip(times, amplitudes)]
+                      for values in source_values])
+    return baked
+
+
+def bake_spring_chain(source_start, source_values, frames, amplitudes, followers, stiffness, damping, start_frame):
+    """
+    Simulate every follower's spring channels over `frames` from one sampling of the source.
+
+    The chain is simulated once on the unscaled source and each frame is scaled by the
+    amplitude at that frame, which gives the same values as a dynamicChainNode with the
+    spring solver.
+
+    Args:
+        source_start (int): Frame of the first source sample; samples are one frame apart
+            and must cover min(start_frame, frames[0]) to frames[-1].
+        source_values (list): One sequence of samples per channel.
+        frames (sequence): The whole frames to bake.
+        amplitudes (sequence): The Amplitude value at each frame.
+        followers (int): Number of followers in the chain.
+        stiffness (float): Spring pull per frame, from 0 to 1.
+        damping (float): Velocity lost per frame, from 0 to 1.
+        start_frame (int): Frame the simulation starts from, at rest.
+
+    Returns:
+        list: baked[i][c] is the list of values of channel c of follower i + 1, one per frame.
+    """
+    channels = len(source_values)
+
+    def sample(frame):
+        index = int(frame) - source_start
+        return [values[index] for values in source_values]
+
+    solver = SpringSolver(stiffness, damping, start_frame)
+    solver.configure(stiffness, damping, start_frame, followers, channels)
+    baked = [[[] for _ in range(channels)] for _ in range(followers)]
+    for frame, amplitude in zip(frames, amplitudes):
+        values = solver.evaluate(frame, sample)
+        for follower in range(followers):
+            for channel in range(channels):
+                baked[follower][channel].append(values[follower * channels + channel] * amplitude)
+    return baked
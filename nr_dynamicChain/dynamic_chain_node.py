@@ -0,0 +1,554 @@
+import weakref
+
+import maya.OpenMaya as om
+import maya.OpenMayaAnim as oma
+import maya.OpenMayaMPx as ommpx
+
+from dynamic_chain_core import FrameHistory, PENDING_PLANS, SpringSolver, SOLVER_DELAY, SOLVER_SPRING
+
+# Upstream hops followed when looking for the animation curve behind a source channel
+MAX_UPSTREAM_HOPS = 8
+# Node added and scene callbacks registered by initializePlugin
+PLUGIN_CALLBACKS = []
+
+
+def find_anim_curve(plug):
+    """
+    Follow a source channel upstream to the animation curve driving it.
+
+    Direct connections and unitConversion nodes are followed; any other node (pairBlend,
+    constraint, expression, ...) ends the search.
+
+    Parameters:
+    plug (MPlug): The destination plug to start from.
+
+    Returns:
+    tuple: (MFnAnimCurve, conversion factor), or (None, 1.0) if no curve drives the plug.
+    """
+    factor = 1.0
+    for _ in range(MAX_UPSTREAM_HOPS):
+        sources = om.MPlugArray()
+        plug.connectedTo(sources, True, False)
+        if sources.length() == 0:
+            break
+        source = sources[0]
+        node = source.node()
+        if node.hasFn(om.MFn.kAnimCurve):
+            return oma.MFnAnimCurve(node), factor
+        if node.hasFn(om.MFn.kUnitConversion):
+            conversion = om.MFnDependencyNode(node)
+            factor *= conversion.findPlug("conversionFactor").asDouble()
+            plug = conversion.findPlug("input")
+        elif source.isDestination():
+            # A plain attribute fed by something else, e.g. the source transform's rotateX
+            plug = source
+        else:
+            break
+    return None, 1.0
+
+
+def find_plug(name):
+    """
+    Return the MPlug of a "node.attribute" name, array indices included.
+    """
+    selection = om.MSelectionList()
+    selection.add(name)
+    plug = om.MPlug()
+    selection.getPlug(0, plug)
+    return plug
+
+
+def find_node(name):
+    """
+    Return the MObject of a node name, or None if there is no such node.
+    """
+    selection = om.MSelectionList()
+    try:
+        selection.add(name)
+    except RuntimeError:
+        return None
+    node = om.MObject()
+    selection.getDependNode(0, node)
+    return node
+
+
+def mel_string(value):
+    """
+    Quote a Python string as a MEL string literal.
+    """
+    return '"{}"'.format(value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"))
+
+
+def break_input(modifier, plug):
+    """
+    Queue on `modifier` the removal of whatever drives `plug`, like connectAttr -force does.
+
+    A unit conversion node between the source and `plug` is deleted with the connection.
+    """
+    sources = om.MPlugArray()
+    plug.connectedTo(sources, True, False)
+    if sources.length() == 0:
+        return
+    if sources[0].node().hasFn(om.MFn.kUnitConversion):
+        modifier.deleteNode(sources[0].node())
+    else:
+        modifier.disconnect(sources[0], plug)
+
+
+class ApplyPlanCommand(ommpx.MPxCommand):
+    """
+    Undoable command applying a resolved BuildPlan through a single MDGModifier.
+
+    dynamic_chain_build.apply_plan queues the plan in dynamic_chain_core.PENDING_PLANS and
+    calls the command, so the node deletions and creations, leftover elements and
+    connections of an earlier build, new connections, values and the expression of a
+    whole build are one DG modification: one entry on the undo queue, undone and redone
+    by replaying the modifier.
+
+    Attributes:
+    kCommandName (str): Name of the command.
+    """
+    kCommandName = "dynamicChainApplyPlan"
+
+    def __init__(self):
+        ommpx.MPxCommand.__init__(self)
+        self.modifier = None
+
+    @staticmethod
+    def creator():
+        """
+        Creator method to be used by Maya to create an instance of the command.
+        """
+        return ApplyPlanCommand()
+
+    def isUndoable(self):
+        return True
+
+    def doIt(self, args):
+        """
+        Pop the next queued plan and apply it.
+        """
+        if not PENDING_PLANS:
+            raise RuntimeError(f"{self.kCommandName} is called by dynamic_chain_build.apply_plan and has no plan to apply.")
+        plan = PENDING_PLANS.pop(0)
+        self.modifier = om.MDGModifier()
+        try:
+            for name in plan.deletes:
+                node = find_node(name)
+                if node is not None:
+                    self.modifier.deleteNode(node)
+            for node_type, name in plan.nodes:
+                self.modifier.renameNode(self.modifier.createNode(node_type), name)
+            # The plugs of the new nodes are looked up by name, so the nodes have to exist first
+            self.modifier.doIt()
+
+            for name in plan.disconnects:
+                break_input(self.modifier, find_plug(name))
+            for name in plan.removes:
+                self.modifier.removeMultiInstance(find_plug(name), True)
+            for source, destination in plan.connections:
+                destinationPlug = find_plug(destination)
+                if destinationPlug.isDestination():
+                    break_input(self.modifier, destinationPlug)
+                self.modifier.connect(find_plug(source), destinationPlug)
+            for name, value in plan.values:
+                if isinstance(value, int):
+                    self.modifier.newPlugValueInt(find_plug(name), value)
+                else:
+                    self.modifier.newPlugValueDouble(find_plug(name), value)
+            if plan.expression:
+                name, expression = plan.expression
+                if find_node(name) is not None:
+                    self.modifier.commandToExecute(f"expression -edit -string {mel_string(expression)} {name}")
+                else:
+                    self.modifier.commandToExecute(f"expression -name {name} -string {mel_string(expression)}")
+            self.modifier.doIt()
+        except RuntimeError:
+            self.modifier.undoIt()
+            raise
+
+    def redoIt(self):
+        self.modifier.doIt()
+
+    def undoIt(self):
+        self.modifier.undoIt()
+
+
+class DynamicChainNode(ommpx.MPxNode):
+    """
+    Custom node that outputs the delayed, amplitude-scaled source channels of one or more chains.
+
+    Each element of the "chain" multi describes one chain: its delay, amplitude, follower
+    count and source channels. Follower i (1-based) of a chain gets
+    amplitude * source(time - delay * i) on every channel, which is what the `getAttr -time`
+    expression of the dynamic chain computes. Every chain connected to the node is
+    evaluated in the same compute, so a batch of chains costs one node evaluation per frame.
+    Channels driven by an animation curve are read straight from the curve, so no other
+    part of the graph is evaluated at a different time. Other channels fall back to
+    evaluating the connected plug in a time context.
+
+    The outputs of all chains share the flat "output" multi, chain after chain (in logical
+    index order) and follower by follower within a chain: channel c of follower i of a chain
+    is output[offset + (i - 1) * channelCount + c], where offset is the number of outputs of
+    the chains before it.
+
+    With cacheHistory on, the source values of every evaluated frame are recorded in a
+    FrameHistory ring buffer per chain and the delayed samples are read back from it,
+    interpolating between frames for fractional delays. During playback each delayed
+    lookup is then a buffer read; only frames never evaluated before (scrubbing, first
+    play) are sampled from the curve. A chain's history is cleared when one of its source
+    curves is edited, one of its source connections changes or the current frame no longer
+    matches what was recorded. Delay and amplitude are applied when reading, so changing
+    them keeps the history and only grows the buffer when the delay window gets longer.
+
+    With the solver set to spring, delay is not used: each chain is a damped spring chain
+    anchored on its source (see SpringSolver), simulated from startFrame.
+    Every simulated frame is cached per chain, so scrubbing backwards reads the cache, and
+    after a source edit the cache is cut at the first frame whose source changed rather
+    than re-simulated from startFrame. Amplitude scales the simulated values when reading,
+    so animating it keeps the cache; changing stiffness, damping or startFrame re-simulates
+    the chain from startFrame.
+
+    Attributes:
+    kNodeName (node name): Unique name for the node.
+    kNodeId (MTypeId): Unique ID for the node.
+    timeAttr (MObject): The time input, usually connected from time1.outTime.
+    chainAttr (MObject): Compound multi, one element per chain.
+    delayAttr (MObject): Child of chain: delay in frames between two consecutive followers.
+    amplitudeAttr (MObject): Child of chain: scale applied to every delayed value.
+    followersAttr (MObject): Child of chain: number of followers in the chain.
+    sourceAttr (MObject): Child of chain: multi double input, one element per source channel.
+    cacheHistoryAttr (MObject): Boolean enabling the frame history.
+    solverAttr (MObject): Enum selecting the delay or the spring solver.
+    stiffnessAttr (MObject): Spring pull towards the target per frame, from 0 to 1.
+    dampingAttr (MObject): Velocity lost per frame by the springs, from 0 to 1.
+    startFrameAttr (MObject): Frame the spring simulation starts from, at rest.
+    outputAttr (MObject): Multi double output, one element per follower channel.
+    """
+    kNodeName = "dynamicChainNode"
+    kNodeId = om.MTypeId(0x78010)  # Replace with a unique ID
+
+    timeAttr = om.MObject()
+    chainAttr = om.MObject()
+    delayAttr = om.MObject()
+    amplitudeAttr = om.MObject()
+    followersAttr = om.MObject()
+    sourceAttr = om.MObject()
+    cacheHistoryAttr = om.MObject()
+    solverAttr = om.MObject()
+    stiffnessAttr = om.MObject()
+    dampingAttr = om.MObject()
+    startFrameAttr = om.MObject()
+    outputAttr = om.MObject()
+
+    # Every instance created, so nodes restored by undo can be found from their MObject
+    instances = weakref.WeakSet()
+
+    def __init__(self):
+        super(DynamicChainNode, self).__init__()
+        self.histories = {}
+        self.solvers = {}
+        self.editedChains = set()
+        self.curves = {}
+        self.callbacks = []
+
+    def postConstructor(self):
+        DynamicChainNode.instances.add(self)
+        self.add_callbacks()
+
+    def add_callbacks(self):
+        if self.callbacks:
+            return
+        self.callbacks.append(oma.MAnimMessage.addAnimCurveEditedCallback(self.anim_curves_edited))
+        self.callbacks.append(om.MNodeMessage.addNodeAboutToDeleteCallback(self.thisMObject(), self.remove_callbacks))
+
+    def remove_callbacks(self, *args):
+        for callback in self.callbacks:
+            om.MMessage.removeCallback(callback)
+        self.callbacks = []
+
+    def restored(self):
+        """
+        Register the callbacks again after undoing the node's deletion, which does not call
+        postConstructor. Curves edited while the node was deleted went unnoticed, so the
+        histories are cleared and every spring cache is checked on the next compute.
+        """
+        self.add_callbacks()
+        self.histories.clear()
+        self.editedChains.update(self.solvers)
+
+    def anim_curves_edited(self, editedCurves, clientData=None):
+        """
+        Clear the history of every chain reading one of the edited curves and have its
+        spring cache checked for the first changed frame on the next compute.
+        """
+        for chainIndex, curves in list(self.curves.items()):
+            for i in range(editedCurves.length()):
+                if any(editedCurves[i] == curve for curve in curves):
+                    self.histories.pop(chainIndex, None)
+                    self.editedChains.add(chainIndex)
+                    break
+
+    def source_connection_changed(self, plug):
+        if plug.attribute() == DynamicChainNode.sourceAttr and plug.isElement():
+            chainIndex = plug.array().parent().logicalIndex()
+            self.histories.pop(chainIndex, None)
+            self.solvers.pop(chainIndex, None)
+
+    def connectionMade(self, plug, otherPlug, asSrc):
+        self.source_connection_changed(plug)
+        return om.kUnknownParameter
+
+    def connectionBroken(self, plug, otherPlug, asSrc):
+        self.source_connection_changed(plug)
+        return om.kUnknownParameter
+
+    @staticmethod
+    def initialize():
+        unitAttr = om.MFnUnitAttribute()
+        DynamicChainNode.timeAttr = unitAttr.create("time", "tm", om.MFnUnitAttribute.kTime, 0.0)
+        unitAttr.setStorable(True)
+
+        numericAttr = om.MFnNumericAttribute()
+        DynamicChainNode.delayAttr = numericAttr.create("delay", "dl", om.MFnNumericData.kDouble, 2.0)
+        numericAttr.setKeyable(True)
+
+        DynamicChainNode.amplitudeAttr = numericAttr.create("amplitude", "amp", om.MFnNumericData.kDouble, 1.0)
+        numericAttr.setKeyable(True)
+
+        DynamicChainNode.followersAttr = numericAttr.create("followers", "fl", om.MFnNumericData.kInt, 0)
+        numericAttr.setMin(0)
+        numericAttr.setStorable(True)
+
+        DynamicChainNode.sourceAttr = numericAttr.create("source", "src", om.MFnNumericData.kDouble, 0.0)
+        numericAttr.setArray(True)
+        numericAttr.setStorable(True)
+
+        compoundAttr = om.MFnCompoundAttribute()
+        DynamicChainNode.chainAttr = compoundAttr.create("chain", "chn")
+        compoundAttr.addChild(DynamicChainNode.delayAttr)
+        compoundAttr.addChild(DynamicChainNode.amplitudeAttr)
+        compoundAttr.addChild(DynamicChainNode.followersAttr)
+        compoundAttr.addChild(DynamicChainNode.sourceAttr)
+        compoundAttr.setArray(True)
+        compoundAttr.setStorable(True)
+
+        DynamicChainNode.cacheHistoryAttr = numericAttr.create("cacheHistory", "ch", om.MFnNumericData.kBoolean, True)
+        numericAttr.setStorable(True)
+
+        enumAttr = om.MFnEnumAttribute()
+        DynamicChainNode.solverAttr = enumAttr.create("solver", "sv", SOLVER_DELAY)
+        enumAttr.addField("delay", SOLVER_DELAY)
+        enumAttr.addField("spring", SOLVER_SPRING)
+        enumAttr.setKeyable(True)
+
+        DynamicChainNode.stiffnessAttr = numericAttr.create("stiffness", "stf", om.MFnNumericData.kDouble, 0.3)
+        numericAttr.setMin(0.0)
+        numericAttr.setMax(1.0)
+        numericAttr.setKeyable(True)
+
+        DynamicChainNode.dampingAttr = numericAttr.create("damping", "dmp", om.MFnNumericData.kDouble, 0.2)
+        numericAttr.setMin(0.0)
+        numericAttr.setMax(1.0)
+        numericAttr.setKeyable(True)
+
+        DynamicChainNode.startFrameAttr = numericAttr.create("startFrame", "sf", om.MFnNumericData.kInt, 1)
+        numericAttr.setStorable(True)
+
+        DynamicChainNode.outputAttr = numericAttr.create("output", "out", om.MFnNumericData.kDouble, 0.0)
+        numericAttr.setArray(True)
+        numericAttr.setUsesArrayDataBuilder(True)
+        numericAttr.setWritable(False)
+        numericAttr.setStorable(False)
+
+        settings = (DynamicChainNode.cacheHistoryAttr, DynamicChainNode.solverAttr, DynamicChainNode.stiffnessAttr,
+                    DynamicChainNode.dampingAttr, DynamicChainNode.startFrameAttr)
+        for attr in (DynamicChainNode.timeAttr, DynamicChainNode.chainAttr) + settings + (DynamicChainNode.outputAttr,):
+            DynamicChainNode.addAttribute(attr)
+        for attr in (DynamicChainNode.timeAttr, DynamicChainNode.chainAttr, DynamicChainNode.delayAttr, DynamicChainNode.amplitudeAttr,
+                     DynamicChainNode.followersAttr, DynamicChainNode.sourceAttr) + settings:
+            DynamicChainNode.attributeAffects(attr, DynamicChainNode.outputAttr)
+
+    def get_samplers(self, chainIndex):
+        """
+        Return one (plug, MFnAnimCurve or None, conversion factor) entry per source channel of a chain.
+
+        The lookup is a few connection queries per channel, so it is redone every compute
+        rather than cached; keying, unkeying or reconnecting a source channel is then picked
+        up without any callbacks.
+        """
+        chainPlug = om.MPlug(self.thisMObject(), DynamicChainNode.chainAttr).elementByLogicalIndex(chainIndex)
+        sourcePlug = chainPlug.child(DynamicChainNode.sourceAttr)
+        indices = om.MIntArray()
+        sourcePlug.getExistingArrayAttributeIndices(indices)
+        samplers = []
+        for index in sorted(indices):
+            plug = sourcePlug.elementByLogicalIndex(index)
+            curve, factor = find_anim_curve(plug)
+            samplers.append((plug, curve, factor))
+        return samplers
+
+    def read_chains(self, dataBlock):
+        """
+        Read every chain element of the data block.
+
+        Returns:
+        list: (logical index, delay, amplitude, followers, {source index: current value}) per chain,
+        sorted by logical index.
+        """
+        chains = []
+        chainHandle = dataBlock.inputArrayValue(DynamicChainNode.chainAttr)
+        for i in range(chainHandle.elementCount()):
+            chainHandle.jumpToArrayElement(i)
+            element = chainHandle.inputValue()
+            sourceHandle = om.MArrayDataHandle(element.child(DynamicChainNode.sourceAttr))
+            current = {}
+            for j in range(sourceHandle.elementCount()):
+                sourceHandle.jumpToArrayElement(j)
+                current[sourceHandle.elementIndex()] = sourceHandle.inputValue().asDouble()
+            chains.append((chainHandle.elementIndex(),
+                           element.child(DynamicChainNode.delayAttr).asDouble(),
+                           element.child(DynamicChainNode.amplitudeAttr).asDouble(),
+                           element.child(DynamicChainNode.followersAttr).asInt(),
+                           current))
+        return sorted(chains, key=lambda chain: chain[0])
+
+    def compute(self, plug, dataBlock):
+        """
+        Evaluate every channel of every follower of every chain and write the output elements.
+
+        Parameters:
+        plug (MPlug): The plug that is being evaluated.
+        dataBlock (MDataBlock): The data block containing the input/output data handles.
+        """
+        if plug.isElement():
+            plug = plug.array()
+        if plug == DynamicChainNode.outputAttr:
+            unit = om.MTime.uiUnit()
+            frame = dataBlock.inputValue(DynamicChainNode.timeAttr).asTime().asUnits(unit)
+            cacheHistory = dataBlock.inputValue(DynamicChainNode.cacheHistoryAttr).asBool()
+            solver = dataBlock.inputValue(DynamicChainNode.solverAttr).asShort()
+            stiffness = dataBlock.inputValue(DynamicChainNode.stiffnessAttr).asDouble()
+            damping = dataBlock.inputValue(DynamicChainNode.dampingAttr).asDouble()
+            startFrame = dataBlock.inputValue(DynamicChainNode.startFrameAttr).asInt()
+            chains = self.read_chains(dataBlock)
+
+            # Forget the caches of chains that were removed
+            chainIndices = set(chain[0] for chain in chains)
+            for caches in (self.histories, self.solvers):
+                for chainIndex in set(caches) - chainIndices:
+                    del caches[chainIndex]
+
+            outputHandle = dataBlock.outputArrayValue(DynamicChainNode.outputAttr)
+            builder = outputHandle.builder()
+            index = 0
+            for chainIndex, delay, amplitude, followers, current in chains:
+                samplers = self.get_samplers(chainIndex)
+                self.curves[chainIndex] = [curve.object() for _, curve, _ in samplers if curve is not None]
+
+                def sample(frame, samplers=samplers):
+                    time = om.MTime(frame, unit)
+                    values = []
+                    for sourcePlug, curve, factor in samplers:
+                        if curve is not None:
+                            values.append(curve.evaluate(time) * factor)
+                        else:
+                            values.append(sourcePlug.asDouble(om.MDGContext(time)))
+                    return values
+
+                currentValues = [current[sourceIndex] for sourceIndex in sorted(current)]
+                if solver == SOLVER_SPRING:
+                    springs = self.solvers.setdefault(chainIndex, SpringSolver())
+                    springs.configure(stiffness, damping, startFrame, followers, len(samplers))
+                    if chainIndex in self.editedChains:
+                        springs.revalidate(sample)
+                        self.editedChains.discard(chainIndex)
+                    springs.record(frame, currentValues)
+                    for value in springs.evaluate(frame, sample):
+                        builder.addElement(index).setDouble(value * amplitude)
+                        index += 1
+                    continue
+
+                if cacheHistory:
+                    # The current values come through the regular evaluation, so recording them is free
+                    history = self.histories.setdefault(chainIndex, FrameHistory())
+                    history.reserve(delay * followers)
+                    history.record(frame, currentValues)
+
+                for follower in range(1, followers + 1):
+                    delayed = frame - delay * follower
+                    values = history.sample(delayed, sample) if cacheHistory else sample(delayed)
+                    for value in values:
+                        builder.addElement(index).setDouble(value * amplitude)
+                        index += 1
+            outputHandle.set(builder)
+            outputHandle.setAllClean()
+        else:
+            return om.kUnknownParameter
+        return None  # Important: Returning None for successful completion
+
+    @staticmethod
+    def creator():
+        """
+        Creator method to be used by Maya to create an instance of the node.
+        """
+        return DynamicChainNode()
+
+def node_added(node, clientData=None):
+    """
+    Give a dynamicChainNode back its callbacks when it is added again by undoing its deletion.
+    """
+    for instance in list(DynamicChainNode.instances):
+        if instance.thisMObject() == node:
+            instance.restored()
+
+def scene_closing(clientData=None):
+    """
+    Remove the callbacks of every dynamicChainNode before the scene is cleared.
+    """
+    for instance in list(DynamicChainNode.instances):
+        instance.remove_callbacks()
+    DynamicChainNode.instances.clear()
+
+def initializePlugin(mobject):
+    """
+    Initialize the plugin by registering the dynamic chain node, the plan command and the
+    node added and scene callbacks that manage the nodes' curve callbacks.
+    """
+    mplugin = ommpx.MFnPlugin(mobject)
+
+    try:
+        mplugin.registerNode(DynamicChainNode.kNodeName, DynamicChainNode.kNodeId, DynamicChainNode.creator, DynamicChainNode.initialize, ommpx.MPxNode.kDependNode)
+    except RuntimeError as e:
+        om.MGlobal.displayError(f"Failed to register nodes: {e}")
+
+    PLUGIN_CALLBACKS.append(om.MDGMessage.addNodeAddedCallback(node_added, DynamicChainNode.kNodeName))
+    for message in (om.MSceneMessage.kBeforeNew, om.MSceneMessage.kBeforeOpen):
+        PLUGIN_CALLBACKS.append(om.MSceneMessage.addCallback(message, scene_closing))
+
+    try:
+        mplugin.registerCommand(ApplyPlanCommand.kCommandName, ApplyPlanCommand.creator)
+    except RuntimeError as e:
+        om.MGlobal.displayError(f"Failed to register command: {e}")
+
+def uninitializePlugin(mobject):
+    """
+    Uninitialize the plugin by removing its callbacks and deregistering the dynamic chain node
+    and the plan command.
+    """
+    mplugin = ommpx.MFnPlugin(mobject)
+
+    for callback in PLUGIN_CALLBACKS:
+        om.MMessage.removeCallback(callback)
+    del PLUGIN_CALLBACKS[:]
+    scene_closing()
+
+    try:
+        mplugin.deregisterNode(DynamicChainNode.kNodeId)
+    except RuntimeError as e:
+        om.MGlobal.displayError(f"Failed to deregister nodes: {e}")
+
+    try:
+        mplugin.deregisterCommand(ApplyPlanCommand.kCommandName)
+    except RuntimeError as e:
+        om.MGlobal.displayError(f"Failed to deregister command: {e}")
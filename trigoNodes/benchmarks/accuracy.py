@@ -0,0 +1,236 @@
+"""
+Measure the accuracy and throughput of the trigo approximations against math.
+
+Runs without Maya and writes machine-readable results with --json:
+
+    python trigoNodes/benchmarks/accuracy.py --json trigo_accuracy.json
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import trigo_core
+
+FUNCTIONS = ["sin", "cos", "tan", "cot", "sec", "csc"]
+
+# Relative error is only meaningful away from the zeros of the reference
+RELATIVE_FLOOR = 1e-6
+
+# References larger than this come from floating point residue at an exact pole
+POLE_LIMIT = 1e12
+
+
+def reference(name, ang_in_deg):
+    """
+    Return the exact value of a trigonometric function from math, or None at a pole.
+
+    Args:
+        name (str): One of FUNCTIONS.
+        ang_in_deg (float): The angle in degrees.
+
+    Returns:
+        float or None: The reference value.
+    """
+    rad = math.radians(ang_in_deg)
+    sin_val = math.sin(rad)
+    cos_val = math.cos(rad)
+    try:
+        value = {
+            "sin": lambda: sin_val,
+            "cos": lambda: cos_val,
+            "tan": lambda: sin_val / cos_val,
+            "cot": lambda: cos_val / sin_val,
+            "sec": lambda: 1 / cos_val,
+            "csc": lambda: 1 / sin_val,
+        }[name]()
+    except ZeroDivisionError:
+        return None
+    return None if abs(value) > POLE_LIMIT else value
+
+
+def angle_grids(density, seed):
+    """
+    Build the named angle grids swept by the benchmark.
+
+    Args:
+        density (int): Samples per degree on the dense grid.
+        seed (int): Seed for the random grids.
+
+    Returns:
+        dict: Grid name to list of angles in degrees.
+    """
+    rng = random.Random(seed)
+    offsets = [10.0 ** -e for e in range(1, 7)]
+    near_poles = []
+    for k in range(-8, 9):
+        for offset in offsets:
+            near_poles.append(k * 90 - offset)
+            near_poles.append(k * 90 + offset)
+
+    return {
+        "dense": [i / density for i in range(-360 * density, 360 * density + 1)],
+        "negative": [-i / density for i in range(1, 1080 * density + 1)],
+        "large": [rng.uniform(-1e6, 1e6) for _ in range(360 * density)],
+        "near_poles": near_poles,
+    }
+
+
+def measure_accuracy(name, func, angles):
+    """
+    Compare one approximation with its reference over a grid of angles.
+
+    Args:
+        name (str): One of FUNCTIONS.
+        func (callable): The approximation taking an angle in degrees.
+        angles (list): The angles to evaluate.
+
+    Returns:
+        dict: Error statistics for the grid.
+    """
+    abs_errors = []
+    rel_errors = []
+    undefined = 0
+    worst_angle = None
+    worst_error = -1.0
+
+    for ang in angles:
+        value = func(ang)
+        expected = reference(name, ang)
+        if value == trigo_core.UNDEFINED:
+            undefined += 1
+            continue
+        if expected is None:
+            continue
+
+        error = abs(value - expected)
+        abs_errors.append(error)
+        if abs(expected) > RELATIVE_FLOOR:
+            rel_errors.append(error / abs(expected))
+        if error > worst_error:
+            worst_error = error
+            worst_angle = ang
+
+    return {
+        "samples": len(angles),
+        "undefined": undefined,
+        "max_abs": max(abs_errors) if abs_errors else None,
+        "mean_abs": sum(abs_errors) / len(abs_errors) if abs_errors else None,
+        "max_rel": max(rel_errors) if rel_errors else None,
+        "mean_rel": sum(rel_errors) / len(rel_errors) if rel_errors else None,
+        "worst_angle": worst_angle,
+    }
+
+
+def calls_per_second(func, angles, repeat):
+    """
+    Return the best scalar call rate of func over the angles.
+    """
+    best = min(timeit.repeat(lambda: [func(a) for a in angles], number=1, repeat=repeat))
+    return len(angles) / best
+
+
+def batch_calls_per_second(func, angles, repeat):
+    """
+    Return the best per-element rate of a batch function over the angles.
+    """
+    best = min(timeit.repeat(lambda: func(angles), number=1, repeat=repeat))
+    return len(angles) / best
+
+
+def measure_throughput(angles, repeat):
+    """
+    Time the scalar and batch approximations against math and NumPy.
+
+    Args:
+        angles (list): The angles to evaluate.
+        repeat (int): Number of runs; the fastest one is reported.
+
+    Returns:
+        dict: Calls per second per implementation.
+    """
+    radians = [math.radians(a) for a in angles]
+    results = {
+        "math.sin": calls_per_second(math.sin, radians, repeat),
+    }
+    for name in FUNCTIONS:
+        results[f"approximate_{name}"] = calls_per_second(getattr(trigo_core, f"approximate_{name}"), angles, repeat)
+        results[f"approximate_{name}_batch"] = batch_calls_per_second(
+            getattr(trigo_core, f"approximate_{name}_batch"), angles, repeat)
+
+    np = trigo_core.load_numpy()
+    if np is not None:
+        array = np.asarray(angles, dtype=np.float64)
+        results["numpy.sin"] = batch_calls_per_second(lambda a: np.sin(np.radians(a)), array, repeat)
+    return results
+
+
+def run(density, repeat, seed):
+    """
+    Run the full accuracy sweep and throughput comparison.
+
+    Returns:
+        dict: JSON-serializable results.
+    """
+    grids = angle_grids(density, seed)
+    accuracy = {}
+    for name in FUNCTIONS:
+        func = getattr(trigo_core, f"approximate_{name}")
+        accuracy[name] = {grid: measure_accuracy(name, func, angles) for grid, angles in grids.items()}
+
+    np = trigo_core.load_numpy()
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__ if np is not None else None,
+        "density": density,
+        "seed": seed,
+        "accuracy": accuracy,
+        "throughput": measure_throughput(grids["dense"], repeat),
+    }
+
+
+def format_error(value):
+    return "-" if value is None else f"{value:.3e}"
+
+
+def print_report(results):
+    """
+    Print a human-readable summary of the results.
+    """
+    print(f"{'function':<10}{'grid':<12}{'max abs':>12}{'mean abs':>12}{'max rel':>12}{'mean rel':>12}{'undef':>7}")
+    for name, grids in results["accuracy"].items():
+        for grid, stats in grids.items():
+            print(f"{name:<10}{grid:<12}{format_error(stats['max_abs']):>12}{format_error(stats['mean_abs']):>12}"
+                  f"{format_error(stats['max_rel']):>12}{format_error(stats['mean_rel']):>12}{stats['undefined']:>7}")
+
+    print()
+    baseline = results["throughput"]["math.sin"]
+    print(f"{'implementation':<28}{'calls/s':>14}{'vs math.sin':>14}")
+    for impl, rate in results["throughput"].items():
+        print(f"{impl:<28}{rate:>14,.0f}{rate / baseline:>13.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--density", type=int, default=20, help="samples per degree on the dense grid")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per throughput measurement")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="write the results to this file")
+    args = parser.parse_args()
+
+    results = run(args.density, args.repeat, args.seed)
+    print_report(results)
+
+    if args.json:
+        with open(args.json, "w") as handle:
+            json.dump(results, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
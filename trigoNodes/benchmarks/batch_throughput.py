@@ -0,0 +1,79 @@
+"""
+Compare the throughput of the scalar trigo approximations against the batch API.
+
+Runs without Maya:
+
+    python trigoNodes/benchmarks/batch_throughput.py --count 100000
+"""
+import argparse
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import trigo_core
+
+FUNCTIONS = ["sin", "cos", "tan", "cot", "sec", "csc"]
+
+
+def time_call(func, repeat):
+    """
+    Return the best wall time in seconds of `repeat` runs of func().
+    """
+    return min(timeit.repeat(func, number=1, repeat=repeat))
+
+
+def run(count, repeat, seed):
+    """
+    Time every scalar function against its batch counterpart on the same angles.
+
+    Args:
+        count (int): Number of angles evaluated per run.
+        repeat (int): Number of runs; the fastest one is reported.
+        seed (int): Seed for the random angle generator.
+
+    Returns:
+        list: One dict per function with scalar/batch timings and speedup.
+    """
+    rng = random.Random(seed)
+    angles = [rng.uniform(-720.0, 720.0) for _ in range(count)]
+    results = []
+
+    for name in FUNCTIONS:
+        scalar = getattr(trigo_core, f"approximate_{name}")
+        batch = getattr(trigo_core, f"approximate_{name}_batch")
+
+        # Results must be identical before the timings mean anything
+        expected = [scalar(a) for a in angles]
+        if list(batch(angles)) != expected:
+            raise AssertionError(f"approximate_{name}_batch does not match approximate_{name}")
+
+        scalar_time = time_call(lambda: [scalar(a) for a in angles], repeat)
+        batch_time = time_call(lambda: batch(angles), repeat)
+        results.append({
+            "function": name,
+            "scalar_s": scalar_time,
+            "batch_s": batch_time,
+            "speedup": scalar_time / batch_time,
+        })
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=100000, help="angles per run")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per measurement")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    backend = "numpy" if trigo_core.load_numpy() is not None else "pure python"
+    print(f"{args.count} angles, best of {args.repeat}, batch backend: {backend}")
+    print(f"{'function':<10}{'scalar (ms)':>14}{'batch (ms)':>14}{'speedup':>10}")
+    for row in run(args.count, args.repeat, args.seed):
+        print(f"{row['function']:<10}{row['scalar_s'] * 1e3:>14.2f}{row['batch_s'] * 1e3:>14.2f}{row['speedup']:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Compare the per-sample cost of PhaseAccumulator against the sinNode/cosNode network it replaces.
+
+The network path reproduces what time1.outTime -> multiply -> add -> sinNode + cosNode
+computes per oscillator per frame. Runs without Maya:
+
+    python trigoNodes/benchmarks/oscillator.py --oscillators 500 --frames 240
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time as clock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import trigo_core
+
+
+def network(times, frequencies, amplitudes, phases):
+    """
+    Evaluate the oscillators the way a chain of single-value nodes does, frame by frame.
+    """
+    for time in times:
+        for frequency, amplitude, phase in zip(frequencies, amplitudes, phases):
+            angle = phase + 360 * frequency * time
+            amplitude * trigo_core.approximate_sin(angle)
+            amplitude * trigo_core.approximate_cos(angle)
+
+
+def accumulator(times, frequencies, amplitudes, phases):
+    """
+    Evaluate the oscillators with one PhaseAccumulator, frame by frame.
+    """
+    bank = trigo_core.PhaseAccumulator()
+    for time in times:
+        bank.evaluate(time, frequencies, amplitudes, phases)
+
+
+def max_errors(times, frequencies, amplitudes, phases):
+    """
+    Return the largest deviation per unit amplitude of PhaseAccumulator from math and from
+    the sinNode/cosNode values over the run.
+    """
+    bank = trigo_core.PhaseAccumulator()
+    worst_math = 0.0
+    worst_network = 0.0
+    for time in times:
+        sin_values, cos_values = bank.evaluate(time, frequencies, amplitudes, phases)
+        for i, (frequency, amplitude, phase) in enumerate(zip(frequencies, amplitudes, phases)):
+            angle = phase + 360 * frequency * time
+            radians = math.radians(angle)
+            network_sin, network_cos = trigo_core.PhaseAccumulator._sin_cos(angle)
+            worst_math = max(worst_math,
+                             abs(sin_values[i] - amplitude * math.sin(radians)) / amplitude,
+                             abs(cos_values[i] - amplitude * math.cos(radians)) / amplitude)
+            worst_network = max(worst_network,
+                                abs(sin_values[i] - amplitude * network_sin) / amplitude,
+                                abs(cos_values[i] - amplitude * network_cos) / amplitude)
+    return worst_math, worst_network
+
+
+def best_time(func, args, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = clock.perf_counter()
+        func(*args)
+        best = min(best, clock.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--oscillators", type=int, default=500)
+    parser.add_argument("--frames", type=int, default=240)
+    parser.add_argument("--fps", type=float, default=24.0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    frequencies = [rng.uniform(0.1, 3.0) for _ in range(args.oscillators)]
+    amplitudes = [rng.uniform(0.5, 2.0) for _ in range(args.oscillators)]
+    phases = [rng.uniform(0.0, 360.0) for _ in range(args.oscillators)]
+    times = [frame / args.fps for frame in range(args.frames)]
+    inputs = (times, frequencies, amplitudes, phases)
+
+    samples = args.oscillators * args.frames
+    network_time = best_time(network, inputs, args.repeat)
+    accumulator_time = best_time(accumulator, inputs, args.repeat)
+
+    print(f"{args.oscillators} oscillators x {args.frames} frames, best of {args.repeat}")
+    print(f"{'path':<22}{'total (ms)':>12}{'ns/sample':>12}")
+    print(f"{'sinNode + cosNode':<22}{network_time * 1e3:>12.1f}{network_time / samples * 1e9:>12.0f}")
+    print(f"{'PhaseAccumulator':<22}{accumulator_time * 1e3:>12.1f}{accumulator_time / samples * 1e9:>12.0f}")
+    print(f"speedup: {network_time / accumulator_time:.1f}x")
+
+    # A rotated sample is off from math by at most the error of the last direct (sin, cos) pair,
+    # plus rounding per step; the slack covers pair errors between the grid angles. The
+    # sinNode/cosNode values are themselves off by up to that much, so they can differ by twice.
+    bound = trigo_core.PhaseAccumulator.max_pair_error() * 1.01 + 1e-12 * args.frames
+    error_math, error_network = max_errors(*inputs)
+    print(f"max error per unit amplitude: vs math {error_math:.2e} (bound {bound:.2e}), "
+          f"vs sinNode/cosNode {error_network:.2e}")
+    assert error_math <= bound, "PhaseAccumulator drifted past its error bound"
+    assert error_network <= 2 * bound, "PhaseAccumulator drifted past its error bound from sinNode/cosNode"
+
+
+if __name__ == "__main__":
+    main()
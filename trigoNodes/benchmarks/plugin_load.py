@@ -0,0 +1,76 @@
+"""
+Measure what loading the trigo plugin costs before any node is evaluated.
+
+Each measurement runs in a fresh interpreter so module caches do not carry over. The
+"eager" row repeats the work initializePlugin used to do (fill the lookup table and fit
+every precision tier); the "lazy" row is what it does now. Runs without Maya:
+
+    python trigoNodes/benchmarks/plugin_load.py --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+TRIGO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROBE = r"""
+import json, sys, time, tracemalloc
+sys.path.insert(0, {trigo_dir!r})
+eager, trace = {eager!r}, {trace!r}
+before = set(sys.modules)
+if trace:
+    tracemalloc.start()
+start = time.perf_counter()
+import trigo_core
+imported = time.perf_counter()
+baseline = 0
+if trace:
+    tracemalloc.reset_peak()
+    baseline = tracemalloc.get_traced_memory()[0]
+table = trigo_core.SinTable({resolution})
+tiers = trigo_core.PrecisionTiers()
+cache = trigo_core.QuantizedLRUCache()
+if eager:
+    table.build()
+    tiers.update(trigo_core.build_precision_tiers())
+loaded = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (imported - start) * 1000,
+    "load_ms": (loaded - imported) * 1000,
+    "modules": len(set(sys.modules) - before),
+    "peak_kb": (tracemalloc.get_traced_memory()[1] - baseline) / 1024 if trace else 0.0,
+}}))
+"""
+
+
+def probe(eager, resolution, trace=False):
+    """
+    Run one load in a fresh interpreter and return its measurements.
+
+    Timings are taken with tracing off, since tracemalloc slows allocation-heavy code down;
+    pass trace=True for the allocation peak of the load step alone.
+    """
+    code = PROBE.format(trigo_dir=TRIGO_DIR, eager=eager, trace=trace, resolution=resolution)
+    output = subprocess.check_output([sys.executable, "-c", code])
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh interpreters per row")
+    parser.add_argument("--resolution", type=int, default=1024, help="lookup table intervals")
+    args = parser.parse_args()
+
+    print(f"{'load':<8}{'import ms':>12}{'load ms':>12}{'modules':>10}{'load KiB':>12}")
+    for name, eager in (("eager", True), ("lazy", False)):
+        runs = [probe(eager, args.resolution) for _ in range(args.runs)]
+        row = dict((key, statistics.median(run[key] for run in runs)) for key in runs[0])
+        row["peak_kb"] = probe(eager, args.resolution, trace=True)["peak_kb"]
+        print(f"{name:<8}{row['import_ms']:>12.2f}{row['load_ms']:>12.2f}{row['modules']:>10.0f}{row['peak_kb']:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Check every fitted Chebyshev precision tier against its error bound and time it.
+
+Exits with status 1 if any tier exceeds its target. Runs without Maya:
+
+    python trigoNodes/benchmarks/precision_tiers.py
+"""
+import argparse
+import math
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import trigo_core
+
+TIER_NAMES = {
+    trigo_core.PRECISION_LOW: "low",
+    trigo_core.PRECISION_MEDIUM: "medium",
+    trigo_core.PRECISION_HIGH: "high",
+}
+
+
+def check_tier(tier, target, angles):
+    """
+    Return the worst sine/cosine error of a tier over the angles and whether it is within bounds.
+
+    The targets include the six-decimal rounding of the results, so the rounded values are
+    checked against them directly and the series before rounding against the target minus
+    the rounding error.
+
+    Args:
+        tier (ChebyshevTier): The tier to check.
+        target (float): The error target the tier was fitted for.
+        angles (list): Angles in degrees.
+
+    Returns:
+        tuple: (worst error, passed)
+    """
+    worst = 0.0
+    for ang in angles:
+        rad = math.radians(ang)
+        worst = max(worst,
+                    abs(tier.sin(ang) - math.sin(rad)),
+                    abs(tier.cos(ang) - math.cos(rad)))
+    return worst, tier.max_error <= target - trigo_core.ROUNDING_ERROR and worst <= target
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--density", type=int, default=20, help="samples per degree")
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    angles = [i / args.density for i in range(-720 * args.density, 720 * args.density + 1)]
+    angles += [a * 1000.003 for a in range(-500, 501)]
+    timed = angles[:20000]
+
+    default_time = min(timeit.repeat(lambda: [trigo_core.approximate_sin(a) for a in timed], number=1, repeat=args.repeat))
+    print(f"{'tier':<8}{'degree':>8}{'target':>12}{'fit error':>12}{'sweep error':>13}{'vs default':>12}  result")
+
+    failed = False
+    for level, tier in sorted(trigo_core.build_precision_tiers().items()):
+        target = trigo_core.PRECISION_TARGETS[level]
+        worst, passed = check_tier(tier, target, angles)
+        tier_time = min(timeit.repeat(lambda: [tier.sin(a) for a in timed], number=1, repeat=args.repeat))
+        failed = failed or not passed
+        print(f"{TIER_NAMES[level]:<8}{tier.degree:>8}{target:>12.1e}{tier.max_error:>12.2e}{worst:>13.2e}"
+              f"{default_time / tier_time:>11.2f}x  {'ok' if passed else 'FAIL'}")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
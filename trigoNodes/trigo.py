@@ -1,174 +1,99 @@
+import json
+import os
+
 import maya.OpenMaya as om
 import maya.OpenMayaMPx as ommpx
 
-def adjust_phase(ang_in_deg):
-    """
-    Normalize an angle in degrees to the range [-180, 180].
-
-    Parameters:
-    ang_in_deg (float): The angle in degrees to be normalized.
+from trigo_core import (
+    approximate_sin,
+    approximate_cos,
+    approximate_tan,
+    approximate_cot,
+    approximate_sec,
+    approximate_csc,
+    approximate_all,
+    approximate_sin_batch,
+    approximate_cos_batch,
+    approximate_tan_batch,
+    approximate_cot_batch,
+    approximate_sec_batch,
+    approximate_csc_batch,
+    MODE_CHEBYSHEV,
+    MODE_LINEAR_TABLE,
+    MODE_CUBIC_TABLE,
+    PRECISION_DEFAULT,
+    PRECISION_LOW,
+    PRECISION_MEDIUM,
+    PRECISION_HIGH,
+    TrigApproximation,
+    SinTable,
+    PrecisionTiers,
+    QuantizedLRUCache,
+    PhaseAccumulator,
+    compile_graph,
+)
+
+# Number of lookup table intervals; read once when the plugin is loaded
+TABLE_RESOLUTION = int(os.environ.get("TRIGO_TABLE_RESOLUTION", 1024))
+
+# Shared lookup table; its samples are computed on the first table-mode evaluation
+SIN_TABLE = SinTable(TABLE_RESOLUTION)
+
+# Fitted Chebyshev series per precision level, each fitted on first use
+PRECISION_TIERS = PrecisionTiers()
+
+# Size and quantization step (degrees) of the evaluation cache; read once when the plugin is loaded
+CACHE_SIZE = int(os.environ.get("TRIGO_CACHE_SIZE", 4096))
+CACHE_QUANTUM = float(os.environ.get("TRIGO_CACHE_QUANTUM", 1e-4))
+
+# Evaluation cache shared by every node with useCache on, built in initializePlugin
+EVAL_CACHE = None
+
+def create_mode_attribute():
+    """
+    Create the enum attribute that selects the evaluation engine of a trigonometric node.
 
     Returns:
-    float: The normalized angle in the range [-180, 180] degrees.
-    """
-    # Normalize the angle to the range [0, 360) degrees
-    normalized_ang_in_deg = ang_in_deg % 360
-    
-    # Adjust to the range [-180, 180] degrees
-    if normalized_ang_in_deg > 180:
-        return normalized_ang_in_deg - 360
-    elif normalized_ang_in_deg < -180:
-        return normalized_ang_in_deg + 360
-    else:
-        return normalized_ang_in_deg
-
-def chev_poly(x):
+    MObject: The "mode" enum attribute.
     """
-    Evaluate the Chebyshev polynomial of the first kind of degree 5.
-
-    Parameters:
-    x (float): The input value for the Chebyshev polynomial.
+    enumAttr = om.MFnEnumAttribute()
+    modeAttr = enumAttr.create("mode", "md", MODE_CHEBYSHEV)
+    enumAttr.addField("chebyshev", MODE_CHEBYSHEV)
+    enumAttr.addField("linearTable", MODE_LINEAR_TABLE)
+    enumAttr.addField("cubicTable", MODE_CUBIC_TABLE)
+    enumAttr.setKeyable(True)
+    enumAttr.setStorable(True)
+    return modeAttr
 
-    Returns:
-    float: The evaluated Chebyshev polynomial value.
-    """
-    # Coefficients for the Chebyshev polynomial of degree 5
-    C0 = 1.276278962
-    C1 = -0.285261569
-    C2 = 0.009118016
-    C3 = -0.000136587
-    C4 = 0.000001185
-    C5 = -0.000000007
-
-    # Calculate Chebyshev polynomial terms
-    T0 = 1
-    T1 = x
-    T2 = (2 * x ** 2 - 1)
-    T3 = (4 * x ** 3 - 3 * x)
-    T4 = (8 * x ** 4 - 8 * x ** 2 + 1)
-    T5 = (16 * x ** 5 - 20 * x ** 3 + 5 * x)
-
-    # Evaluate the polynomial using the coefficients
-    return float(C0 * T0 + C1 * T1 + C2 * T2 + C3 * T3 + C4 * T4 + C5 * T5)
-
-def approximate_sin(ang_in_deg):
+def create_precision_attribute():
     """
-    Compute the sine of an angle given in degrees using Chebyshev polynomial approximation.
-
-    Parameters:
-    ang_in_deg (float): The angle in degrees for which to compute the sine.
+    Create the enum attribute that selects the fitted Chebyshev tier used in chebyshev mode.
 
     Returns:
-    float: The sine of the angle, rounded to six decimal places.
-    """
-    # Normalize the angle
-    value = adjust_phase(ang_in_deg)
-    
-    # Convert angle to range [-1, 1] for polynomial evaluation
-    x = value / 360
-    
-    # Compute intermediate values for Chebyshev polynomial
-    w = 4 * x
-    z = 2 * w * w - 1
-    
-    # Compute the sine value using the Chebyshev polynomial
-    result = chev_poly(z) * w
-    
-    # Round the result to six decimal places
-    return float(round(result, 6))
-
-def approximate_cos(ang_in_deg):
+    MObject: The "precision" enum attribute.
     """
-    Compute the cosine of an angle given in degrees based on its sine value.
+    enumAttr = om.MFnEnumAttribute()
+    precisionAttr = enumAttr.create("precision", "pr", PRECISION_DEFAULT)
+    enumAttr.addField("default", PRECISION_DEFAULT)
+    enumAttr.addField("low", PRECISION_LOW)
+    enumAttr.addField("medium", PRECISION_MEDIUM)
+    enumAttr.addField("high", PRECISION_HIGH)
+    enumAttr.setKeyable(True)
+    enumAttr.setStorable(True)
+    return precisionAttr
 
-    Parameters:
-    ang_in_deg (float): The angle in degrees for which to compute the cosine.
-
-    Returns:
-    float: The cosine of the angle, rounded to six decimal places.
+def create_cache_attribute():
     """
-    # Determine the sign of the cosine based on the quadrant
-    quad_sign = 1
-    if (90 <= ang_in_deg <= 270) or (-270 <= ang_in_deg <= -90):
-        quad_sign = -1
-    
-    # Calculate the cosine value from the relation cos(x)^2 + sin(x)^2 = 1
-    result = (1 - approximate_sin(ang_in_deg) ** 2) ** 0.5
-    
-    # Return the result with the appropriate sign and rounded to six decimal places
-    return float(round(quad_sign * result, 6))
-
-def approximate_tan(ang_in_deg):
-    """
-    Compute the tangent of an angle given in degrees.
-
-    Parameters:
-    ang_in_deg (float): The angle in degrees for which to compute the tangent.
+    Create the boolean attribute that routes a node's evaluation through the shared cache.
 
     Returns:
-    float: The tangent of the angle, rounded to six decimal places, or 'UNDEFINED' if the cosine of the angle is zero.
+    MObject: The "useCache" attribute.
     """
-    # Compute cosine and check for undefined tangent
-    cos_val = approximate_cos(ang_in_deg)
-    if cos_val == 0:
-        return -9999999  # Represents undefined tangent
-    
-    # Compute the tangent value tan(x)=sin(x)/cos(x) and round to six decimal places
-    return float(round(approximate_sin(ang_in_deg) / cos_val, 6))
-
-def approximate_cot(ang_in_deg):
-    """
-    Compute the cotangent of an angle given in degrees.
-
-    Parameters:
-    ang_in_deg (float): The angle in degrees for which to compute the cotangent.
-
-    Returns:
-    float: The cotangent of the angle, rounded to six decimal places, or 'UNDEFINED' if the tangent of the angle is zero or undefined.
-    """
-    # Compute tangent and check for undefined cotangent
-    tan_val = approximate_tan(ang_in_deg)
-    if tan_val == -9999999 or tan_val == 0:
-        return -9999999  # Represents undefined cotangent
-    
-    # Compute the cotangent value cot(x)=1/tan(x) and round to six decimal places
-    return float(round(1 / tan_val, 6))
-    
-def approximate_sec(ang_in_deg):
-    """
-    Compute the secant of an angle given in degrees.
-
-    Parameters:
-    ang_in_deg (float): The angle in degrees for which to compute the secant.
-
-    Returns:
-    float: The secant of the angle, rounded to six decimal places, or 'UNDEFINED' if the cosine of the angle is zero.
-    """
-    # Compute cosine and check for undefined secant
-    cos_val = approximate_cos(ang_in_deg)
-    if cos_val == 0:
-        return -9999999  # Represents undefined secant
-    
-    # Compute the secant value sec(x)=1/cos(x) and round to six decimal places
-    return float(round(1 / cos_val, 6))
-
-def approximate_csc(ang_in_deg):
-    """
-    Compute the cosecant of an angle given in degrees.
-
-    Parameters:
-    ang_in_deg (float): The angle in degrees for which to compute the cosecant.
-
-    Returns:
-    float: The cosecant of the angle, rounded to six decimal places, or 'UNDEFINED' if the sine of the angle is zero.
-    """
-    # Compute sine and check for undefined cosecant
-    sin_val = approximate_sin(ang_in_deg)
-    if sin_val == 0:
-        return -9999999  # Represents undefined cosecant
-    
-    # Compute the cosecant value csc(x)=1/sin(x) and round to six decimal places
-    return float(round(1 / sin_val, 6))
+    numericAttr = om.MFnNumericAttribute()
+    useCacheAttr = numericAttr.create("useCache", "uc", om.MFnNumericData.kBoolean, False)
+    numericAttr.setKeyable(True)
+    numericAttr.setStorable(True)
+    return useCacheAttr
 
 # Base class for trigonometric nodes
 class BaseTrigoNode(ommpx.MPxNode):
@@ -178,9 +103,24 @@ class BaseTrigoNode(ommpx.MPxNode):
     Attributes:
     inputAttr (MObject): The input attribute for the angle in degrees.
     outputAttr (MObject): The output attribute for the computed trigonometric function.
+    modeAttr (MObject): The enum attribute selecting the Chebyshev or lookup table engine.
+    useCacheAttr (MObject): The boolean attribute enabling the shared evaluation cache.
+    precisionAttr (MObject): The enum attribute selecting the fitted Chebyshev tier.
+    kNodeName (node name): Unique name for the node, set by subclasses.
+    kNodeId (MTypeId): Unique ID for the node, set by subclasses.
+    kChebyshevFunction (staticmethod): The default approximation, e.g. approximate_sin.
+    kEngineFunction (staticmethod): The matching TrigApproximation method, e.g. TrigApproximation.sin.
     """
     inputAttr = om.MObject()
     outputAttr = om.MObject()
+    modeAttr = om.MObject()
+    useCacheAttr = om.MObject()
+    precisionAttr = om.MObject()
+
+    kNodeName = None
+    kNodeId = None
+    kChebyshevFunction = None
+    kEngineFunction = None
 
     def __init__(self):
         """
@@ -188,6 +128,39 @@ class BaseTrigoNode(ommpx.MPxNode):
         """
         super(BaseTrigoNode, self).__init__()
 
+    @classmethod
+    def initialize(cls):
+        BaseTrigoNode.initializeAttributes(cls)
+
+    @classmethod
+    def creator(cls):
+        """
+        Creator method to be used by Maya to create an instance of the node.
+        """
+        return cls()
+
+    def compute(self, plug, dataBlock):
+        """
+        Compute the node's function of the input angle and output the result.
+
+        Parameters:
+        plug (MPlug): The plug that is being evaluated.
+        dataBlock (MDataBlock): The data block containing the input/output data handles.
+        """
+        cls = type(self)
+        if plug == cls.outputAttr:
+            inputValue = dataBlock.inputValue(cls.inputAttr).asFloat()
+            mode = dataBlock.inputValue(cls.modeAttr).asShort()
+            useCache = dataBlock.inputValue(cls.useCacheAttr).asBool()
+            precision = dataBlock.inputValue(cls.precisionAttr).asShort()
+            result = BaseTrigoNode.evaluate(mode, inputValue, cls.kChebyshevFunction, cls.kEngineFunction, useCache, precision)
+            outputHandle = dataBlock.outputValue(cls.outputAttr)
+            outputHandle.setFloat(result)
+            outputHandle.setClean()
+        else:
+            return om.kUnknownParameter
+        return None  # Important: Returning None for successful completion
+
     @staticmethod
     def initializeAttributes(cls):
         """
@@ -202,88 +175,131 @@ class BaseTrigoNode(ommpx.MPxNode):
         numericAttr.setWritable(False)
         numericAttr.setStorable(False)
 
+        cls.modeAttr = create_mode_attribute()
+        cls.useCacheAttr = create_cache_attribute()
+        cls.precisionAttr = create_precision_attribute()
+
         cls.addAttribute(cls.inputAttr)
         cls.addAttribute(cls.outputAttr)
+        cls.addAttribute(cls.modeAttr)
+        cls.addAttribute(cls.useCacheAttr)
+        cls.addAttribute(cls.precisionAttr)
         cls.attributeAffects(cls.inputAttr, cls.outputAttr)
-
-# Custom nodes for each trigonometric function
-class SinNode(BaseTrigoNode):
-    """
-    Custom node to compute the sine of an angle.
-
-    Attributes:
-    kNodeName (node name): Unique name for the node.
-    kNodeId (MTypeId): Unique ID for the node.
-    """
-    kNodeName = "sinNode"
-    kNodeId = om.MTypeId(0x78000)  # Replace with a unique ID
-
-    def __init__(self):
-        super(SinNode, self).__init__()
+        cls.attributeAffects(cls.modeAttr, cls.outputAttr)
+        cls.attributeAffects(cls.useCacheAttr, cls.outputAttr)
+        cls.attributeAffects(cls.precisionAttr, cls.outputAttr)
 
     @staticmethod
-    def initialize():
-        BaseTrigoNode.initializeAttributes(SinNode)
-
-    def compute(self, plug, dataBlock):
+    def evaluate(mode, inputValue, chebyshevFunc, engineFunc, useCache=False, precision=PRECISION_DEFAULT):
         """
-        Compute the sine of the input angle and output the result.
+        Evaluate a trigonometric function with the engine selected by the mode and precision attributes.
 
         Parameters:
-        plug (MPlug): The plug that is being evaluated.
-        dataBlock (MDataBlock): The data block containing the input/output data handles.
+        mode (int): One of MODE_CHEBYSHEV, MODE_LINEAR_TABLE or MODE_CUBIC_TABLE.
+        inputValue (float): The angle in degrees.
+        chebyshevFunc (callable): The default polynomial approximation, e.g. approximate_sin.
+        engineFunc (callable): The matching unbound TrigApproximation method, e.g. TrigApproximation.sin.
+        useCache (bool): Serve repeated (quantized) angles from the shared EVAL_CACHE.
+        precision (int): PRECISION_DEFAULT or a fitted tier; only used in chebyshev mode.
+
+        Returns:
+        float: The computed value.
         """
-        if plug == SinNode.outputAttr:
-            inputValue = dataBlock.inputValue(SinNode.inputAttr).asFloat()
-            result = approximate_sin(inputValue)
-            outputHandle = dataBlock.outputValue(SinNode.outputAttr)
-            outputHandle.setFloat(result)
-            outputHandle.setClean()
+        if mode == MODE_CHEBYSHEV and precision == PRECISION_DEFAULT:
+            if useCache:
+                return EVAL_CACHE.lookup(chebyshevFunc, inputValue, chebyshevFunc)
+            return chebyshevFunc(inputValue)
+
+        if mode == MODE_CHEBYSHEV:
+            engine = PRECISION_TIERS[precision]
+            interpolation = None
         else:
-            return om.kUnknownParameter
-        return None  # Important: Returning None for successful completion
-
-    @staticmethod
-    def creator():
-        """
-        Creator method to be used by Maya to create an instance of the node.
-        """
-        return SinNode()
+            engine = SIN_TABLE
+            interpolation = SinTable.CUBIC if mode == MODE_CUBIC_TABLE else SinTable.LINEAR
+        if useCache:
+            return EVAL_CACHE.lookup((engineFunc, engine, interpolation), inputValue,
+                                     lambda angle: engineFunc(engine, angle, interpolation))
+        return engineFunc(engine, inputValue, interpolation)
 
-class CosNode(BaseTrigoNode):
+class TrigoNode(ommpx.MPxNode):
     """
-    Custom node to compute the cosine of an angle.
+    Custom node that computes all six trigonometric functions of one angle.
+
+    The polynomial is evaluated once per input change and every output is written
+    and marked clean in the same compute, so pulling the remaining outputs does not
+    trigger another evaluation.
 
     Attributes:
     kNodeName (node name): Unique name for the node.
     kNodeId (MTypeId): Unique ID for the node.
+    inputAttr (MObject): The input attribute for the angle in degrees.
+    outputAttrs (list): The sin, cos, tan, cot, sec and csc output attributes, in that order.
+    modeAttr (MObject): The enum attribute selecting the Chebyshev or lookup table engine.
+    useCacheAttr (MObject): The boolean attribute enabling the shared evaluation cache.
+    precisionAttr (MObject): The enum attribute selecting the fitted Chebyshev tier.
     """
-    kNodeName = "cosNode"
-    kNodeId = om.MTypeId(0x78001)  # Replace with a unique ID
+    kNodeName = "trigoNode"
+    kNodeId = om.MTypeId(0x78006)  # Replace with a unique ID
+    kOutputNames = ("sin", "cos", "tan", "cot", "sec", "csc")
+
+    inputAttr = om.MObject()
+    outputAttrs = []
+    modeAttr = om.MObject()
+    useCacheAttr = om.MObject()
+    precisionAttr = om.MObject()
 
     def __init__(self):
-        super(CosNode, self).__init__()
+        super(TrigoNode, self).__init__()
 
     @staticmethod
     def initialize():
-        BaseTrigoNode.initializeAttributes(CosNode)
+        numericAttr = om.MFnNumericAttribute()
+        TrigoNode.inputAttr = numericAttr.create("input", "in", om.MFnNumericData.kFloat, 0.0)
+        numericAttr.setWritable(True)
+        numericAttr.setStorable(True)
+        TrigoNode.addAttribute(TrigoNode.inputAttr)
+
+        TrigoNode.modeAttr = create_mode_attribute()
+        TrigoNode.addAttribute(TrigoNode.modeAttr)
+
+        TrigoNode.useCacheAttr = create_cache_attribute()
+        TrigoNode.addAttribute(TrigoNode.useCacheAttr)
+
+        TrigoNode.precisionAttr = create_precision_attribute()
+        TrigoNode.addAttribute(TrigoNode.precisionAttr)
+
+        TrigoNode.outputAttrs = []
+        for name in TrigoNode.kOutputNames:
+            outputAttr = numericAttr.create(name, name, om.MFnNumericData.kFloat, 0.0)
+            numericAttr.setWritable(False)
+            numericAttr.setStorable(False)
+            TrigoNode.addAttribute(outputAttr)
+            TrigoNode.attributeAffects(TrigoNode.inputAttr, outputAttr)
+            TrigoNode.attributeAffects(TrigoNode.modeAttr, outputAttr)
+            TrigoNode.attributeAffects(TrigoNode.useCacheAttr, outputAttr)
+            TrigoNode.attributeAffects(TrigoNode.precisionAttr, outputAttr)
+            TrigoNode.outputAttrs.append(outputAttr)
 
     def compute(self, plug, dataBlock):
         """
-        Compute the cosine of the input angle and output the result.
+        Compute every trigonometric output of the input angle in a single evaluation.
 
         Parameters:
         plug (MPlug): The plug that is being evaluated.
         dataBlock (MDataBlock): The data block containing the input/output data handles.
         """
-        if plug == CosNode.outputAttr:
-            inputValue = dataBlock.inputValue(CosNode.inputAttr).asFloat()
-            result = approximate_cos(inputValue)
-            outputHandle = dataBlock.outputValue(CosNode.outputAttr)
+        if plug.attribute() not in TrigoNode.outputAttrs:
+            return om.kUnknownParameter
+
+        inputValue = dataBlock.inputValue(TrigoNode.inputAttr).asFloat()
+        mode = dataBlock.inputValue(TrigoNode.modeAttr).asShort()
+        useCache = dataBlock.inputValue(TrigoNode.useCacheAttr).asBool()
+        precision = dataBlock.inputValue(TrigoNode.precisionAttr).asShort()
+        results = BaseTrigoNode.evaluate(mode, inputValue, approximate_all, TrigApproximation.all, useCache, precision)
+        for outputAttr, result in zip(TrigoNode.outputAttrs, results):
+            outputHandle = dataBlock.outputValue(outputAttr)
             outputHandle.setFloat(result)
             outputHandle.setClean()
-        else:
-            return om.kUnknownParameter
         return None  # Important: Returning None for successful completion
 
     @staticmethod
@@ -291,84 +307,235 @@ class CosNode(BaseTrigoNode):
         """
         Creator method to be used by Maya to create an instance of the node.
         """
-        return CosNode()
+        return TrigoNode()
+
+def create_double_array_attribute(longName, shortName, writable):
+    """
+    Create a doubleArray typed attribute with an empty default.
+
+    Parameters:
+    longName (str): Long attribute name.
+    shortName (str): Short attribute name.
+    writable (bool): True for inputs, False for computed outputs.
 
+    Returns:
+    MObject: The attribute.
+    """
+    typedAttr = om.MFnTypedAttribute()
+    attr = typedAttr.create(longName, shortName, om.MFnData.kDoubleArray, om.MFnDoubleArrayData().create(om.MDoubleArray()))
+    typedAttr.setWritable(writable)
+    typedAttr.setStorable(writable)
+    return attr
 
-class TanNode(BaseTrigoNode):
+def read_double_array(dataBlock, attr):
+    """
+    Read a doubleArray input attribute into a Python list.
     """
-    Custom node to compute the tan of an angle.
+    values = om.MFnDoubleArrayData(dataBlock.inputValue(attr).data()).array()
+    return [values[i] for i in range(values.length())]
+
+def write_double_array(dataBlock, attr, values):
+    """
+    Write a sequence of numbers to a doubleArray output attribute and mark it clean.
+    """
+    outputArray = om.MDoubleArray()
+    for value in values:
+        outputArray.append(float(value))
+
+    outputHandle = dataBlock.outputValue(attr)
+    outputHandle.setMObject(om.MFnDoubleArrayData().create(outputArray))
+    outputHandle.setClean()
+
+# Base class for array trigonometric nodes
+class BaseTrigoArrayNode(ommpx.MPxNode):
+    """
+    Base class for nodes that evaluate a trigonometric function over an array of angles.
+
+    The whole doubleArray input is evaluated in one vectorized pass of the matching batch
+    function, so a single compute replaces one scalar node per angle.
 
     Attributes:
-    kNodeName (node name): Unique name for the node.
-    kNodeId (MTypeId): Unique ID for the node.
+    inputAttr (MObject): The doubleArray input of angles in degrees.
+    outputAttr (MObject): The doubleArray output of computed values.
+    kNodeName (node name): Unique name for the node, set by subclasses.
+    kNodeId (MTypeId): Unique ID for the node, set by subclasses.
+    kBatchFunction (staticmethod): The batch function evaluated by compute, e.g. approximate_sin_batch.
     """
-    kNodeName = "tanNode"
-    kNodeId = om.MTypeId(0x78002)  # Replace with a unique ID
+    inputAttr = om.MObject()
+    outputAttr = om.MObject()
+
+    kNodeName = None
+    kNodeId = None
+    kBatchFunction = None
 
     def __init__(self):
-        super(TanNode, self).__init__()
+        """
+        Initialize the BaseTrigoArrayNode by calling the parent constructor.
+        """
+        super(BaseTrigoArrayNode, self).__init__()
+
+    @classmethod
+    def initialize(cls):
+        BaseTrigoArrayNode.initializeAttributes(cls)
+
+    @classmethod
+    def creator(cls):
+        """
+        Creator method to be used by Maya to create an instance of the node.
+        """
+        return cls()
 
     @staticmethod
-    def initialize():
-        BaseTrigoNode.initializeAttributes(TanNode)
+    def initializeAttributes(cls):
+        """
+        Initialize the doubleArray input and output attributes for array trigonometric nodes.
+        """
+        cls.inputAttr = create_double_array_attribute("input", "in", True)
+        cls.outputAttr = create_double_array_attribute("output", "out", False)
+
+        cls.addAttribute(cls.inputAttr)
+        cls.addAttribute(cls.outputAttr)
+        cls.attributeAffects(cls.inputAttr, cls.outputAttr)
 
     def compute(self, plug, dataBlock):
         """
-        Compute the tangent of the input angle and output the result.
+        Evaluate the batch function over the input array and write the output array.
 
         Parameters:
         plug (MPlug): The plug that is being evaluated.
         dataBlock (MDataBlock): The data block containing the input/output data handles.
         """
-        if plug == TanNode.outputAttr:
-            inputValue = dataBlock.inputValue(TanNode.inputAttr).asFloat()
-            result = approximate_tan(inputValue)
-            outputHandle = dataBlock.outputValue(TanNode.outputAttr)
-            outputHandle.setFloat(result)
-            outputHandle.setClean()
+        cls = type(self)
+        if plug == cls.outputAttr:
+            angles = read_double_array(dataBlock, cls.inputAttr)
+            write_double_array(dataBlock, cls.outputAttr, cls.kBatchFunction(angles))
         else:
             return om.kUnknownParameter
         return None  # Important: Returning None for successful completion
 
-    @staticmethod
-    def creator():
-        """
-        Creator method to be used by Maya to create an instance of the node.
-        """
-        return TanNode()
+# Single-function nodes, generated from one spec per function
+TRIG_FUNCTION_SPECS = (
+    # (name, description, scalar function, batch function, node id, array node id)
+    ("sin", "sine", approximate_sin, approximate_sin_batch, 0x78000, 0x78007),
+    ("cos", "cosine", approximate_cos, approximate_cos_batch, 0x78001, 0x78008),
+    ("tan", "tangent", approximate_tan, approximate_tan_batch, 0x78002, 0x78009),
+    ("cot", "cotangent", approximate_cot, approximate_cot_batch, 0x78003, 0x7800A),
+    ("sec", "secant", approximate_sec, approximate_sec_batch, 0x78004, 0x7800B),
+    ("csc", "cosecant", approximate_csc, approximate_csc_batch, 0x78005, 0x7800C),
+)
 
-class CotNode(BaseTrigoNode):
+def create_function_node_classes(spec):
     """
-    Custom node to compute the cot of an angle.
+    Create the scalar and array node classes for one entry of TRIG_FUNCTION_SPECS.
+
+    Parameters:
+    spec (tuple): (name, description, scalar function, batch function, node id, array node id).
+
+    Returns:
+    tuple: (scalar node class, array node class), e.g. (SinNode, SinArrayNode).
+    """
+    name, description, function, batchFunction, nodeId, arrayNodeId = spec
+    prefix = name.capitalize()
+
+    nodeClass = type(prefix + "Node", (BaseTrigoNode,), {
+        "__doc__": f"Custom node to compute the {description} of an angle.",
+        "kNodeName": name + "Node",
+        "kNodeId": om.MTypeId(nodeId),
+        "kChebyshevFunction": staticmethod(function),
+        "kEngineFunction": staticmethod(getattr(TrigApproximation, name)),
+    })
+    arrayNodeClass = type(prefix + "ArrayNode", (BaseTrigoArrayNode,), {
+        "__doc__": f"Custom node to compute the {description} of an array of angles.",
+        "kNodeName": name + "ArrayNode",
+        "kNodeId": om.MTypeId(arrayNodeId),
+        "kBatchFunction": staticmethod(batchFunction),
+    })
+    return nodeClass, arrayNodeClass
+
+FUNCTION_NODES = []
+ARRAY_NODES = []
+for _spec in TRIG_FUNCTION_SPECS:
+    _nodeClass, _arrayNodeClass = create_function_node_classes(_spec)
+    FUNCTION_NODES.append(_nodeClass)
+    ARRAY_NODES.append(_arrayNodeClass)
+    # Keep SinNode, SinArrayNode, ... available by name
+    globals()[_nodeClass.__name__] = _nodeClass
+    globals()[_arrayNodeClass.__name__] = _arrayNodeClass
+del _spec, _nodeClass, _arrayNodeClass
+
+class OscillatorNode(ommpx.MPxNode):
+    """
+    Custom node that drives many sine/cosine oscillators from time in one compute.
+
+    Oscillator i outputs amplitude[i] * sin(phase[i] + 360 * frequency[i] * time) on outSin and
+    the matching cosine on outCos, with time in seconds, frequency in Hz and phase in degrees.
+    Missing amplitude and phase entries default to 1 and 0. During regular playback each
+    sample is a rotation of the previous one (see PhaseAccumulator), which replaces the
+    time -> multiply -> sinNode/cosNode network and its per-frame phase wrapping and polynomial.
 
     Attributes:
     kNodeName (node name): Unique name for the node.
     kNodeId (MTypeId): Unique ID for the node.
-    """
-    kNodeName = "cotNode"
-    kNodeId = om.MTypeId(0x78003)  # Replace with a unique ID
+    timeAttr (MObject): The time input, usually connected from time1.outTime.
+    frequencyAttr (MObject): doubleArray of frequencies in Hz, one per oscillator.
+    amplitudeAttr (MObject): doubleArray of amplitudes.
+    phaseAttr (MObject): doubleArray of phase offsets in degrees.
+    outSinAttr (MObject): doubleArray sine output.
+    outCosAttr (MObject): doubleArray cosine output.
+    """
+    kNodeName = "oscillatorNode"
+    kNodeId = om.MTypeId(0x7800D)  # Replace with a unique ID
+
+    timeAttr = om.MObject()
+    frequencyAttr = om.MObject()
+    amplitudeAttr = om.MObject()
+    phaseAttr = om.MObject()
+    outSinAttr = om.MObject()
+    outCosAttr = om.MObject()
 
     def __init__(self):
-        super(CotNode, self).__init__()
+        super(OscillatorNode, self).__init__()
+        self.accumulator = PhaseAccumulator()
 
     @staticmethod
     def initialize():
-        BaseTrigoNode.initializeAttributes(CotNode)
+        unitAttr = om.MFnUnitAttribute()
+        OscillatorNode.timeAttr = unitAttr.create("time", "tm", om.MFnUnitAttribute.kTime, 0.0)
+        unitAttr.setWritable(True)
+        unitAttr.setStorable(True)
+
+        OscillatorNode.frequencyAttr = create_double_array_attribute("frequency", "fq", True)
+        OscillatorNode.amplitudeAttr = create_double_array_attribute("amplitude", "amp", True)
+        OscillatorNode.phaseAttr = create_double_array_attribute("phase", "ph", True)
+        OscillatorNode.outSinAttr = create_double_array_attribute("outSin", "osn", False)
+        OscillatorNode.outCosAttr = create_double_array_attribute("outCos", "ocs", False)
+
+        inputs = (OscillatorNode.timeAttr, OscillatorNode.frequencyAttr, OscillatorNode.amplitudeAttr, OscillatorNode.phaseAttr)
+        outputs = (OscillatorNode.outSinAttr, OscillatorNode.outCosAttr)
+        for attr in inputs + outputs:
+            OscillatorNode.addAttribute(attr)
+        for inputAttr in inputs:
+            for outputAttr in outputs:
+                OscillatorNode.attributeAffects(inputAttr, outputAttr)
 
     def compute(self, plug, dataBlock):
         """
-        Compute the cotangent of the input angle and output the result.
+        Advance the oscillators to the input time and write both outputs.
 
         Parameters:
         plug (MPlug): The plug that is being evaluated.
         dataBlock (MDataBlock): The data block containing the input/output data handles.
         """
-        if plug == CotNode.outputAttr:
-            inputValue = dataBlock.inputValue(CotNode.inputAttr).asFloat()
-            result = approximate_cot(inputValue)
-            outputHandle = dataBlock.outputValue(CotNode.outputAttr)
-            outputHandle.setFloat(result)
-            outputHandle.setClean()
+        if plug == OscillatorNode.outSinAttr or plug == OscillatorNode.outCosAttr:
+            time = dataBlock.inputValue(OscillatorNode.timeAttr).asTime().asUnits(om.MTime.kSeconds)
+            sinValues, cosValues = self.accumulator.evaluate(
+                time,
+                read_double_array(dataBlock, OscillatorNode.frequencyAttr),
+                read_double_array(dataBlock, OscillatorNode.amplitudeAttr),
+                read_double_array(dataBlock, OscillatorNode.phaseAttr),
+            )
+            write_double_array(dataBlock, OscillatorNode.outSinAttr, sinValues)
+            write_double_array(dataBlock, OscillatorNode.outCosAttr, cosValues)
         else:
             return om.kUnknownParameter
         return None  # Important: Returning None for successful completion
@@ -378,40 +545,100 @@ class CotNode(BaseTrigoNode):
         """
         Creator method to be used by Maya to create an instance of the node.
         """
-        return CotNode()
+        return OscillatorNode()
 
-class SecNode(BaseTrigoNode):
+class TrigoGraphNode(ommpx.MPxNode):
     """
-    Custom node to compute the sec of an angle.
+    Custom node that evaluates a collapsed network of trig and arithmetic nodes in one compute.
+
+    The network is stored as a JSON description on the "graph" attribute (see
+    trigo_core.compile_graph and trigo_graph.collapse_network). It is compiled once into a
+    single Python function and recompiled only when the description changes. External
+    sources feed the "input" multi and every value the network exposed is written to the
+    "output" multi in the same compute.
 
     Attributes:
     kNodeName (node name): Unique name for the node.
     kNodeId (MTypeId): Unique ID for the node.
+    graphAttr (MObject): String attribute holding the JSON network description.
+    inputAttr (MObject): Multi double input, one element per external source.
+    outputAttr (MObject): Multi double output, one element per exposed value.
     """
-    kNodeName = "secNode"
-    kNodeId = om.MTypeId(0x78004)  # Replace with a unique ID
+    kNodeName = "trigoGraphNode"
+    kNodeId = om.MTypeId(0x7800E)  # Replace with a unique ID
+
+    graphAttr = om.MObject()
+    inputAttr = om.MObject()
+    outputAttr = om.MObject()
 
     def __init__(self):
-        super(SecNode, self).__init__()
+        super(TrigoGraphNode, self).__init__()
+        self.graphSource = None
+        self.graphFunction = None
+        self.graphInputCount = 0
 
     @staticmethod
     def initialize():
-        BaseTrigoNode.initializeAttributes(SecNode)
+        typedAttr = om.MFnTypedAttribute()
+        TrigoGraphNode.graphAttr = typedAttr.create("graph", "gr", om.MFnData.kString)
+        typedAttr.setStorable(True)
+
+        numericAttr = om.MFnNumericAttribute()
+        TrigoGraphNode.inputAttr = numericAttr.create("input", "in", om.MFnNumericData.kDouble, 0.0)
+        numericAttr.setArray(True)
+        numericAttr.setStorable(True)
+
+        TrigoGraphNode.outputAttr = numericAttr.create("output", "out", om.MFnNumericData.kDouble, 0.0)
+        numericAttr.setArray(True)
+        numericAttr.setUsesArrayDataBuilder(True)
+        numericAttr.setWritable(False)
+        numericAttr.setStorable(False)
+
+        TrigoGraphNode.addAttribute(TrigoGraphNode.graphAttr)
+        TrigoGraphNode.addAttribute(TrigoGraphNode.inputAttr)
+        TrigoGraphNode.addAttribute(TrigoGraphNode.outputAttr)
+        TrigoGraphNode.attributeAffects(TrigoGraphNode.graphAttr, TrigoGraphNode.outputAttr)
+        TrigoGraphNode.attributeAffects(TrigoGraphNode.inputAttr, TrigoGraphNode.outputAttr)
 
     def compute(self, plug, dataBlock):
         """
-        Compute the secant of the input angle and output the result.
+        Evaluate the compiled network and write every output element.
 
         Parameters:
         plug (MPlug): The plug that is being evaluated.
         dataBlock (MDataBlock): The data block containing the input/output data handles.
         """
-        if plug == SecNode.outputAttr:
-            inputValue = dataBlock.inputValue(SecNode.inputAttr).asFloat()
-            result = approximate_sec(inputValue)
-            outputHandle = dataBlock.outputValue(SecNode.outputAttr)
-            outputHandle.setFloat(result)
-            outputHandle.setClean()
+        if plug.isElement():
+            plug = plug.array()
+        if plug == TrigoGraphNode.outputAttr:
+            graphSource = dataBlock.inputValue(TrigoGraphNode.graphAttr).asString()
+            if graphSource != self.graphSource:
+                self.graphSource = graphSource
+                self.graphFunction = None
+                self.graphInputCount = 0
+                if graphSource:
+                    try:
+                        description = json.loads(graphSource)
+                        self.graphFunction = compile_graph(description, SIN_TABLE, PRECISION_TIERS)[0]
+                        self.graphInputCount = len(description.get("inputs", []))
+                    except (ValueError, KeyError, TypeError) as e:
+                        om.MGlobal.displayError(f"Invalid trig graph on {self.name()}: {e}")
+
+            inputHandle = dataBlock.inputArrayValue(TrigoGraphNode.inputAttr)
+            inputs = {}
+            for i in range(inputHandle.elementCount()):
+                inputHandle.jumpToArrayElement(i)
+                inputs[inputHandle.elementIndex()] = inputHandle.inputValue().asDouble()
+            inputValues = [inputs.get(i, 0.0) for i in range(self.graphInputCount)]
+
+            results = self.graphFunction(inputValues) if self.graphFunction else []
+
+            outputHandle = dataBlock.outputArrayValue(TrigoGraphNode.outputAttr)
+            builder = outputHandle.builder()
+            for index, result in enumerate(results):
+                builder.addElement(index).setDouble(result)
+            outputHandle.set(builder)
+            outputHandle.setAllClean()
         else:
             return om.kUnknownParameter
         return None  # Important: Returning None for successful completion
@@ -421,65 +648,92 @@ class SecNode(BaseTrigoNode):
         """
         Creator method to be used by Maya to create an instance of the node.
         """
-        return SecNode()
+        return TrigoGraphNode()
 
-class CscNode(BaseTrigoNode):
+# Command to query and configure the shared evaluation cache
+class TrigoCacheCmd(ommpx.MPxCommand):
     """
-    Custom node to compute the csc of an angle.
+    Query, reset or reconfigure the evaluation cache shared by the trigonometric nodes.
 
-    Attributes:
-    kNodeName (node name): Unique name for the node.
-    kNodeId (MTypeId): Unique ID for the node.
+    Returns [hits, misses, entries, hitRate] after applying any flags:
+
+        cmds.trigoCache()                     # query the counters
+        cmds.trigoCache(reset=True)           # drop entries and reset the counters
+        cmds.trigoCache(maxSize=16384)        # change the number of cached entries
+        cmds.trigoCache(quantum=0.01)         # change the quantization step in degrees
     """
-    kNodeName = "cscNode"
-    kNodeId = om.MTypeId(0x78005)  # Replace with a unique ID
+    kCmdName = "trigoCache"
+    kResetFlag = ("-r", "-reset")
+    kMaxSizeFlag = ("-ms", "-maxSize")
+    kQuantumFlag = ("-qu", "-quantum")
 
     def __init__(self):
-        super(CscNode, self).__init__()
-
-    @staticmethod
-    def initialize():
-        BaseTrigoNode.initializeAttributes(CscNode)
+        super(TrigoCacheCmd, self).__init__()
 
-    def compute(self, plug, dataBlock):
+    def doIt(self, args):
         """
-        Compute the cosecant of the input angle and output the result.
+        Apply the flags and return the cache counters.
 
         Parameters:
-        plug (MPlug): The plug that is being evaluated.
-        dataBlock (MDataBlock): The data block containing the input/output data handles.
+        args (MArgList): The command arguments.
         """
-        if plug == CscNode.outputAttr:
-            inputValue = dataBlock.inputValue(CscNode.inputAttr).asFloat()
-            result = approximate_csc(inputValue)
-            outputHandle = dataBlock.outputValue(CscNode.outputAttr)
-            outputHandle.setFloat(result)
-            outputHandle.setClean()
-        else:
-            return om.kUnknownParameter
-        return None  # Important: Returning None for successful completion
+        argData = om.MArgDatabase(self.syntax(), args)
+
+        try:
+            if argData.isFlagSet(TrigoCacheCmd.kResetFlag[0]):
+                EVAL_CACHE.clear()
+            if argData.isFlagSet(TrigoCacheCmd.kMaxSizeFlag[0]):
+                EVAL_CACHE.resize(argData.flagArgumentInt(TrigoCacheCmd.kMaxSizeFlag[0], 0))
+            if argData.isFlagSet(TrigoCacheCmd.kQuantumFlag[0]):
+                EVAL_CACHE.set_quantum(argData.flagArgumentDouble(TrigoCacheCmd.kQuantumFlag[0], 0))
+        except ValueError as e:
+            om.MGlobal.displayError(str(e))
+            return
+
+        stats = EVAL_CACHE.stats()
+        result = om.MDoubleArray()
+        for key in ("hits", "misses", "entries", "hit_rate"):
+            result.append(stats[key])
+        self.setResult(result)
+
+    @staticmethod
+    def syntaxCreator():
+        """
+        Define the flags accepted by the command.
+        """
+        syntax = om.MSyntax()
+        syntax.addFlag(TrigoCacheCmd.kResetFlag[0], TrigoCacheCmd.kResetFlag[1])
+        syntax.addFlag(TrigoCacheCmd.kMaxSizeFlag[0], TrigoCacheCmd.kMaxSizeFlag[1], om.MSyntax.kLong)
+        syntax.addFlag(TrigoCacheCmd.kQuantumFlag[0], TrigoCacheCmd.kQuantumFlag[1], om.MSyntax.kDouble)
+        return syntax
 
     @staticmethod
     def creator():
         """
-        Creator method to be used by Maya to create an instance of the node.
+        Creator method to be used by Maya to create an instance of the command.
         """
-        return CscNode()
+        return TrigoCacheCmd()
+
+# Every node type registered by the plugin
+PLUGIN_NODES = FUNCTION_NODES + [TrigoNode] + ARRAY_NODES + [OscillatorNode, TrigoGraphNode]
 
 def initializePlugin(mobject):
     """
     Initialize the plugin by registering each custom node.
+
+    The lookup table and the precision tiers are built on first use, so loading the plugin
+    only registers the node types and the command.
     """
+    global EVAL_CACHE
     mplugin = ommpx.MFnPlugin(mobject)
 
+    EVAL_CACHE = QuantizedLRUCache(CACHE_SIZE, CACHE_QUANTUM)
+
     try:
         # Register each node with a unique ID
-        mplugin.registerNode(SinNode.kNodeName, SinNode.kNodeId, SinNode.creator, SinNode.initialize, ommpx.MPxNode.kDependNode)
-        mplugin.registerNode(CosNode.kNodeName, CosNode.kNodeId, CosNode.creator, CosNode.initialize, ommpx.MPxNode.kDependNode)
-        mplugin.registerNode(TanNode.kNodeName, TanNode.kNodeId, TanNode.creator, TanNode.initialize, ommpx.MPxNode.kDependNode)
-        mplugin.registerNode(CotNode.kNodeName, CotNode.kNodeId, CotNode.creator, CotNode.initialize, ommpx.MPxNode.kDependNode)
-        mplugin.registerNode(SecNode.kNodeName, SecNode.kNodeId, SecNode.creator, SecNode.initialize, ommpx.MPxNode.kDependNode)
-        mplugin.registerNode(CscNode.kNodeName, CscNode.kNodeId, CscNode.creator, CscNode.initialize, ommpx.MPxNode.kDependNode)
+        for nodeClass in PLUGIN_NODES:
+            mplugin.registerNode(nodeClass.kNodeName, nodeClass.kNodeId, nodeClass.creator, nodeClass.initialize, ommpx.MPxNode.kDependNode)
+        mplugin.registerCommand(TrigoCacheCmd.kCmdName, TrigoCacheCmd.creator, TrigoCacheCmd.syntaxCreator)
     except RuntimeError as e:
         om.MGlobal.displayError(f"Failed to register nodes: {e}")
 
@@ -490,11 +744,8 @@ def uninitializePlugin(mobject):
     mplugin = ommpx.MFnPlugin(mobject)
 
     try:
-        mplugin.deregisterNode(SinNode.kNodeId)
-        mplugin.deregisterNode(CosNode.kNodeId)
-        mplugin.deregisterNode(TanNode.kNodeId)
-        mplugin.deregisterNode(CotNode.kNodeId)
-        mplugin.deregisterNode(SecNode.kNodeId)
-        mplugin.deregisterNode(CscNode.kNodeId)
+        for nodeClass in PLUGIN_NODES:
+            mplugin.deregisterNode(nodeClass.kNodeId)
+        mplugin.deregisterCommand(TrigoCacheCmd.kCmdName)
     except RuntimeError as e:
-        om.MGlobal.displayError(f"Failed to deregister nodes: {e}")
\ No newline at end of file
+        om.MGlobal.displayError(f"Failed to deregister nodes: {e}")
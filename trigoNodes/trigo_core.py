@@ -0,0 +1,1198 @@
+import math
+import struct
+from array import array
+from collections import OrderedDict
+
+# NumPy is imported on the first batch call (see load_numpy), not at import time
+np = None
+_numpy_checked = False
+
+# Sentinel returned when a function is undefined for the given angle
+UNDEFINED = -9999999
+
+def adjust_phase(ang_in_deg):
+    """
+    Normalize an angle in degrees to the range [-180, 180].
+
+    Parameters:
+    ang_in_deg (float): The angle in degrees to be normalized.
+
+    Returns:
+    float: The normalized angle in the range [-180, 180] degrees.
+    """
+    # Normalize the angle to the range [0, 360) degrees
+    normalized_ang_in_deg = ang_in_deg % 360
+    
+    # Adjust to the range [-180, 180] degrees
+    if normalized_ang_in_deg > 180:
+        return normalized_ang_in_deg - 360
+    elif normalized_ang_in_deg < -180:
+        return normalized_ang_in_deg + 360
+    else:
+        return normalized_ang_in_deg
+
+# Coefficients of the degree 5 Chebyshev series used by chev_poly
+CHEV_COEFFICIENTS = (1.276278962, -0.285261569, 0.009118016, -0.000136587, 0.000001185, -0.000000007)
+
+def clenshaw(coefficients, x):
+    """
+    Evaluate a Chebyshev series sum(c[n] * T_n(x)) with the Clenshaw recurrence.
+
+    Costs two multiplies and two adds per coefficient and never forms the T_n terms or
+    any powers of x. Works on floats and on NumPy arrays alike.
+
+    Parameters:
+    coefficients (sequence of float): The series coefficients, c[0] first.
+    x (float or ndarray): The input value(s).
+
+    Returns:
+    float or ndarray: The value of the series.
+    """
+    b1 = 0.0
+    b2 = 0.0
+    two_x = 2 * x
+    for c in coefficients[:0:-1]:
+        b1, b2 = c + two_x * b1 - b2, b1
+    return coefficients[0] + x * b1 - b2
+
+def chev_poly(x):
+    """
+    Evaluate the Chebyshev polynomial of the first kind of degree 5.
+
+    Parameters:
+    x (float): The input value for the Chebyshev polynomial.
+
+    Returns:
+    float: The evaluated Chebyshev polynomial value.
+    """
+    return float(clenshaw(CHEV_COEFFICIENTS, x))
+
+def approximate_sin(ang_in_deg):
+    """
+    Compute the sine of an angle given in degrees using Chebyshev polynomial approximation.
+
+    Parameters:
+    ang_in_deg (float): The angle in degrees for which to compute the sine.
+
+    Returns:
+    float: The sine of the angle, rounded to six decimal places.
+    """
+    # Normalize the angle
+    value = adjust_phase(ang_in_deg)
+    
+    # Convert angle to range [-1, 1] for polynomial evaluation
+    x = value / 360
+    
+    # Compute intermediate values for Chebyshev polynomial
+    w = 4 * x
+    z = 2 * w * w - 1
+    
+    # Compute the sine value using the Chebyshev polynomial
+    result = chev_poly(z) * w
+    
+    # Round the result to six decimal places
+    return float(round(result, 6))
+
+def _quad_sign(ang_in_deg):
+    """
+    Return the sign (+1/-1) of the cosine for an angle based on its quadrant.
+    """
+    if (90 <= ang_in_deg <= 270) or (-270 <= ang_in_deg <= -90):
+        return -1
+    return 1
+
+def approximate_cos(ang_in_deg):
+    """
+    Compute the cosine of an angle given in degrees based on its sine value.
+
+    Parameters:
+    ang_in_deg (float): The angle in degrees for which to compute the cosine.
+
+    Returns:
+    float: The cosine of the angle, rounded to six decimal places.
+    """
+    # Determine the sign of the cosine based on the quadrant
+    quad_sign = _quad_sign(ang_in_deg)
+    
+    # Calculate the cosine value from the relation cos(x)^2 + sin(x)^2 = 1
+    result = (1 - approximate_sin(ang_in_deg) ** 2) ** 0.5
+    
+    # Return the result with the appropriate sign and rounded to six decimal places
+    return float(round(quad_sign * result, 6))
+
+def approximate_tan(ang_in_deg):
+    """
+    Compute the tangent of an angle given in degrees.
+
+    Parameters:
+    ang_in_deg (float): The angle in degrees for which to compute the tangent.
+
+    Returns:
+    float: The tangent of the angle, rounded to six decimal places, or 'UNDEFINED' if the cosine of the angle is zero.
+    """
+    # Compute cosine and check for undefined tangent
+    cos_val = approximate_cos(ang_in_deg)
+    if cos_val == 0:
+        return UNDEFINED  # Represents undefined tangent
+    
+    # Compute the tangent value tan(x)=sin(x)/cos(x) and round to six decimal places
+    return float(round(approximate_sin(ang_in_deg) / cos_val, 6))
+
+def approximate_cot(ang_in_deg):
+    """
+    Compute the cotangent of an angle given in degrees.
+
+    Parameters:
+    ang_in_deg (float): The angle in degrees for which to compute the cotangent.
+
+    Returns:
+    float: The cotangent of the angle, rounded to six decimal places, or 'UNDEFINED' if the tangent of the angle is zero or undefined.
+    """
+    # Compute tangent and check for undefined cotangent
+    tan_val = approximate_tan(ang_in_deg)
+    if tan_val == UNDEFINED or tan_val == 0:
+        return UNDEFINED  # Represents undefined cotangent
+    
+    # Compute the cotangent value cot(x)=1/tan(x) and round to six decimal places
+    return float(round(1 / tan_val, 6))
+    
+def approximate_sec(ang_in_deg):
+    """
+    Compute the secant of an angle given in degrees.
+
+    Parameters:
+    ang_in_deg (float): The angle in degrees for which to compute the secant.
+
+    Returns:
+    float: The secant of the angle, rounded to six decimal places, or 'UNDEFINED' if the cosine of the angle is zero.
+    """
+    # Compute cosine and check for undefined secant
+    cos_val = approximate_cos(ang_in_deg)
+    if cos_val == 0:
+        return UNDEFINED  # Represents undefined secant
+    
+    # Compute the secant value sec(x)=1/cos(x) and round to six decimal places
+    return float(round(1 / cos_val, 6))
+
+def approximate_csc(ang_in_deg):
+    """
+    Compute the cosecant of an angle given in degrees.
+
+    Parameters:
+    ang_in_deg (float): The angle in degrees for which to compute the cosecant.
+
+    Returns:
+    float: The cosecant of the angle, rounded to six decimal places, or 'UNDEFINED' if the sine of the angle is zero.
+    """
+    # Compute sine and check for undefined cosecant
+    sin_val = approximate_sin(ang_in_deg)
+    if sin_val == 0:
+        return UNDEFINED  # Represents undefined cosecant
+    
+    # Compute the cosecant value csc(x)=1/sin(x) and round to six decimal places
+    return float(round(1 / sin_val, 6))
+
+def approximate_all(ang_in_deg):
+    """
+    Compute all six trigonometric functions of an angle from a single polynomial evaluation.
+
+    The sine is evaluated once and every other function is derived from it, giving the
+    same values as calling approximate_sin ... approximate_csc one after another.
+
+    Parameters:
+    ang_in_deg (float): The angle in degrees.
+
+    Returns:
+    tuple: (sin, cos, tan, cot, sec, csc), each rounded to six decimal places or UNDEFINED.
+    """
+    sin_val = approximate_sin(ang_in_deg)
+    cos_val = float(round(_quad_sign(ang_in_deg) * (1 - sin_val ** 2) ** 0.5, 6))
+
+    if cos_val == 0:
+        tan_val = UNDEFINED
+        sec_val = UNDEFINED
+    else:
+        tan_val = float(round(sin_val / cos_val, 6))
+        sec_val = float(round(1 / cos_val, 6))
+
+    if tan_val == UNDEFINED or tan_val == 0:
+        cot_val = UNDEFINED
+    else:
+        cot_val = float(round(1 / tan_val, 6))
+
+    csc_val = UNDEFINED if sin_val == 0 else float(round(1 / sin_val, 6))
+
+    return sin_val, cos_val, tan_val, cot_val, sec_val, csc_val
+
+# Evaluation modes selectable through the "mode" attribute of the nodes
+MODE_CHEBYSHEV = 0
+MODE_LINEAR_TABLE = 1
+MODE_CUBIC_TABLE = 2
+
+# Approximation engines
+
+class TrigApproximation(object):
+    """
+    Base class for sine approximations that derives the other five functions from sine.
+
+    Subclasses implement _lookup(ang_in_deg, interpolation), returning the unrounded sine of
+    any angle in degrees. Cosine is read with a 90 degree offset so its sign is always right,
+    and tan, cot, sec and csc follow from sine and cosine with the same rounding and
+    UNDEFINED rules as approximate_tan ... approximate_csc.
+    """
+
+    def _lookup(self, ang_in_deg, interpolation):
+        raise NotImplementedError
+
+    def sin(self, ang_in_deg, interpolation=None):
+        """
+        Compute the sine of an angle given in degrees from the approximation.
+
+        Parameters:
+        ang_in_deg (float): The angle in degrees.
+        interpolation (int, optional): Passed to _lookup; SinTable.LINEAR or SinTable.CUBIC for tables.
+
+        Returns:
+        float: The sine of the angle, rounded to six decimal places.
+        """
+        return float(round(self._lookup(ang_in_deg, interpolation), 6))
+
+    def cos(self, ang_in_deg, interpolation=None):
+        """
+        Compute the cosine of an angle given in degrees from the approximation.
+
+        Returns:
+        float: The cosine of the angle, rounded to six decimal places.
+        """
+        return float(round(self._lookup(ang_in_deg + 90, interpolation), 6))
+
+    def tan(self, ang_in_deg, interpolation=None):
+        """
+        Compute the tangent of an angle given in degrees from the approximation.
+
+        Returns:
+        float: The tangent, rounded to six decimal places, or UNDEFINED if the cosine is zero.
+        """
+        cos_val = self.cos(ang_in_deg, interpolation)
+        if cos_val == 0:
+            return UNDEFINED
+        return float(round(self.sin(ang_in_deg, interpolation) / cos_val, 6))
+
+    def cot(self, ang_in_deg, interpolation=None):
+        """
+        Compute the cotangent of an angle given in degrees from the approximation.
+
+        Returns:
+        float: The cotangent, rounded to six decimal places, or UNDEFINED if the tangent is zero or undefined.
+        """
+        return self.all(ang_in_deg, interpolation)[3]
+
+    def sec(self, ang_in_deg, interpolation=None):
+        """
+        Compute the secant of an angle given in degrees from the approximation.
+
+        Returns:
+        float: The secant, rounded to six decimal places, or UNDEFINED if the cosine is zero.
+        """
+        cos_val = self.cos(ang_in_deg, interpolation)
+        return UNDEFINED if cos_val == 0 else float(round(1 / cos_val, 6))
+
+    def csc(self, ang_in_deg, interpolation=None):
+        """
+        Compute the cosecant of an angle given in degrees from the approximation.
+
+        Returns:
+        float: The cosecant, rounded to six decimal places, or UNDEFINED if the sine is zero.
+        """
+        sin_val = self.sin(ang_in_deg, interpolation)
+        return UNDEFINED if sin_val == 0 else float(round(1 / sin_val, 6))
+
+    def all(self, ang_in_deg, interpolation=None):
+        """
+        Compute all six trigonometric functions of an angle from two lookups.
+
+        Returns:
+        tuple: (sin, cos, tan, cot, sec, csc), each rounded to six decimal places or UNDEFINED.
+        """
+        sin_val = self.sin(ang_in_deg, interpolation)
+        cos_val = self.cos(ang_in_deg, interpolation)
+
+        if cos_val == 0:
+            tan_val = UNDEFINED
+            sec_val = UNDEFINED
+        else:
+            tan_val = float(round(sin_val / cos_val, 6))
+            sec_val = float(round(1 / cos_val, 6))
+
+        if tan_val == UNDEFINED or tan_val == 0:
+            cot_val = UNDEFINED
+        else:
+            cot_val = float(round(1 / tan_val, 6))
+
+        csc_val = UNDEFINED if sin_val == 0 else float(round(1 / sin_val, 6))
+
+        return sin_val, cos_val, tan_val, cot_val, sec_val, csc_val
+
+# Lookup-table evaluation
+
+class SinTable(TrigApproximation):
+    """
+    Precomputed sine table over one period, evaluated with linear or cubic Hermite interpolation.
+
+    The table stores `resolution + 1` samples of sin and of its derivative (scaled to one
+    step) as C doubles, so a 1024 entry table takes 16 KB. The samples are computed on the
+    first lookup. Each lookup costs one modulo,
+    one index and a handful of multiply-adds instead of the full Chebyshev polynomial.
+
+    With a step of h = 2*pi / resolution radians the interpolation error before rounding is
+    bounded by h**2 / 8 for linear and h**4 / 384 for cubic Hermite interpolation, e.g.
+    4.7e-6 and 3.7e-12 for the default resolution of 1024.
+
+    Attributes:
+    resolution (int): Number of table intervals over 360 degrees.
+    step (float): Width of one table interval in degrees.
+    values (array): Sine samples at every interval boundary, or None until built.
+    slopes (array): Derivative samples multiplied by the interval width in radians, or None until built.
+    """
+    LINEAR = 0
+    CUBIC = 1
+
+    def __init__(self, resolution=1024):
+        """
+        Build the table.
+
+        Parameters:
+        resolution (int): Number of table intervals over 360 degrees.
+        """
+        if resolution < 4:
+            raise ValueError("SinTable resolution must be at least 4, got {}".format(resolution))
+
+        self.resolution = int(resolution)
+        self.step = 360.0 / self.resolution
+        self.values = None
+        self.slopes = None
+
+    def build(self):
+        """
+        Fill the sample arrays. Called by the first lookup, so an unused table costs nothing.
+        """
+        step_rad = 2 * math.pi / self.resolution
+        self.values = array('d', (math.sin(i * step_rad) for i in range(self.resolution + 1)))
+        self.slopes = array('d', (math.cos(i * step_rad) * step_rad for i in range(self.resolution + 1)))
+
+    def error_bound(self, interpolation):
+        """
+        Return the maximum absolute interpolation error of the table before rounding.
+
+        Parameters:
+        interpolation (int): SinTable.LINEAR or SinTable.CUBIC.
+
+        Returns:
+        float: The error bound.
+        """
+        step_rad = 2 * math.pi / self.resolution
+        if interpolation == SinTable.CUBIC:
+            return step_rad ** 4 / 384
+        return step_rad ** 2 / 8
+
+    def _lookup(self, ang_in_deg, interpolation):
+        """
+        Interpolate the unrounded sine of an angle in degrees.
+        """
+        if self.values is None:
+            self.build()
+
+        position = (ang_in_deg % 360) / self.step
+        index = int(position)
+        if index >= self.resolution:
+            index = self.resolution - 1
+        t = position - index
+
+        p0 = self.values[index]
+        p1 = self.values[index + 1]
+        if interpolation != SinTable.CUBIC:
+            return p0 + (p1 - p0) * t
+
+        # Cubic Hermite basis on the unit interval
+        t2 = t * t
+        t3 = t2 * t
+        return ((2 * t3 - 3 * t2 + 1) * p0 + (t3 - 2 * t2 + t) * self.slopes[index]
+                + (3 * t2 - 2 * t3) * p1 + (t3 - t2) * self.slopes[index + 1])
+
+# Fitted Chebyshev tiers
+
+# Precision tiers selectable through the "precision" attribute of the nodes.
+# PRECISION_DEFAULT keeps the original degree 5 chev_poly path.
+PRECISION_DEFAULT = 0
+PRECISION_LOW = 1
+PRECISION_MEDIUM = 2
+PRECISION_HIGH = 3
+
+# Maximum absolute sine/cosine error of each fitted tier's results, rounding included. Results
+# are rounded to six decimal places, which adds up to ROUNDING_ERROR, so a tier's series is
+# fitted for its target minus that; no tier can promise less than ROUNDING_ERROR.
+ROUNDING_ERROR = 0.5e-6
+PRECISION_TARGETS = {
+    PRECISION_LOW: 1e-3,
+    PRECISION_MEDIUM: 1e-5,
+    PRECISION_HIGH: 1e-6,
+}
+
+def _sin_kernel(z):
+    """
+    Return sin(pi / 2 * w) / w for w = sqrt((z + 1) / 2), the even part fitted by ChebyshevTier.
+    """
+    w = math.sqrt((z + 1) / 2)
+    if w == 0:
+        return math.pi / 2
+    return math.sin(math.pi / 2 * w) / w
+
+def fit_chebyshev(func, degree):
+    """
+    Fit Chebyshev series coefficients to a function on [-1, 1].
+
+    Interpolates the function at the degree + 1 Chebyshev nodes, which gives a near-minimax
+    polynomial whose coefficients can be evaluated directly with clenshaw.
+
+    Parameters:
+    func (callable): The function to fit.
+    degree (int): Degree of the series.
+
+    Returns:
+    tuple: The coefficients c[0] ... c[degree].
+    """
+    count = degree + 1
+    angles = [math.pi * (k + 0.5) / count for k in range(count)]
+    values = [func(math.cos(angle)) for angle in angles]
+
+    coefficients = []
+    for j in range(count):
+        c = 2.0 / count * sum(value * math.cos(j * angle) for value, angle in zip(values, angles))
+        coefficients.append(c / 2 if j == 0 else c)
+    return tuple(coefficients)
+
+def _chebyshev_to_power_of_square(coefficients):
+    """
+    Convert a Chebyshev series in z = 2 * u - 1 into power coefficients a[k] of u**k.
+    """
+    # Power coefficients of each T_n(z), from T_n+1 = 2 z T_n - T_n-1
+    terms = [[1.0], [0.0, 1.0]]
+    while len(terms) < len(coefficients):
+        t1, t0 = terms[-1], terms[-2]
+        terms.append([2 * a - b for a, b in zip([0.0] + t1, t0 + [0.0] * (len(t1) + 1 - len(t0)))])
+
+    in_z = [0.0] * len(coefficients)
+    for c, term in zip(coefficients, terms):
+        for k, value in enumerate(term):
+            in_z[k] += c * value
+
+    # Substitute z = 2 u - 1 using the binomial expansion of (2 u - 1)**k
+    in_u = [0.0] * len(coefficients)
+    for k, a in enumerate(in_z):
+        for j in range(k + 1):
+            in_u[j] += a * math.comb(k, j) * 2 ** j * (-1) ** (k - j)
+    return in_u
+
+def _horner_function(power_coefficients):
+    """
+    Build w -> w * sum(a[k] * (w * w)**k) as a single unrolled Horner expression.
+    """
+    expression = repr(power_coefficients[-1])
+    for a in reversed(power_coefficients[:-1]):
+        expression = "{} + u * ({})".format(repr(a), expression)
+
+    source = "def _series(w):\n    u = w * w\n    return w * ({})\n".format(expression)
+    namespace = {}
+    exec(compile(source, "<chebyshev tier>", "exec"), namespace)
+    return namespace["_series"]
+
+class ChebyshevTier(TrigApproximation):
+    """
+    Sine approximation by a fitted Chebyshev series of the lowest degree meeting an error target.
+
+    The angle is folded into [-90, 90] degrees using the symmetries of sine, so the series is
+    only ever evaluated inside its fitting interval. With w = angle / 90 the sine is
+    w * P(2 * w**2 - 1). At construction the series is converted to powers of w**2 and
+    compiled into one unrolled Horner expression, so evaluating it costs one multiply-add
+    per coefficient and no loop.
+
+    Attributes:
+    coefficients (tuple): The Chebyshev series coefficients.
+    degree (int): Degree of the series.
+    max_error (float): Measured maximum absolute sine error before rounding.
+    """
+
+    def __init__(self, coefficients):
+        """
+        Create a tier from Chebyshev series coefficients and measure its error.
+
+        Parameters:
+        coefficients (sequence of float): The coefficients, c[0] first.
+        """
+        self.coefficients = tuple(coefficients)
+        self.degree = len(self.coefficients) - 1
+        self._series = _horner_function(_chebyshev_to_power_of_square(self.coefficients))
+        self.max_error = self.measure_error()
+
+    @classmethod
+    def fit(cls, max_error, max_degree=12):
+        """
+        Build the lowest-degree tier whose error does not exceed max_error.
+
+        Parameters:
+        max_error (float): Maximum allowed absolute sine error before rounding.
+        max_degree (int): Highest degree to try.
+
+        Returns:
+        ChebyshevTier: The fitted tier.
+        """
+        for degree in range(max_degree + 1):
+            tier = cls(fit_chebyshev(_sin_kernel, degree))
+            if tier.max_error <= max_error:
+                return tier
+        raise ValueError("No Chebyshev series up to degree {} reaches an error of {}".format(max_degree, max_error))
+
+    def measure_error(self, samples=4096):
+        """
+        Return the maximum absolute sine error over a uniform grid of [0, 90] degrees.
+        """
+        worst = 0.0
+        for i in range(samples + 1):
+            w = float(i) / samples
+            value = self._series(w)
+            worst = max(worst, abs(value - math.sin(math.pi / 2 * w)))
+        return worst
+
+    def _lookup(self, ang_in_deg, interpolation=None):
+        """
+        Evaluate the unrounded sine of an angle in degrees.
+        """
+        value = ang_in_deg % 360
+        if value > 180:
+            value -= 360
+        if value > 90:
+            value = 180 - value
+        elif value < -90:
+            value = -180 - value
+
+        return self._series(value / 90)
+
+class PrecisionTiers(dict):
+    """
+    Mapping of precision level to ChebyshevTier that fits each tier on first access.
+    """
+
+    def __missing__(self, level):
+        tier = ChebyshevTier.fit(PRECISION_TARGETS[level] - ROUNDING_ERROR)
+        self[level] = tier
+        return tier
+
+def build_precision_tiers():
+    """
+    Fit one ChebyshevTier per entry of PRECISION_TARGETS.
+
+    Returns:
+    dict: Precision level to ChebyshevTier.
+    """
+    return dict((level, ChebyshevTier.fit(target - ROUNDING_ERROR)) for level, target in PRECISION_TARGETS.items())
+
+# Memoization
+
+class QuantizedLRUCache(object):
+    """
+    Bounded LRU cache of evaluated values keyed on the quantized input angle.
+
+    Angles are snapped to a multiple of `quantum` degrees and the function is evaluated at
+    the snapped angle, so a cached value does not depend on which nearby angle filled it.
+    A quantum of 0 keys on the exact input. Hits and misses are counted so the benefit of
+    the cache can be measured on real scenes.
+
+    Attributes:
+    max_size (int): Maximum number of entries kept before the least recently used is dropped.
+    quantum (float): Quantization step in degrees.
+    hits (int): Number of lookups served from the cache.
+    misses (int): Number of lookups that had to evaluate the function.
+    """
+
+    def __init__(self, max_size=4096, quantum=1e-4):
+        """
+        Create an empty cache.
+
+        Parameters:
+        max_size (int): Maximum number of entries.
+        quantum (float): Quantization step in degrees, or 0 for exact keys.
+        """
+        if max_size < 1:
+            raise ValueError("QuantizedLRUCache max_size must be at least 1, got {}".format(max_size))
+        if quantum < 0:
+            raise ValueError("QuantizedLRUCache quantum must not be negative, got {}".format(quantum))
+
+        self.max_size = int(max_size)
+        self.quantum = float(quantum)
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def lookup(self, tag, ang_in_deg, func):
+        """
+        Return func(angle) for the quantized angle, evaluating it only on a miss.
+
+        Parameters:
+        tag (hashable): Identifies the function and evaluation settings, e.g. (approximate_sin, mode).
+        ang_in_deg (float): The angle in degrees.
+        func (callable): Evaluates the function at an angle in degrees.
+
+        Returns:
+        The cached or newly computed value.
+        """
+        if self.quantum:
+            bucket = round(ang_in_deg / self.quantum)
+        else:
+            bucket = ang_in_deg
+        key = (tag, bucket)
+
+        entries = self._entries
+        if key in entries:
+            self.hits += 1
+            entries.move_to_end(key)
+            return entries[key]
+
+        self.misses += 1
+        value = func(bucket * self.quantum if self.quantum else ang_in_deg)
+        entries[key] = value
+        if len(entries) > self.max_size:
+            entries.popitem(last=False)
+        return value
+
+    def resize(self, max_size):
+        """
+        Change the maximum number of entries, dropping the least recently used ones if needed.
+        """
+        if max_size < 1:
+            raise ValueError("QuantizedLRUCache max_size must be at least 1, got {}".format(max_size))
+        self.max_size = int(max_size)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def set_quantum(self, quantum):
+        """
+        Change the quantization step. Existing entries are dropped since their keys no longer apply.
+        """
+        if quantum < 0:
+            raise ValueError("QuantizedLRUCache quantum must not be negative, got {}".format(quantum))
+        self.quantum = float(quantum)
+        self._entries.clear()
+
+    def clear(self):
+        """
+        Drop every entry and reset the hit and miss counters.
+        """
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self):
+        """
+        Return the cache counters.
+
+        Returns:
+        dict: hits, misses, entries and hit_rate (0 when nothing was looked up yet).
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+            "hit_rate": float(self.hits) / total if total else 0.0,
+        }
+
+# Oscillators
+
+class PhaseAccumulator(object):
+    """
+    Bank of sine/cosine oscillators advanced by rotation instead of full re-evaluation.
+
+    Oscillator i outputs amplitude[i] * sin(phase[i] + 360 * frequency[i] * time) and the
+    matching cosine, with phases in degrees, frequencies in cycles per time unit and time in
+    the same unit. While time advances by the same step as on the previous call (regular
+    playback) each sample is produced by rotating the previous (sin, cos) pair with cached
+    per-oscillator step coefficients: four multiplies and two adds, no phase wrapping and no
+    polynomial. Any other time change (scrubbing, a jump, changed frequencies or phases)
+    re-evaluates the oscillators directly, and the rotation is also resynced directly every
+    `resync_interval` steps.
+
+    Direct evaluations use approximate_sin and approximate_cos, so they match the sinNode and
+    cosNode network exactly. The step coefficients are the unrounded sine and cosine of the
+    step angle: a rotation by them keeps the length of the error of the last direct (sin, cos)
+    pair, so a rotated sample is off from the true value by at most that pair's error
+    (hypot of the sine and cosine errors, see max_pair_error) plus floating point rounding of
+    about 1e-15 per step, times the amplitude. Rounded step coefficients would add their own
+    error at every step instead. Between direct evaluations a sample is therefore never further
+    from the true value than a direct one, but it can differ from the network's sample for the
+    same time by up to twice max_pair_error, as the network's own error changes with the angle.
+
+    Attributes:
+    resync_interval (int): Maximum number of rotation steps between direct evaluations.
+    """
+
+    def __init__(self, resync_interval=240):
+        """
+        Create an empty oscillator bank.
+
+        Parameters:
+        resync_interval (int): Maximum number of rotation steps between direct evaluations.
+        """
+        self.resync_interval = int(resync_interval)
+        self.reset()
+
+    def reset(self):
+        """
+        Drop the accumulated state so the next call evaluates every oscillator directly.
+        """
+        self._frequencies = None
+        self._phases = None
+        self._sin = None
+        self._cos = None
+        self._time = None
+        self._step = None
+        self._step_sin = None
+        self._step_cos = None
+        self._steps_since_sync = 0
+
+    @staticmethod
+    def _sin_cos(ang_in_deg):
+        """
+        Evaluate the sine and cosine of one angle directly.
+        """
+        value = adjust_phase(ang_in_deg)
+        return approximate_sin(value), approximate_cos(value)
+
+    @staticmethod
+    def _step_sin_cos(ang_in_deg):
+        """
+        Evaluate the unrounded sine and cosine of a step angle for the rotation coefficients.
+        """
+        angle = math.radians(ang_in_deg)
+        return math.sin(angle), math.cos(angle)
+
+    @classmethod
+    def max_pair_error(cls, samples=36000):
+        """
+        Return the largest error length of a directly evaluated (sin, cos) pair over a uniform
+        grid of [-180, 180] degrees, the per unit amplitude bound of a rotated sample.
+        """
+        worst = 0.0
+        for i in range(samples + 1):
+            ang_in_deg = 360.0 * i / samples - 180
+            sin_val, cos_val = cls._sin_cos(ang_in_deg)
+            angle = math.radians(ang_in_deg)
+            worst = max(worst, math.hypot(sin_val - math.sin(angle), cos_val - math.cos(angle)))
+        return worst
+
+    def _sync(self, time):
+        """
+        Evaluate every oscillator directly at the given time.
+        """
+        pairs = [self._sin_cos(phase + 360 * frequency * time)
+                 for frequency, phase in zip(self._frequencies, self._phases)]
+        self._sin = [pair[0] for pair in pairs]
+        self._cos = [pair[1] for pair in pairs]
+        self._steps_since_sync = 0
+
+    def _rotate(self):
+        """
+        Advance every oscillator by the cached step.
+        """
+        self._sin, self._cos = (
+            [s * sc + c * ss for s, c, ss, sc in zip(self._sin, self._cos, self._step_sin, self._step_cos)],
+            [c * sc - s * ss for s, c, ss, sc in zip(self._sin, self._cos, self._step_sin, self._step_cos)],
+        )
+        self._steps_since_sync += 1
+
+    def evaluate(self, time, frequencies, amplitudes=None, phases=None):
+        """
+        Evaluate all oscillators at the given time.
+
+        Parameters:
+        time (float): The evaluation time.
+        frequencies (sequence of float): Cycles per time unit for each oscillator.
+        amplitudes (sequence of float, optional): Output scale per oscillator; missing entries default to 1.
+        phases (sequence of float, optional): Phase offset in degrees per oscillator; missing entries default to 0.
+
+        Returns:
+        tuple: (sin_values, cos_values) lists, one entry per oscillator, scaled by amplitude.
+        """
+        count = len(frequencies)
+        frequencies = [float(f) for f in frequencies]
+        phases = [float(p) for p in (phases or [])[:count]]
+        phases += [0.0] * (count - len(phases))
+        amplitudes = [float(a) for a in (amplitudes or [])[:count]]
+        amplitudes += [1.0] * (count - len(amplitudes))
+
+        step = None if self._time is None else time - self._time
+        same_params = frequencies == self._frequencies and phases == self._phases
+        # Frame times like frame / fps give steps that differ in the last bits
+        same_step = (step is not None and self._step is not None
+                     and abs(step - self._step) <= 1e-9 * max(1.0, abs(step)))
+
+        if same_params and same_step and self._steps_since_sync < self.resync_interval:
+            if self._step_sin is None:
+                pairs = [self._step_sin_cos(360 * frequency * step) for frequency in frequencies]
+                self._step_sin = [pair[0] for pair in pairs]
+                self._step_cos = [pair[1] for pair in pairs]
+            self._rotate()
+        else:
+            if not same_params or not same_step:
+                self._step_sin = None
+                self._step_cos = None
+            self._frequencies = frequencies
+            self._phases = phases
+            self._sync(time)
+
+        self._time = time
+        self._step = step
+        return ([a * s for a, s in zip(amplitudes, self._sin)],
+                [a * c for a, c in zip(amplitudes, self._cos)])
+
+# Graph compilation
+
+# Node types a trig network may be collapsed from, with their input plugs in operand order
+GRAPH_TRIG_FUNCTIONS = {
+    "sinNode": "sin",
+    "cosNode": "cos",
+    "tanNode": "tan",
+    "cotNode": "cot",
+    "secNode": "sec",
+    "cscNode": "csc",
+}
+GRAPH_ARITHMETIC_OPERATORS = {
+    "multDoubleLinear": "*",
+    "addDoubleLinear": "+",
+}
+GRAPH_MODES = (MODE_CHEBYSHEV, MODE_LINEAR_TABLE, MODE_CUBIC_TABLE)
+GRAPH_PRECISIONS = (PRECISION_DEFAULT,) + tuple(sorted(PRECISION_TARGETS))
+GRAPH_INPUT_PLUGS = dict(
+    [(node_type, ("input",)) for node_type in GRAPH_TRIG_FUNCTIONS]
+    + [(node_type, ("input1", "input2")) for node_type in GRAPH_ARITHMETIC_OPERATORS]
+)
+
+_FLOAT32 = struct.Struct("f")
+
+def _f32(value):
+    """
+    Round a double to single precision, as a float attribute on a trig node does.
+    """
+    return _FLOAT32.unpack(_FLOAT32.pack(value))[0]
+
+def compile_graph(description, table=None, tiers=None):
+    """
+    Compile a collapsed trig network description into a single Python function.
+
+    The description is a dict with:
+        "nodes": list of {"name", "type", "inputs", "attributes"} in topological order.
+                 "inputs" maps each input plug to {"input": i} (graph input i),
+                 {"node": name} (another node's output) or {"value": v} (constant).
+                 "attributes" may hold the trig node "mode" and "precision".
+        "outputs": list of {"node": name, ...}, one per graph output.
+
+    Arithmetic feeding a single consumer is flattened into that consumer's expression,
+    constant subtrees are folded at compile time and only values used more than once are
+    kept in locals. Trig node inputs and outputs are rounded to single precision so the
+    compiled function returns the same values as the original float attributes.
+
+    Parameters:
+    description (dict): The graph description.
+    table (SinTable, optional): Table used by nodes whose mode is a table mode.
+    tiers (dict, optional): Precision level to ChebyshevTier, used by nodes with a non-default precision.
+
+    Returns:
+    tuple: (function, source). function takes a sequence of graph inputs and returns the list of outputs.
+
+    Raises:
+    ValueError: If the description is malformed.
+    """
+    if not isinstance(description, dict):
+        raise ValueError("Trig graph description must be an object, got {}".format(type(description).__name__))
+    nodes = description.get("nodes")
+    outputs = description.get("outputs")
+    if not isinstance(nodes, list) or not isinstance(outputs, list):
+        raise ValueError("Trig graph description needs \"nodes\" and \"outputs\" lists")
+    input_count = len(description["inputs"]) if isinstance(description.get("inputs"), list) else None
+
+    uses = {}
+    for node in nodes:
+        if not isinstance(node, dict) or not isinstance(node.get("inputs"), dict):
+            raise ValueError("Trig graph node must be an object with an \"inputs\" object: {!r}".format(node))
+        for spec in node["inputs"].values():
+            if isinstance(spec, dict) and "node" in spec:
+                uses[spec["node"]] = uses.get(spec["node"], 0) + 1
+    for output in outputs:
+        if not isinstance(output, dict) or "node" not in output:
+            raise ValueError("Trig graph output must be an object naming a node: {!r}".format(output))
+        uses[output["node"]] = uses.get(output["node"], 0) + 2
+
+    namespace = {"_f32": _f32, "_table": table, "_tiers": tiers}
+    namespace.update(dict(("approximate_" + name, globals()["approximate_" + name])
+                          for name in GRAPH_TRIG_FUNCTIONS.values()))
+
+    expressions = {}
+    constants = {}
+    lines = []
+
+    def operand(spec):
+        if not isinstance(spec, dict):
+            raise ValueError("Trig graph operand must be an object, got {!r}".format(spec))
+        if "input" in spec:
+            index = spec["input"]
+            if (not isinstance(index, int) or isinstance(index, bool) or index < 0
+                    or (input_count is not None and index >= input_count)):
+                raise ValueError("Invalid trig graph input index: {!r}".format(index))
+            return "i[{}]".format(index), False
+        if "value" in spec:
+            try:
+                return repr(float(spec["value"])), True
+            except (TypeError, ValueError):
+                raise ValueError("Non-numeric trig graph constant: {!r}".format(spec["value"]))
+        if spec.get("node") not in expressions:
+            raise ValueError("Trig graph operand refers to an unknown or later node: {!r}".format(spec))
+        return expressions[spec["node"]], spec["node"] in constants
+
+    for node in nodes:
+        node_type = node.get("type")
+        if node_type not in GRAPH_INPUT_PLUGS:
+            raise ValueError("Unsupported node type in trig graph: {}".format(node_type))
+        missing = [plug for plug in GRAPH_INPUT_PLUGS[node_type] if plug not in node["inputs"]]
+        if missing:
+            raise ValueError("Trig graph node {} is missing inputs: {}".format(node.get("name"), ", ".join(missing)))
+
+        args = [operand(node["inputs"][plug]) for plug in GRAPH_INPUT_PLUGS[node_type]]
+        if node_type in GRAPH_TRIG_FUNCTIONS:
+            name = GRAPH_TRIG_FUNCTIONS[node_type]
+            attributes = node.get("attributes", {})
+            if not isinstance(attributes, dict):
+                raise ValueError("Trig graph node {} attributes must be an object".format(node.get("name")))
+            mode = attributes.get("mode", MODE_CHEBYSHEV)
+            precision = attributes.get("precision", PRECISION_DEFAULT)
+            if isinstance(mode, bool) or mode not in GRAPH_MODES:
+                raise ValueError("Trig graph node {} has an unknown mode: {!r}".format(node.get("name"), mode))
+            if isinstance(precision, bool) or precision not in GRAPH_PRECISIONS:
+                raise ValueError("Trig graph node {} has an unknown precision: {!r}".format(node.get("name"), precision))
+            if mode != MODE_CHEBYSHEV and table is not None:
+                interpolation = SinTable.CUBIC if mode == MODE_CUBIC_TABLE else SinTable.LINEAR
+                call = "_table.{}(_f32({}), {})".format(name, args[0][0], interpolation)
+            elif precision != PRECISION_DEFAULT and tiers is not None:
+                call = "_tiers[{}].{}(_f32({}))".format(int(precision), name, args[0][0])
+            else:
+                call = "approximate_{}(_f32({}))".format(name, args[0][0])
+            expression = "_f32({})".format(call)
+        else:
+            operator = GRAPH_ARITHMETIC_OPERATORS[node_type]
+            expression = "({} {} {})".format(args[0][0], operator, args[1][0])
+
+        if all(is_constant for _, is_constant in args):
+            value = eval(expression, namespace)
+            constants[node["name"]] = value
+            expression = repr(float(value))
+        elif uses.get(node["name"], 0) > 1:
+            variable = "v{}".format(len(lines))
+            lines.append("    {} = {}".format(variable, expression))
+            expression = variable
+        expressions[node["name"]] = expression
+
+    unknown = [output["node"] for output in outputs if output["node"] not in expressions]
+    if unknown:
+        raise ValueError("Trig graph outputs refer to unknown nodes: {}".format(unknown))
+    lines.append("    return [{}]".format(", ".join(expressions[output["node"]] for output in outputs)))
+    source = "def _graph(i):\n" + "\n".join(lines) + "\n"
+    exec(compile(source, "<trig graph>", "exec"), namespace)
+    return namespace["_graph"], source
+
+# Batch evaluation
+#
+# The *_batch functions below take any iterable of angles in degrees and return
+# the same values as their scalar counterparts, element for element. When NumPy
+# is available the whole array is evaluated in one vectorized pass and an
+# ndarray is returned; otherwise a pure-Python fallback returns a list.
+# NumPy is imported by the first batch call.
+
+def load_numpy():
+    """
+    Import NumPy on first use and return the module, or None when it is not installed.
+
+    Keeps the import cost out of plugin load and out of scripts that only use the
+    scalar functions.
+    """
+    global np, _numpy_checked
+    if not _numpy_checked:
+        _numpy_checked = True
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            np = None
+    return np
+
+def _as_array(angles):
+    """
+    Convert an iterable of angles into a flat float64 NumPy array.
+    """
+    return np.asarray(angles, dtype=np.float64).ravel()
+
+def adjust_phase_batch(angles):
+    """
+    Normalize a sequence of angles in degrees to the range [-180, 180].
+
+    Parameters:
+    angles (iterable of float): The angles in degrees to be normalized.
+
+    Returns:
+    ndarray or list: The normalized angles in the range [-180, 180] degrees.
+    """
+    if load_numpy() is None:
+        return [adjust_phase(float(a)) for a in angles]
+
+    normalized = np.mod(_as_array(angles), 360.0)
+    return np.where(normalized > 180, normalized - 360, normalized)
+
+def chev_poly_batch(x):
+    """
+    Evaluate the degree 5 Chebyshev polynomial used by chev_poly for an array of inputs.
+
+    Parameters:
+    x (ndarray): The input values for the Chebyshev polynomial.
+
+    Returns:
+    ndarray: The evaluated Chebyshev polynomial values.
+    """
+    # Same recurrence as chev_poly so the results match bit for bit
+    return clenshaw(CHEV_COEFFICIENTS, x)
+
+def _quad_sign_batch(angles):
+    """
+    Return the cosine quadrant sign (+1/-1) for each raw angle, as approximate_cos does.
+    """
+    negative = ((angles >= 90) & (angles <= 270)) | ((angles >= -270) & (angles <= -90))
+    return np.where(negative, -1.0, 1.0)
+
+def _sin_cos_batch(angles):
+    """
+    Compute the rounded sine and cosine arrays for angles with a single polynomial pass.
+
+    Parameters:
+    angles (ndarray): The angles in degrees.
+
+    Returns:
+    tuple: (sin, cos) arrays matching approximate_sin and approximate_cos.
+    """
+    x = adjust_phase_batch(angles) / 360
+    w = 4 * x
+    z = 2 * w * w - 1
+    sin_vals = np.round(chev_poly_batch(z) * w, 6)
+    cos_vals = np.round(_quad_sign_batch(angles) * (1 - sin_vals ** 2) ** 0.5, 6)
+    return sin_vals, cos_vals
+
+def _safe_reciprocal(numerator, denominator):
+    """
+    Divide and round element-wise, writing UNDEFINED wherever the denominator is zero.
+    """
+    undefined = denominator == 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result = np.round(numerator / np.where(undefined, 1.0, denominator), 6)
+    result[undefined] = UNDEFINED
+    return result
+
+def approximate_sin_batch(angles):
+    """
+    Compute the sine of many angles given in degrees.
+
+    Parameters:
+    angles (iterable of float): The angles in degrees.
+
+    Returns:
+    ndarray or list: The sine of each angle, rounded to six decimal places.
+    """
+    if load_numpy() is None:
+        return [approximate_sin(float(a)) for a in angles]
+
+    return _sin_cos_batch(_as_array(angles))[0]
+
+def approximate_cos_batch(angles):
+    """
+    Compute the cosine of many angles given in degrees.
+
+    Parameters:
+    angles (iterable of float): The angles in degrees.
+
+    Returns:
+    ndarray or list: The cosine of each angle, rounded to six decimal places.
+    """
+    if load_numpy() is None:
+        return [approximate_cos(float(a)) for a in angles]
+
+    return _sin_cos_batch(_as_array(angles))[1]
+
+def approximate_tan_batch(angles):
+    """
+    Compute the tangent of many angles given in degrees.
+
+    Parameters:
+    angles (iterable of float): The angles in degrees.
+
+    Returns:
+    ndarray or list: The tangent of each angle, rounded to six decimal places, or UNDEFINED where the cosine is zero.
+    """
+    if load_numpy() is None:
+        return [approximate_tan(float(a)) for a in angles]
+
+    sin_vals, cos_vals = _sin_cos_batch(_as_array(angles))
+    return _safe_reciprocal(sin_vals, cos_vals)
+
+def approximate_cot_batch(angles):
+    """
+    Compute the cotangent of many angles given in degrees.
+
+    Parameters:
+    angles (iterable of float): The angles in degrees.
+
+    Returns:
+    ndarray or list: The cotangent of each angle, rounded to six decimal places, or UNDEFINED where the tangent is zero or undefined.
+    """
+    if load_numpy() is None:
+        return [approximate_cot(float(a)) for a in angles]
+
+    tan_vals = approximate_tan_batch(angles)
+    tan_vals[tan_vals == UNDEFINED] = 0
+    return _safe_reciprocal(1, tan_vals)
+
+def approximate_sec_batch(angles):
+    """
+    Compute the secant of many angles given in degrees.
+
+    Parameters:
+    angles (iterable of float): The angles in degrees.
+
+    Returns:
+    ndarray or list: The secant of each angle, rounded to six decimal places, or UNDEFINED where the cosine is zero.
+    """
+    if load_numpy() is None:
+        return [approximate_sec(float(a)) for a in angles]
+
+    return _safe_reciprocal(1, _sin_cos_batch(_as_array(angles))[1])
+
+def approximate_csc_batch(angles):
+    """
+    Compute the cosecant of many angles given in degrees.
+
+    Parameters:
+    angles (iterable of float): The angles in degrees.
+
+    Returns:
+    ndarray or list: The cosecant of each angle, rounded to six decimal places, or UNDEFINED where the sine is zero.
+    """
+    if load_numpy() is None:
+        return [approximate_csc(float(a)) for a in angles]
+
+    return _safe_reciprocal(1, _sin_cos_batch(_as_array(angles))[0])
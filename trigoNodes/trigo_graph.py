@@ -0,0 +1,196 @@
+import json
+
+import maya.cmds as cmds
+
+from trigo_core import GRAPH_INPUT_PLUGS, GRAPH_TRIG_FUNCTIONS
+
+GRAPH_NODE_TYPE = "trigoGraphNode"
+OUTPUT_PLUG = "output"
+
+# Trig node settings carried through collapse/expand
+TRIG_ATTRIBUTES = ("mode", "precision", "useCache")
+
+
+def sort_nodes(nodes, dependencies):
+    """
+    Order nodes so every node comes after the nodes it reads from.
+
+    Args:
+        nodes (list): Node names.
+        dependencies (dict): Node name to the set of node names it reads from.
+
+    Returns:
+        list: The nodes in topological order.
+
+    Raises:
+        RuntimeError: If the network contains a cycle.
+    """
+    ordered = []
+    remaining = dict((node, set(dependencies.get(node, ()))) for node in nodes)
+    while remaining:
+        ready = sorted(node for node, deps in remaining.items() if not deps)
+        if not ready:
+            raise RuntimeError(f"Cannot collapse a cyclic network: {sorted(remaining)}")
+        for node in ready:
+            del remaining[node]
+            for deps in remaining.values():
+                deps.discard(node)
+        ordered.extend(ready)
+    return ordered
+
+
+def describe_network(nodes):
+    """
+    Build the JSON-serializable description of a network of trig and arithmetic nodes.
+
+    Connections coming from outside the network become graph inputs, unconnected input
+    plugs become constants and outputs connected outside the network become graph outputs.
+
+    Args:
+        nodes (list): Names of the nodes to describe. All must be supported types.
+
+    Returns:
+        dict: The description understood by trigo_core.compile_graph.
+    """
+    node_set = set(nodes)
+    inputs = []
+    dependencies = {}
+    described = {}
+
+    for node in nodes:
+        node_type = cmds.nodeType(node)
+        node_inputs = {}
+        dependencies[node] = set()
+
+        for plug in GRAPH_INPUT_PLUGS[node_type]:
+            sources = cmds.listConnections(f"{node}.{plug}", source=True, destination=False, plugs=True)
+            if not sources:
+                node_inputs[plug] = {"value": cmds.getAttr(f"{node}.{plug}")}
+            elif sources[0].split(".")[0] in node_set:
+                source_node = sources[0].split(".")[0]
+                node_inputs[plug] = {"node": source_node}
+                dependencies[node].add(source_node)
+            else:
+                if sources[0] not in inputs:
+                    inputs.append(sources[0])
+                node_inputs[plug] = {"input": inputs.index(sources[0])}
+
+        attributes = {}
+        if node_type in GRAPH_TRIG_FUNCTIONS:
+            for attr in TRIG_ATTRIBUTES:
+                if cmds.attributeQuery(attr, node=node, exists=True):
+                    attributes[attr] = cmds.getAttr(f"{node}.{attr}")
+
+        described[node] = {"name": node, "type": node_type, "inputs": node_inputs, "attributes": attributes}
+
+    ordered = sort_nodes(nodes, dependencies)
+    outputs = []
+    for node in ordered:
+        destinations = cmds.listConnections(f"{node}.{OUTPUT_PLUG}", source=False, destination=True, plugs=True) or []
+        external = [plug for plug in destinations if plug.split(".")[0] not in node_set]
+        if external:
+            outputs.append({"node": node, "destinations": external})
+
+    return {
+        "version": 1,
+        "inputs": inputs,
+        "nodes": [described[node] for node in ordered],
+        "outputs": outputs,
+    }
+
+
+def collapse_network(nodes=None, name=None):
+    """
+    Replace a network of trig and arithmetic nodes with a single trigoGraphNode.
+
+    Supported nodes are sinNode ... cscNode, multDoubleLinear and addDoubleLinear; other
+    node types in the selection are ignored. The network is stored on the new node so it
+    can be restored with expand_network. The whole operation is one undo step.
+
+    Args:
+        nodes (list, optional): The nodes to collapse. Defaults to the current selection.
+        name (str, optional): Name for the new node.
+
+    Returns:
+        str: The name of the created trigoGraphNode.
+    """
+    nodes = cmds.ls(nodes if nodes is not None else cmds.ls(selection=True), type=list(GRAPH_INPUT_PLUGS))
+    if not nodes:
+        raise RuntimeError("Select the sin/cos/tan and multDoubleLinear/addDoubleLinear nodes to collapse.")
+
+    description = describe_network(nodes)
+    if not description["outputs"]:
+        raise RuntimeError("The selected network has no outputs connected outside of it.")
+
+    cmds.undoInfo(openChunk=True)
+    try:
+        graph_node = cmds.createNode(GRAPH_NODE_TYPE, name=name or f"{nodes[0]}_trigoGraph")
+        cmds.setAttr(f"{graph_node}.graph", json.dumps(description), type="string")
+
+        # Connect inputs before deleting so unit conversion nodes feeding the network survive
+        for index, source in enumerate(description["inputs"]):
+            cmds.connectAttr(source, f"{graph_node}.input[{index}]")
+
+        cmds.delete(nodes)
+
+        for index, output in enumerate(description["outputs"]):
+            for destination in output["destinations"]:
+                cmds.connectAttr(f"{graph_node}.{OUTPUT_PLUG}[{index}]", destination, force=True)
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+    return graph_node
+
+
+def expand_network(graph_node):
+    """
+    Rebuild the original node network from a trigoGraphNode and delete the graph node.
+
+    Current connections of the graph node are used for the external inputs and outputs,
+    so edits made to them after collapsing are kept. The whole operation is one undo step.
+
+    Args:
+        graph_node (str): The trigoGraphNode to expand.
+
+    Returns:
+        list: The names of the recreated nodes.
+    """
+    description = json.loads(cmds.getAttr(f"{graph_node}.graph"))
+
+    sources = []
+    for index in range(len(description["inputs"])):
+        connected = cmds.listConnections(f"{graph_node}.input[{index}]", source=True, destination=False, plugs=True)
+        sources.append(connected[0] if connected else None)
+
+    destinations = []
+    for index in range(len(description["outputs"])):
+        connected = cmds.listConnections(f"{graph_node}.{OUTPUT_PLUG}[{index}]", source=False, destination=True, plugs=True)
+        destinations.append(connected or [])
+
+    cmds.undoInfo(openChunk=True)
+    try:
+        created = {}
+        for node in description["nodes"]:
+            created[node["name"]] = cmds.createNode(node["type"], name=node["name"])
+            for attr, value in node.get("attributes", {}).items():
+                cmds.setAttr(f"{created[node['name']]}.{attr}", value)
+
+        for node in description["nodes"]:
+            node_name = created[node["name"]]
+            for plug, spec in node["inputs"].items():
+                if "value" in spec:
+                    cmds.setAttr(f"{node_name}.{plug}", spec["value"])
+                elif "node" in spec:
+                    cmds.connectAttr(f"{created[spec['node']]}.{OUTPUT_PLUG}", f"{node_name}.{plug}")
+                elif sources[spec["input"]]:
+                    cmds.connectAttr(sources[spec["input"]], f"{node_name}.{plug}")
+
+        cmds.delete(graph_node)
+
+        for output, plugs in zip(description["outputs"], destinations):
+            for destination in plugs:
+                cmds.connectAttr(f"{created[output['node']]}.{OUTPUT_PLUG}", destination, force=True)
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+    return [created[node["name"]] for node in description["nodes"]]
@@ -0,0 +1,129 @@
+"""Size and speed of the .skw weight container against deformerWeights XML.
+
+Runs without Maya. The XML side writes and parses the layout `deformerWeights -export` produces
+(a shape block with point positions, then one weights block per influence listing its non-zero
+points) with ElementTree, so its times only indicate the cost of the format; the file sizes
+compare directly. The container side streams synthetic chunks, as the editor does from getWeights,
+and reports the peak Python memory of the whole round trip.
+
+    python benchmarks/weight_file.py [vertex_count] [influence_count]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import xml.etree.ElementTree as ElementTree
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from weight_core import WeightFile, WeightFileWriter, chunk_rows, require_numpy
+
+INFLUENCES_PER_VERTEX = 4
+
+
+def weight_chunk(np, start, stop, influence_count):
+    # Deterministic sparse weights, four influences a vertex
+    rng = np.random.default_rng(start)
+    rows = stop - start
+    chunk = np.zeros((rows, influence_count), dtype=np.float32)
+    for _ in range(INFLUENCES_PER_VERTEX):
+        chunk[np.arange(rows), rng.integers(0, influence_count, rows)] += rng.random(rows, dtype=np.float32)
+    chunk /= chunk.sum(axis=1)[:, None]
+    return chunk
+
+
+def weight_chunks(np, vertex_count, influence_count):
+    size = chunk_rows(influence_count)
+    for start in range(0, vertex_count, size):
+        yield weight_chunk(np, start, min(start + size, vertex_count), influence_count)
+
+
+def write_xml(path, np, vertex_count, influences):
+    lines = ['<?xml version="1.0"?>', "<deformerWeight>",
+             '  <shape name="body" group="0" stride="3" size="{0}" max="{0}">'.format(vertex_count)]
+    points = {influence: [] for influence in influences}
+    size = chunk_rows(len(influences))
+    for start in range(0, vertex_count, size):
+        chunk = weight_chunk(np, start, min(start + size, vertex_count), len(influences))
+        for offset, row in enumerate(chunk.tolist()):
+            index = start + offset
+            lines.append('    <point index="{0}" value=" {0}.000000 0.000000 0.000000"/>'.format(index))
+            for column, value in enumerate(row):
+                if value:
+                    points[influences[column]].append('    <point index="{}" value="{:.3f}"/>'.format(index, value))
+    lines.append("  </shape>")
+    for influence in influences:
+        lines.append('  <weights deformer="skinCluster1" source="{}" shape="body" layer="0" defaultValue="0.000" '
+                     'size="{}" max="{}">'.format(influence, len(points[influence]), vertex_count - 1))
+        lines.extend(points[influence])
+        lines.append("  </weights>")
+    lines.append("</deformerWeight>")
+    with open(path, "w") as f:
+        f.write("\n".join(lines))
+
+
+def read_xml(path, vertex_count, influences):
+    columns = {influence: i for i, influence in enumerate(influences)}
+    weights = [[0.0] * len(influences) for _ in range(vertex_count)]
+    for block in ElementTree.parse(path).getroot().iter("weights"):
+        column = columns[block.get("source")]
+        for point in block.iter("point"):
+            weights[int(point.get("index"))][column] = float(point.get("value"))
+    return weights
+
+
+def write_container(path, np, vertex_count, influences):
+    with WeightFileWriter(path) as writer:
+        writer.add_mesh("body", "skinCluster1", influences, vertex_count, "0" * 40,
+                        weight_chunks(np, vertex_count, len(influences)))
+
+
+def read_container(path):
+    weight_file = WeightFile(path)
+    total = 0.0
+    for start, block in weight_file.chunks(weight_file.mesh("body")):
+        total += float(block.data.sum())
+    return total
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def main(vertex_count=200000, influence_count=100):
+    np = require_numpy()
+    influences = ["joint{}".format(i) for i in range(influence_count)]
+    directory = tempfile.mkdtemp()
+    xml_path = os.path.join(directory, "body.xml")
+    skw_path = os.path.join(directory, "body.skw")
+
+    print("{} vertices x {} influences, {} non-zero a vertex".format(
+        vertex_count, influence_count, INFLUENCES_PER_VERTEX))
+    _, xml_write = timed(write_xml, xml_path, np, vertex_count, influences)
+    _, xml_read = timed(read_xml, xml_path, vertex_count, influences)
+    _, skw_write = timed(write_container, skw_path, np, vertex_count, influences)
+    total, skw_read = timed(read_container, skw_path)
+    print("  deformerWeights XML : {:8.1f} MB  write {:6.2f} s  read {:6.2f} s".format(
+        os.path.getsize(xml_path) / 1e6, xml_write, xml_read))
+    print("  .skw container      : {:8.1f} MB  write {:6.2f} s  read {:6.2f} s".format(
+        os.path.getsize(skw_path) / 1e6, skw_write, skw_read))
+    print("  weight sum read back: {:.1f} (expected {})".format(total, vertex_count))
+
+    tracemalloc.start()
+    write_container(skw_path, np, vertex_count, influences)
+    read_container(skw_path)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print("  container round trip peak Python memory: {:.1f} MB (dense matrix {:.1f} MB)".format(
+        peak / 1e6, vertex_count * influence_count * 4 / 1e6))
+
+    os.remove(xml_path)
+    os.remove(skw_path)
+    os.rmdir(directory)
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
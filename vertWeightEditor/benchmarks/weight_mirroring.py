@@ -0,0 +1,108 @@
+"""Symmetry map build and weight mirroring on a symmetric 200k vertex sheet.
+
+Runs without Maya. The symmetry map is built once per topology (the first Mirror click); a mirror
+is then one gather/scatter on the sparse weights. The per-vertex search stands in for a script
+that looks up each vertex's closest mirrored point on every run.
+
+    python benchmarks/weight_mirroring.py [grid_size] [influence_count]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from weight_core import (SparseWeights, SymmetryMap, influence_mirror_map, mirror_weights, missing_mirror_influences,
+                         require_numpy)
+
+PER_VERTEX_SAMPLE = 1000
+
+
+def symmetric_sheet(np, size):
+    # A wavy size x size sheet centred on x = 0, symmetric in x
+    x, y = np.meshgrid(np.linspace(-1.0, 1.0, size), np.linspace(0.0, 2.0, size), indexing="ij")
+    z = 0.1 * np.cos(3.0 * x) * np.sin(4.0 * y)
+    return np.stack([x.ravel(), y.ravel(), z.ravel()], axis=1)
+
+
+def sided_weights(np, positions, influence_count):
+    # Left influences weight the +x half, their right counterparts the -x half, by height bands
+    pairs = influence_count // 2
+    band = np.minimum((positions[:, 1] / 2.0 * pairs).astype(np.int64), pairs - 1)
+    columns = np.where(positions[:, 0] >= 0, band, band + pairs)
+    weights = np.zeros((len(positions), influence_count))
+    weights[np.arange(len(positions)), columns] = 0.75
+    weights[np.arange(len(positions)), (columns + 1) % influence_count] += 0.25
+    return weights
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def mirror_region(np, symmetry, weights, vertices, direction, column_map):
+    destinations = symmetry.destinations(vertices, direction)
+    sources = symmetry.mirror[destinations]
+    region = np.union1d(destinations, sources)
+    sparse = SparseWeights.from_dense(weights[region], np.float64)
+    mirrored = mirror_weights(sparse, np.searchsorted(region, destinations), np.searchsorted(region, sources),
+                              column_map)
+    return region, destinations, sources, mirrored
+
+
+def main(grid_size=448, influence_count=40):
+    np = require_numpy()
+    positions = symmetric_sheet(np, grid_size)
+    weights = sided_weights(np, positions, influence_count)
+    pairs = influence_count // 2
+    influences = ["L_joint{}".format(i) for i in range(pairs)] + ["R_joint{}".format(i) for i in range(pairs)]
+    column_map = influence_mirror_map(influences)
+    print("{} vertices, {} influences".format(len(positions), influence_count))
+
+    symmetry, build_ms = timed(SymmetryMap, positions, 0)
+    print("  symmetry map build (first click): {:8.1f} ms, {} unmatched".format(build_ms, len(symmetry.unmatched)))
+
+    # Wipe the -x side, then mirror +x onto it
+    damaged = weights.copy()
+    damaged[symmetry.side < 0] = np.eye(influence_count)[0]
+    everything = np.arange(len(positions))
+    (region, destinations, sources, mirrored), whole_ms = timed(
+        mirror_region, np, symmetry, damaged, everything, 1, column_map)
+    restored = damaged.copy()
+    restored[region] = mirrored.to_dense()
+    print("  mirror whole mesh               : {:8.1f} ms, max diff to original {:.1e}".format(
+        whole_ms, np.abs(restored - weights).max()))
+
+    selection = everything[positions[:, 1] < 0.2]
+    _, selection_ms = timed(mirror_region, np, symmetry, damaged, selection, 1, column_map)
+    print("  mirror {:>6} selected vertices : {:8.1f} ms".format(len(selection), selection_ms))
+
+    # With the first influence locked it keeps its weights on the mirrored side and the rest is
+    # scaled to fill each row
+    locked = np.zeros(influence_count, dtype=bool)
+    locked[0] = True
+    partly_locked = weights.copy()
+    partly_locked[symmetry.side < 0] = 0.3 * np.eye(influence_count)[0] + 0.7 * np.eye(influence_count)[1]
+    sparse = SparseWeights.from_dense(partly_locked[region], np.float64)
+    mirrored = mirror_weights(sparse, np.searchsorted(region, destinations), np.searchsorted(region, sources),
+                              column_map, locked).to_dense()
+    rows = np.searchsorted(region, destinations)
+    print("  mirror with a locked influence  : locked column diff {:.1e}, row sum error {:.1e}".format(
+        np.abs(mirrored[rows, 0] - partly_locked[destinations, 0]).max(), np.abs(mirrored[rows].sum(axis=1) - 1).max()))
+    print("  influences without other side   : {}".format(missing_mirror_influences(influences[:-1])))
+
+    # Closest mirrored point searched vertex by vertex
+    sample = destinations[:PER_VERTEX_SAMPLE]
+    start = time.perf_counter()
+    for vertex in sample:
+        target = positions[vertex] * (-1.0, 1.0, 1.0)
+        int(((positions - target) ** 2).sum(axis=1).argmin())
+    per_vertex_ms = (time.perf_counter() - start) * 1000
+    print("  per-vertex search, {} vertices : {:8.1f} ms (~{:.0f} s for the mesh)".format(
+        len(sample), per_vertex_ms, per_vertex_ms * len(destinations) / len(sample) / 1000))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
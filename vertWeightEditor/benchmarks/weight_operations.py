@@ -0,0 +1,96 @@
+"""Weight editor operations on the sparse weight layout against a dense vertices x influences array.
+
+Runs without Maya. The dense versions are the straightforward NumPy implementations; both layouts
+must give the same weights. Conversion times cover the flat arrays getWeights returns and
+setWeights takes.
+
+    python benchmarks/weight_operations.py [vertex_count] [influence_count]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from weight_core import (SparseWeights, influence_mask, normalize_weights, remove_influences, require_numpy,
+                         weights_min_to_max)
+
+INFLUENCES_PER_VERTEX = 4
+
+
+def dense_remove(weights, removed, locked):
+    removed = removed & ~locked
+    receivers = ~(removed | locked)
+    result = weights.copy()
+    freed = result[:, removed].sum(axis=1)
+    receiving = result[:, receivers].sum(axis=1)
+    rows = (freed > 0) & (receiving > 0)
+    block = result[rows]
+    block[:, receivers] *= ((receiving[rows] + freed[rows]) / receiving[rows])[:, None]
+    block[:, removed] = 0.0
+    result[rows] = block
+    return result
+
+
+def dense_normalize(weights, locked, np):
+    result = weights.copy()
+    target = np.clip(1.0 - result[:, locked].sum(axis=1), 0.0, None)
+    current = result[:, ~locked].sum(axis=1)
+    scale = np.ones(len(result))
+    np.divide(target, current, out=scale, where=current > 0)
+    result[:, ~locked] *= scale[:, None]
+    return result
+
+
+def dense_min_to_max(weights, locked, np):
+    columns = np.flatnonzero(~locked)
+    result = weights.copy()
+    block = result[:, columns]
+    total = block.sum(axis=1)
+    strongest = block.argmax(axis=1)
+    block[:] = 0.0
+    block[np.arange(len(block)), strongest] = total
+    result[:, columns] = block
+    return result
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main(vertex_count=100000, influence_count=200):
+    np = require_numpy()
+    rng = np.random.default_rng(0)
+    dense = np.zeros((vertex_count, influence_count))
+    for _ in range(INFLUENCES_PER_VERTEX):
+        dense[np.arange(vertex_count), rng.integers(0, influence_count, vertex_count)] += rng.random(vertex_count)
+    dense /= dense.sum(axis=1)[:, None]
+    influences = ["joint{}".format(i) for i in range(influence_count)]
+    locked = influence_mask(influences, influences[::10])
+    removed = influence_mask(influences, influences[1:4])
+    scaled = dense * 1.25
+
+    print("{} vertices x {} influences, {} non-zero a vertex (float64)".format(
+        vertex_count, influence_count, INFLUENCES_PER_VERTEX))
+    sparse, from_ms = timed(SparseWeights.from_flat, dense.ravel(), influence_count, np.float64)
+    _, to_ms = timed(sparse.to_flat)
+    print("  memory      : dense {:8.1f} MB   sparse {:8.1f} MB".format(dense.nbytes / 1e6, sparse.nbytes / 1e6))
+    print("  flat <-> CSR: from {:.1f} ms, to {:.1f} ms".format(from_ms, to_ms))
+
+    scaled_sparse = SparseWeights.from_dense(scaled, np.float64)
+    cases = [
+        ("remove", lambda: dense_remove(dense, removed, locked), lambda: remove_influences(sparse, removed, locked)[0]),
+        ("normalize", lambda: dense_normalize(scaled, locked, np), lambda: normalize_weights(scaled_sparse, locked)),
+        ("min to max", lambda: dense_min_to_max(dense, locked, np), lambda: weights_min_to_max(sparse, locked)),
+    ]
+    for name, dense_case, sparse_case in cases:
+        expected, dense_ms = timed(dense_case)
+        result, sparse_ms = timed(sparse_case)
+        print("  {:<11} : dense {:8.1f} ms   sparse {:8.1f} ms   max diff {:.1e}".format(
+            name, dense_ms, sparse_ms, np.abs(result.to_dense() - expected).max()))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
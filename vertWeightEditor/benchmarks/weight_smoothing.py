@@ -0,0 +1,98 @@
+"""Smooth on a grid mesh: adjacency build, smoothing as neighbour-matrix products, and a per-vertex loop.
+
+Runs without Maya. The adjacency is built once per topology (the first Smooth click); later clicks
+only pay for the region lookup and the products. The loop smooths vertex by vertex the way a
+paint-smooth flood does and must give the same weights.
+
+    python benchmarks/weight_smoothing.py [grid_size] [influence_count] [iterations]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from weight_core import SMOOTH_STRENGTH, SparseWeights, VertexAdjacency, require_numpy, smooth_weights
+
+
+def grid_mesh(np, size):
+    # size x size vertices of quads
+    rows, columns = np.meshgrid(np.arange(size - 1), np.arange(size - 1), indexing="ij")
+    corners = (rows * size + columns).ravel()
+    faces = np.stack([corners, corners + 1, corners + size + 1, corners + size], axis=1)
+    return size * size, np.full(len(faces), 4), faces.ravel()
+
+
+def grid_weights(np, size, influence_count):
+    # Bands of influences across the grid with hard borders, the case smoothing is for
+    band = (np.arange(size * size) // size) * influence_count // size
+    weights = np.zeros((size * size, influence_count))
+    weights[np.arange(size * size), band] = 1.0
+    return weights
+
+
+def smooth_loop(weights, vertices, adjacency, locked, iterations):
+    weights = [list(row) for row in weights]
+    unlocked = [i for i in range(len(locked)) if not locked[i]]
+    for _ in range(iterations):
+        updated = {}
+        for vertex in vertices:
+            neighbours = adjacency.indices[adjacency.indptr[vertex]:adjacency.indptr[vertex + 1]]
+            row = list(weights[vertex])
+            for i in unlocked:
+                average = sum(weights[n][i] for n in neighbours) / len(neighbours)
+                row[i] += SMOOTH_STRENGTH * (average - row[i])
+            target = max(0.0, 1.0 - sum(row[i] for i in range(len(row)) if locked[i]))
+            total = sum(row[i] for i in unlocked)
+            if total > 0:
+                for i in unlocked:
+                    row[i] *= target / total
+            updated[vertex] = row
+        for vertex, row in updated.items():
+            weights[vertex] = row
+    return weights
+
+
+def smooth_region(np, adjacency, weights, vertices, locked, iterations):
+    region = adjacency.region(vertices)
+    indptr, indices = adjacency.local(vertices, region)
+    sparse = SparseWeights.from_dense(weights[region], np.float64)
+    return region, smooth_weights(sparse, np.searchsorted(region, vertices), indptr, indices, locked, iterations)
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main(grid_size=448, influence_count=60, iterations=3):
+    np = require_numpy()
+    vertex_count, face_counts, face_vertices = grid_mesh(np, grid_size)
+    weights = grid_weights(np, grid_size, influence_count)
+    locked = np.zeros(influence_count, dtype=bool)
+    locked[::7] = True
+    print("{} vertices, {} influences, {} iterations".format(vertex_count, influence_count, iterations))
+
+    adjacency, build_ms = timed(VertexAdjacency, vertex_count, face_counts, face_vertices)
+    print("  adjacency build (first click) : {:8.1f} ms  {:.1f} MB".format(build_ms, adjacency.nbytes / 1e6))
+
+    whole = np.arange(vertex_count)
+    _, whole_ms = timed(smooth_region, np, adjacency, weights, whole, locked, iterations)
+    print("  smooth whole mesh             : {:8.1f} ms".format(whole_ms))
+
+    half = min(10000, vertex_count // 4)
+    selection = np.arange(vertex_count // 2 - half, vertex_count // 2 + half)
+    (region, smoothed), region_ms = timed(smooth_region, np, adjacency, weights, selection, locked, iterations)
+    print("  smooth {:>5} selected vertices: {:8.1f} ms".format(len(selection), region_ms))
+
+    small = selection[:2000]
+    (region, smoothed), vector_ms = timed(smooth_region, np, adjacency, weights, small, locked, iterations)
+    expected, loop_ms = timed(smooth_loop, weights, small.tolist(), adjacency, locked.tolist(), iterations)
+    difference = np.abs(smoothed.to_dense(np.searchsorted(region, small)) - np.array(expected)[small]).max()
+    print("  {} vertices: products {:.1f} ms, per-vertex loop {:.1f} ms, max diff {:.1e}".format(
+        len(small), vector_ms, loop_ms, difference))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,48 @@
+"""Memory of the weight table data: sparse float32 WeightMatrix against nested Python lists.
+
+Runs without Maya or Qt. The nested lists stand in for what a per-cell table keeps alive
+before it even creates its widget items.
+
+    python benchmarks/weight_table.py [vertex_count] [influence_count]
+"""
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from weight_core import SparseWeights, WeightMatrix, require_numpy
+
+
+def main(vertex_count=100000, influence_count=40):
+    np = require_numpy()
+    rng = np.random.default_rng(0)
+    # Four non-zero influences a vertex, like a typical skin
+    weights = np.zeros((vertex_count, influence_count))
+    for _ in range(4):
+        weights[np.arange(vertex_count), rng.integers(0, influence_count, vertex_count)] += rng.random(vertex_count)
+    weights /= weights.sum(axis=1)[:, None]
+    influences = ["joint{}".format(i) for i in range(influence_count)]
+
+    tracemalloc.start()
+    nested = weights.tolist()
+    nested_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del nested
+
+    matrix = WeightMatrix("body", "skinCluster1", influences, np.arange(vertex_count), SparseWeights.from_dense(weights))
+    print("{} vertices x {} influences".format(vertex_count, influence_count))
+    print("  nested lists : {:8.1f} MB".format(nested_bytes / 1e6))
+    print("  WeightMatrix : {:8.1f} MB".format(matrix.nbytes / 1e6))
+
+    # What the model does for one visible page of 40 rows when scrolled to the end
+    start = time.perf_counter()
+    for row in range(vertex_count - 40, vertex_count):
+        for column in range(influence_count):
+            "{:.3f}".format(matrix.weights.value(row, column))
+    print("  one page     : {:8.2f} ms".format((time.perf_counter() - start) * 1000))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
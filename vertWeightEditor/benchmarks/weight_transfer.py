@@ -0,0 +1,116 @@
+"""Weight transfer from a coarse source sheet onto a dense 200k vertex target sheet.
+
+Runs without Maya. The source weights vary linearly across the sheet, which barycentric blending
+from the closest triangle reproduces exactly and copying the nearest vertex's weights does not.
+A brute-force closest triangle search over a sample checks the locator's choice, and again on a
+mesh mixing large and small triangles, where the closest triangle is often not one around the
+nearest vertex.
+
+    python benchmarks/weight_transfer.py [source_size] [target_size]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from weight_core import PointIndex, SparseWeights, TriangleLocator, closest_on_triangles, require_numpy, transfer_weights
+
+BRUTE_FORCE_SAMPLE = 200
+
+
+def sheet(np, size, height=0.0):
+    # size x size vertices over the unit square, split into triangles
+    x, y = np.meshgrid(np.linspace(0.0, 1.0, size), np.linspace(0.0, 1.0, size), indexing="ij")
+    positions = np.stack([x.ravel(), y.ravel(), np.full(size * size, height)], axis=1)
+    rows, columns = np.meshgrid(np.arange(size - 1), np.arange(size - 1), indexing="ij")
+    corners = (rows * size + columns).ravel()
+    triangles = np.concatenate([np.stack([corners, corners + size, corners + size + 1], axis=1),
+                                np.stack([corners, corners + size + 1, corners + 1], axis=1)])
+    return positions, triangles
+
+
+def mixed_triangles(np, rng, count):
+    # A coarse sheet of large triangles with count small triangles scattered above it
+    positions, triangles = sheet(np, 11)
+    small = rng.uniform([0.0, 0.0, 0.02], [1.0, 1.0, 0.3], (count, 3))[:, None] + rng.normal(0.0, 0.01, (count, 3, 3))
+    return (np.concatenate([positions, small.reshape(-1, 3)]),
+            np.concatenate([triangles, len(positions) + np.arange(count * 3).reshape(-1, 3)]))
+
+
+def excess_distances(np, positions, triangles, points, corners, coordinates):
+    # How much further the located surface point of every point is than the closest one over
+    # every triangle
+    a, b, c = (positions[triangles[:, i]] for i in range(3))
+    result = np.zeros(len(points))
+    for i, point in enumerate(points):
+        repeated = np.repeat(point[None], len(a), axis=0)
+        coords = closest_on_triangles(repeated, a, b, c)
+        brute = np.sqrt((((coords[:, :1] * a + coords[:, 1:2] * b + coords[:, 2:] * c) - repeated) ** 2).sum(1).min())
+        found = (coordinates[i][:, None] * positions[corners[i]]).sum(axis=0)
+        result[i] = np.linalg.norm(found - point) - brute
+    return result
+
+
+def linear_weights(np, positions):
+    # Three influences: x, y and the rest
+    return np.stack([positions[:, 0] * 0.5, positions[:, 1] * 0.5, 1.0 - 0.5 * positions[:, :2].sum(axis=1)], 1)
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, (time.perf_counter() - start) * 1000
+
+
+def main(source_size=150, target_size=448):
+    np = require_numpy()
+    source_positions, source_triangles = sheet(np, source_size)
+    target_positions, _ = sheet(np, target_size, height=0.01)
+    source = SparseWeights.from_dense(linear_weights(np, source_positions), np.float64)
+    target = SparseWeights.from_dense(np.tile([0.0, 0.0, 1.0], (len(target_positions), 1)), np.float64)
+    locked = np.zeros(3, dtype=bool)
+    expected = linear_weights(np, target_positions)
+    print("{} source vertices, {} target vertices".format(len(source_positions), len(target_positions)))
+
+    locator, build_ms = timed(TriangleLocator, source_positions, source_triangles)
+    print("  locator build       : {:8.1f} ms".format(build_ms))
+    (corners, coordinates), closest_ms = timed(locator.closest, target_positions)
+    print("  closest triangles   : {:8.1f} ms".format(closest_ms))
+    result, blend_ms = timed(transfer_weights, source, corners, coordinates, np.arange(3), target, locked)
+    print("  blend               : {:8.1f} ms, max error {:.1e}".format(
+        blend_ms, np.abs(result.to_dense() - expected).max()))
+
+    nearest, _ = PointIndex(source_positions).nearest(target_positions)
+    print("  nearest vertex copy : max error {:.1e}".format(
+        np.abs(source.to_dense(nearest) - expected).max()))
+
+    # The closest point over every source triangle, for a sample
+    sample = np.random.default_rng(0).choice(len(target_positions), BRUTE_FORCE_SAMPLE, replace=False)
+    excess, brute_ms = timed(excess_distances, np, source_positions, source_triangles, target_positions[sample],
+                             corners[sample], coordinates[sample])
+    print("  brute force, {} vertices: {:.1f} ms (~{:.0f} s for the target), worst excess distance {:.1e}".format(
+        BRUTE_FORCE_SAMPLE, brute_ms, brute_ms * len(target_positions) / BRUTE_FORCE_SAMPLE / 1000, excess.max()))
+
+    # A large triangle 1 below the point and a small one 2 above it: the small one has the nearest vertex
+    positions = np.array([[-10.0, -10.0, 2.0], [10.0, -10.0, 2.0], [0.0, 10.0, 2.0],
+                          [3.9, 3.9, 5.0], [4.1, 3.9, 5.0], [4.0, 4.1, 5.0]])
+    corners, coordinates = TriangleLocator(positions, [[0, 1, 2], [3, 4, 5]]).closest([[4.0, 4.0, 3.0]])
+    print("  large triangle below, small above: found triangle {} (expected {})".format(
+        corners[0].tolist(), [0, 1, 2]))
+
+    rng = np.random.default_rng(1)
+    positions, triangles = mixed_triangles(np, rng, 20000)
+    points = rng.uniform([0.0, 0.0, -0.3], [1.0, 1.0, 0.3], (BRUTE_FORCE_SAMPLE * 10, 3))
+    locator, build_ms = timed(TriangleLocator, positions, triangles)
+    (corners, coordinates), closest_ms = timed(locator.closest, points)
+    excess = excess_distances(np, positions, triangles, points, corners, coordinates)
+    nearest, _ = PointIndex(positions).nearest(points)
+    around_nearest = (corners == nearest[:, None]).any(axis=1)
+    print("  mixed sizes, {} triangles, {} points: build {:.1f} ms, closest {:.1f} ms, worst excess distance {:.1e}, "
+          "{} not around the nearest vertex".format(len(triangles), len(points), build_ms, closest_ms,
+                                                    excess.max(), (~around_nearest).sum()))
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:]])
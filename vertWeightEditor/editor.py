@@ -1,19 +1,94 @@
+import bisect
+
+import maya.api.OpenMaya as om
 import maya.OpenMayaUI as omui
 from PySide2 import QtWidgets, QtCore
 from shiboken2 import wrapInstance
 import maya.cmds as cmds
 
+from skin_data import (InfluenceCache, TopologyCache, selection_by_mesh, read_weights, read_locks, edit_weights,
+                       smooth_selection, mirror_selection, transfer_selection, export_weights, import_weights)
+from weight_core import influence_mask, remove_influences, weights_min_to_max
+
 WINDOW_TITLE = "Skin Weight Editor"
 WIDTH = 800
 HEIGHT = 600
 MIN_WIDTH = 300
 MIN_HEIGHT = 300
+REFRESH_DELAY = 50  # ms of selection quiet before the editor refreshes
+JOINT_COLUMNS = 4
+WEIGHT_FILE_FILTER = "Skin Weights (*.skw)"
+# Mirror directions: label, axis, side copied from
+MIRROR_DIRECTIONS = [("+X to -X", 0, 1), ("-X to +X", 0, -1), ("+Y to -Y", 1, 1), ("-Y to +Y", 1, -1),
+                     ("+Z to -Z", 2, 1), ("-Z to +Z", 2, -1)]
 
 def maya_main_window():
     # This function gets the main window of Maya
     main_window_ptr = omui.MQtUtil.mainWindow()
     return wrapInstance(int(main_window_ptr), QtWidgets.QWidget)
 
+class WeightTableModel(QtCore.QAbstractTableModel):
+    # Serves the weight table straight from the sparse float32 weight matrices, one row per
+    # vertex and one column per influence. The view only asks for the visible cells, so nothing
+    # is built per cell and a 100k vertex selection costs its non-zero weights only.
+
+    def __init__(self, parent=None):
+        super(WeightTableModel, self).__init__(parent)
+        self.matrices = []
+        self.row_offsets = [0]
+        self.influences = []
+        self.column_maps = []
+
+    def set_matrices(self, matrices):
+        self.beginResetModel()
+        self.matrices = matrices
+        self.row_offsets = [0]
+        self.influences = []
+        seen = set()
+        for matrix in matrices:
+            self.row_offsets.append(self.row_offsets[-1] + matrix.vertex_count)
+            for influence in matrix.influences:
+                if influence not in seen:
+                    seen.add(influence)
+                    self.influences.append(influence)
+        # Table column -> matrix column, per matrix; influences a mesh is not bound to stay blank
+        self.column_maps = []
+        for matrix in matrices:
+            columns = {influence: i for i, influence in enumerate(matrix.influences)}
+            self.column_maps.append([columns.get(influence) for influence in self.influences])
+        self.endResetModel()
+
+    def rowCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else self.row_offsets[-1]
+
+    def columnCount(self, parent=QtCore.QModelIndex()):
+        return 0 if parent.isValid() else len(self.influences) + 1
+
+    def data(self, index, role=QtCore.Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == QtCore.Qt.TextAlignmentRole and index.column():
+            return int(QtCore.Qt.AlignRight | QtCore.Qt.AlignVCenter)
+        if role != QtCore.Qt.DisplayRole:
+            return None
+
+        matrix_index = bisect.bisect_right(self.row_offsets, index.row()) - 1
+        matrix = self.matrices[matrix_index]
+        row = index.row() - self.row_offsets[matrix_index]
+        if not index.column():
+            return f"{matrix.mesh}.vtx[{matrix.vertices[row]}]"
+        column = self.column_maps[matrix_index][index.column() - 1]
+        if column is None:
+            return ""
+        return f"{matrix.weights.value(row, column):.3f}"
+
+    def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
+        if role != QtCore.Qt.DisplayRole:
+            return None
+        if orientation == QtCore.Qt.Horizontal:
+            return self.influences[section - 1] if section else "Vertex"
+        return str(section + 1)
+
 class WeightEditor(QtWidgets.QDialog):
     instance = None  # Class variable to keep track of the window instance
 
@@ -25,10 +100,23 @@ class WeightEditor(QtWidgets.QDialog):
         self.setMinimumWidth(MIN_WIDTH)
         self.setMinimumHeight(MIN_HEIGHT)
 
+        # skinCluster and influence lookups shared by every refresh
+        self.influence_cache = InfluenceCache()
+        # Adjacency per mesh topology, so repeated smooth clicks skip rebuilding it
+        self.topology_cache = TopologyCache()
+        self.joint_buttons = {}  # Influence name -> hold button, in display order
+
+        # Selection changes arrive in bursts while dragging a marquee or painting, so they only
+        # restart this timer and the editor refreshes once the burst is over
+        self.refresh_timer = QtCore.QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.setInterval(REFRESH_DELAY)
+        self.refresh_timer.timeout.connect(self.populate_joints_grid)
+
         self.create_ui()
 
         # Setup scriptJob for selection change
-        self.selection_job = cmds.scriptJob(event=["SelectionChanged", self.populate_joints_grid], protected=True)
+        self.selection_job = cmds.scriptJob(event=["SelectionChanged", self.schedule_refresh], protected=True)
 
         # Variables to handle dragging
         self._is_dragging = False
@@ -37,9 +125,12 @@ class WeightEditor(QtWidgets.QDialog):
         WeightEditor.instance = self  # Set the class variable to this instance
 
     def closeEvent(self, event):
+        self.refresh_timer.stop()
         # Remove the scriptJob when the window is closed
         if cmds.scriptJob(exists=self.selection_job):
             cmds.scriptJob(kill=self.selection_job, force=True)
+        self.influence_cache.remove_callbacks()
+        self.topology_cache.remove_callbacks()
         WeightEditor.instance = None  # Clear the class variable when closed
         event.accept()
 
@@ -66,9 +157,20 @@ class WeightEditor(QtWidgets.QDialog):
         self.pre_loaded_buttons_layout = QtWidgets.QVBoxLayout()
         self.hold_buttons_layout = QtWidgets.QHBoxLayout()
         self.extra_buttons_layout = QtWidgets.QHBoxLayout()
+        self.smooth_layout = QtWidgets.QHBoxLayout()
         self.pre_loaded_buttons = []
-        self.pre_loaded_buttons_names = ["Hold All", "Unhold All", "Remove Joint Weight", "Weight MinToMax"]
-        self.pre_loaded_buttons_colors = ["#3498db", "#3498db", "#e74c3c", "#2ecc71"]
+        self.pre_loaded_buttons_names = ["Hold All", "Unhold All", "Remove Joint Weight", "Weight MinToMax", "Smooth",
+                                         "Mirror"]
+        self.pre_loaded_buttons_colors = ["#3498db", "#3498db", "#e74c3c", "#2ecc71", "#9b59b6", "#e67e22"]
+
+        self.smooth_layout.addWidget(QtWidgets.QLabel("Iterations"))
+        self.smooth_iterations = QtWidgets.QSpinBox()
+        self.smooth_iterations.setRange(1, 100)
+        self.smooth_iterations.setValue(3)
+        self.smooth_layout.addWidget(self.smooth_iterations)
+
+        self.mirror_direction = QtWidgets.QComboBox()
+        self.mirror_direction.addItems([label for label, axis, direction in MIRROR_DIRECTIONS])
         
         for i in range(len(self.pre_loaded_buttons_names)):
             button = QtWidgets.QPushButton(self.pre_loaded_buttons_names[i])
@@ -86,10 +188,18 @@ class WeightEditor(QtWidgets.QDialog):
             elif self.pre_loaded_buttons_names[i] == "Weight MinToMax":
                 button.clicked.connect(self.weight_min_to_max)
                 self.extra_buttons_layout.addWidget(button)
+            elif self.pre_loaded_buttons_names[i] == "Smooth":
+                button.clicked.connect(self.smooth_weights)
+                self.smooth_layout.addWidget(button)
+            elif self.pre_loaded_buttons_names[i] == "Mirror":
+                button.clicked.connect(self.mirror_weights)
+                self.smooth_layout.addWidget(self.mirror_direction)
+                self.smooth_layout.addWidget(button)
             self.pre_loaded_buttons.append(button)
 
         self.pre_loaded_buttons_layout.addLayout(self.hold_buttons_layout)
         self.pre_loaded_buttons_layout.addLayout(self.extra_buttons_layout)
+        self.pre_loaded_buttons_layout.addLayout(self.smooth_layout)
         smooth_skin_layout.addLayout(self.pre_loaded_buttons_layout)
 
         self.no_selection_label = QtWidgets.QLabel("Please select the vertices")
@@ -105,12 +215,24 @@ class WeightEditor(QtWidgets.QDialog):
         self.scroll_area.setWidget(self.joints_grid)
         self.scroll_area.setMaximumHeight(100)
 
+        # The table reads every weight of the selection, so it is only loaded on demand and a
+        # selection change just clears it
+        table_header_layout = QtWidgets.QHBoxLayout()
         label = QtWidgets.QLabel("Smooth Skin Weights")
         label.setStyleSheet("font-weight: bold;")
-        smooth_skin_layout.addWidget(label)
-
-        self.table = QtWidgets.QTableWidget(10, 5)  # Example with 10 rows and 5 columns
-        self.table.setHorizontalHeaderLabels(["Vertex", "Joint1", "Joint2", "Joint3", "Joint4"])
+        table_header_layout.addWidget(label)
+        table_header_layout.addStretch()
+        self.load_weights_button = QtWidgets.QPushButton("Load Weights")
+        self.load_weights_button.clicked.connect(lambda: self.load_weight_table(cmds.ls(selection=True)))
+        table_header_layout.addWidget(self.load_weights_button)
+        smooth_skin_layout.addLayout(table_header_layout)
+
+        self.weight_model = WeightTableModel(self)
+        self.table = QtWidgets.QTableView()
+        self.table.setModel(self.weight_model)
+        # Fixed row heights keep scrolling independent of the row count
+        self.table.verticalHeader().setSectionResizeMode(QtWidgets.QHeaderView.Fixed)
+        self.table.verticalHeader().setDefaultSectionSize(20)
         smooth_skin_layout.addWidget(self.table)
 
         self.populate_joints_grid()
@@ -124,28 +246,45 @@ class WeightEditor(QtWidgets.QDialog):
         label = QtWidgets.QLabel("Miscellaneous Options")
         misc_layout.addWidget(label)
 
-        reset_button = QtWidgets.QPushButton("Reset Settings")
-        reset_button.clicked.connect(self.reset_settings)
-        misc_layout.addWidget(reset_button)
+        import_button = QtWidgets.QPushButton("Import Weights")
+        import_button.clicked.connect(self.import_skin_weights)
+        misc_layout.addWidget(import_button)
 
-        export_button = QtWidgets.QPushButton("Export Settings")
-        export_button.clicked.connect(self.export_settings)
+        export_button = QtWidgets.QPushButton("Export Weights")
+        export_button.clicked.connect(self.export_skin_weights)
         misc_layout.addWidget(export_button)
 
+        # Transfer weights from a source mesh onto the selected vertices or meshes
+        transfer_group = QtWidgets.QGroupBox("Transfer Weights")
+        transfer_layout = QtWidgets.QHBoxLayout(transfer_group)
+        self.transfer_source = QtWidgets.QLineEdit()
+        self.transfer_source.setPlaceholderText("Source skinned mesh")
+        transfer_layout.addWidget(self.transfer_source)
+
+        source_button = QtWidgets.QPushButton("Set Source")
+        source_button.clicked.connect(self.set_transfer_source)
+        transfer_layout.addWidget(source_button)
+
+        transfer_button = QtWidgets.QPushButton("Transfer to Selection")
+        transfer_button.clicked.connect(self.transfer_weights)
+        transfer_layout.addWidget(transfer_button)
+        misc_layout.addWidget(transfer_group)
+        misc_layout.addStretch()
+
+    def schedule_refresh(self, *args):
+        self.refresh_timer.start()
+
     def populate_joints_grid(self, *args):
-        # Clear existing buttons
-        while self.joints_layout.count():
-            child = self.joints_layout.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
+        # Unflattened, so the cost does not grow with the number of selected vertices
+        selected_vertices = cmds.ls(selection=True)
+        joints = self.get_influencing_joints(selected_vertices) if selected_vertices else []
+        self.update_joint_buttons(self.joints_layout, joints)
 
-        self.joint_buttons = []  # List to store joint buttons
+        # Reading the weights grows with the selection, so the table waits for Load Weights
+        self.weight_model.set_matrices([])
+        self.load_weights_button.setEnabled(bool(selected_vertices))
 
-        selected_vertices = cmds.ls(selection=True, flatten=True)
         if selected_vertices:
-            joints = self.get_influencing_joints(selected_vertices)
-            self.add_joint_buttons(self.joints_layout, joints)
-
             # Enable pre-loaded buttons and hide no selection label
             for button, color in zip(self.pre_loaded_buttons, self.pre_loaded_buttons_colors):
                 button.setEnabled(True)
@@ -159,31 +298,62 @@ class WeightEditor(QtWidgets.QDialog):
             self.no_selection_label.show()
 
     def get_influencing_joints(self, vertices):
-        joints = set()
-        for vertex in vertices:
-            skin_cluster = cmds.ls(cmds.listHistory(vertex), type='skinCluster')
-            if skin_cluster:
-                influences = cmds.skinCluster(skin_cluster[0], query=True, influence=True)
-                for influence in influences:
-                    joints.add(influence)
-        return list(joints)
-
-    def add_joint_buttons(self, layout, joints):
-        row = 0
-        col = 0
-        max_columns = 4 
-        for joint in joints:
-            button = QtWidgets.QPushButton(joint)
-            button.setCheckable(True)
-            button.setStyleSheet("font-size: 8px; QCheckBox::indicator:checked { background-color: green; }")
-            button.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Preferred)
-            button.toggled.connect(lambda checked, joint_name=joint: self.set_joint_liw(joint_name, checked))
-            layout.addWidget(button, row, col)
-            self.joint_buttons.append(button)
-            col += 1
-            if col >= max_columns:
-                col = 0
-                row += 1
+        # One skinCluster lookup per mesh, served from the cache after the first time
+        return self.influence_cache.influences_for(selection_by_mesh(vertices))
+
+    def load_weight_table(self, selection):
+        # Bulk getWeights per skinned mesh, kept as sparse float32 for the table model
+        matrices = []
+        try:
+            for mesh, components in selection_by_mesh(selection).items():
+                skin_cluster = self.influence_cache.skin_cluster(mesh)
+                if skin_cluster:
+                    matrices.append(read_weights(skin_cluster, mesh, components))
+        except RuntimeError as e:
+            cmds.warning(f"Failed to read skin weights: {str(e)}")
+            matrices = []
+        self.weight_model.set_matrices(matrices)
+
+    def update_joint_buttons(self, layout, joints):
+        # Only influences that left or joined the set lose or get a button; the rest are just
+        # moved to their new grid cell
+        if list(self.joint_buttons) == joints:
+            self.sync_joint_locks()
+            return
+        for joint in set(self.joint_buttons) - set(joints):
+            button = self.joint_buttons.pop(joint)
+            layout.removeWidget(button)
+            button.deleteLater()
+
+        buttons = {}
+        for index, joint in enumerate(joints):
+            button = self.joint_buttons.get(joint)
+            if button is None:
+                button = self.create_joint_button(joint)
+            else:
+                layout.removeWidget(button)
+            layout.addWidget(button, index // JOINT_COLUMNS, index % JOINT_COLUMNS)
+            buttons[joint] = button
+        self.joint_buttons = buttons
+        self.sync_joint_locks()
+
+    def create_joint_button(self, joint):
+        button = QtWidgets.QPushButton(joint)
+        button.setCheckable(True)
+        button.setStyleSheet("font-size: 8px; QCheckBox::indicator:checked { background-color: green; }")
+        button.setSizePolicy(QtWidgets.QSizePolicy.Expanding, QtWidgets.QSizePolicy.Preferred)
+        button.toggled.connect(lambda checked, joint_name=joint: self.set_joint_liw(joint_name, checked))
+        return button
+
+    def sync_joint_locks(self):
+        # Locks can change outside the editor, so read them all back in one batch. Signals are
+        # blocked so showing the state does not write it again.
+        locks = read_locks(list(self.joint_buttons))
+        for joint, button in self.joint_buttons.items():
+            if button.isChecked() != locks[joint]:
+                button.blockSignals(True)
+                button.setChecked(locks[joint])
+                button.blockSignals(False)
 
     def set_joint_liw(self, joint_name, state):
         try:
@@ -192,28 +362,129 @@ class WeightEditor(QtWidgets.QDialog):
             cmds.warning(f"Failed to set {joint_name}.liw: {str(e)}")
 
     def hold_all_joints(self):
-        for button in self.joint_buttons:
+        for button in self.joint_buttons.values():
             button.setChecked(True)
 
     def unhold_all_joints(self):
-        for button in self.joint_buttons:
+        for button in self.joint_buttons.values():
             button.setChecked(False)
 
-    def reset_settings(self):
-        # Placeholder for reset functionality
-        pass
+    def import_skin_weights(self):
+        path, _ = QtWidgets.QFileDialog.getOpenFileName(self, "Import Skin Weights", "", WEIGHT_FILE_FILTER)
+        if not path:
+            return
+        # With meshes selected only those are loaded, otherwise every mesh in the file
+        meshes = list(selection_by_mesh()) or None
+        try:
+            imported = import_weights(path, self.influence_cache.skin_cluster, meshes)
+        except (RuntimeError, ValueError) as e:
+            cmds.warning(f"Failed to import skin weights: {str(e)}")
+            return
+        om.MGlobal.displayInfo(f"Imported skin weights of {len(imported)} mesh(es) from {path}")
+        self.populate_joints_grid()
+
+    def export_skin_weights(self):
+        meshes = list(selection_by_mesh())
+        if not meshes:
+            cmds.warning("Please select the skinned meshes to export")
+            return
+        path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Export Skin Weights", "", WEIGHT_FILE_FILTER)
+        if not path:
+            return
+        try:
+            exported = export_weights(path, meshes, self.influence_cache.skin_cluster)
+        except (RuntimeError, ValueError) as e:
+            cmds.warning(f"Failed to export skin weights: {str(e)}")
+            return
+        om.MGlobal.displayInfo(f"Exported skin weights of {len(exported)} mesh(es) to {path}")
+
+    def selected_table_influences(self):
+        # Read from the selection ranges, so a selected column of 100k cells stays one range
+        influences = []
+        for selection_range in self.table.selectionModel().selection():
+            for column in range(max(selection_range.left(), 1), selection_range.right() + 1):
+                influence = self.weight_model.influences[column - 1]
+                if influence not in influences:
+                    influences.append(influence)
+        return influences
+
+    def edit_selected_weights(self, operation, name):
+        selection = cmds.ls(selection=True)
+        if not selection:
+            cmds.warning("Please select the vertices")
+            return
+        try:
+            operation(selection)
+        except RuntimeError as e:
+            cmds.warning(f"{name} failed: {str(e)}")
+        # Only a loaded table is read again
+        if self.weight_model.matrices:
+            self.load_weight_table(selection)
 
-    def export_settings(self):
-        # Placeholder for export functionality
-        pass
+    def edit_selected_matrices(self, operation, name):
+        self.edit_selected_weights(
+            lambda selection: edit_weights(selection, self.influence_cache.skin_cluster, operation, name), name)
 
     def remove_joint_weight(self):
-        # Placeholder for remove joint weight functionality
-        pass
+        influences = self.selected_table_influences()
+        if not influences:
+            cmds.warning("Load Weights and select the influence columns to remove in the weight table")
+            return
+        stranded = {}
+
+        def remove(matrix, locked):
+            weights, skipped = remove_influences(matrix.weights, influence_mask(matrix.influences, influences), locked)
+            if len(skipped):
+                stranded[matrix.mesh] = len(skipped)
+            return weights
+
+        self.edit_selected_matrices(remove, "Remove Joint Weight")
+        for mesh, count in stranded.items():
+            cmds.warning(f"{mesh}: {count} vertices have no other unlocked influence to take the removed weight "
+                         "and were left unchanged")
 
     def weight_min_to_max(self):
-        # Placeholder for weight min to max functionality
-        pass
+        self.edit_selected_matrices(lambda matrix, locked: weights_min_to_max(matrix.weights, locked), "Weight MinToMax")
+
+    def smooth_weights(self):
+        iterations = self.smooth_iterations.value()
+        self.edit_selected_weights(
+            lambda selection: smooth_selection(selection, self.influence_cache.skin_cluster, self.topology_cache,
+                                               iterations),
+            "Smooth")
+
+    def mirror_weights(self):
+        label, axis, direction = MIRROR_DIRECTIONS[self.mirror_direction.currentIndex()]
+
+        def mirror(selection):
+            unmatched, missing = mirror_selection(selection, self.influence_cache.skin_cluster, self.topology_cache,
+                                                  axis, direction)
+            for mesh, count in unmatched.items():
+                cmds.warning(f"{mesh}: {count} vertices have no symmetric counterpart, the closest one was used")
+            for mesh, influences in missing.items():
+                cmds.warning(f"{mesh}: no other side influence for {', '.join(influences)}, "
+                             f"their weights were mirrored onto themselves")
+
+        self.edit_selected_weights(mirror, "Mirror")
+
+    def set_transfer_source(self):
+        meshes = list(selection_by_mesh())
+        if not meshes:
+            cmds.warning("Please select the source skinned mesh")
+            return
+        self.transfer_source.setText(meshes[0])
+
+    def transfer_weights(self):
+        source = self.transfer_source.text().strip()
+        if not source or not cmds.objExists(source):
+            cmds.warning("Please set an existing source mesh to transfer from")
+            return
+
+        def transfer(selection):
+            count = transfer_selection(source, selection, self.influence_cache.skin_cluster)
+            om.MGlobal.displayInfo(f"Transferred skin weights from {source} to {count} vertices")
+
+        self.edit_selected_weights(transfer, "Transfer")
 
     # Mouse events for dragging the window
     def mousePressEvent(self, event):
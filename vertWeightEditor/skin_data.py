@@ -0,0 +1,506 @@
+import os
+from collections import OrderedDict
+
+import maya.api.OpenMaya as om
+import maya.api.OpenMayaAnim as oma
+import maya.cmds as cmds
+
+from weight_core import (SparseWeights, SymmetryMap, TriangleLocator, VertexAdjacency, WeightMatrix, WeightFile,
+                         WeightFileWriter, chunk_rows, influence_mirror_map, mirror_weights,
+                         missing_mirror_influences, require_numpy, smooth_weights, topology_hash, transfer_weights)
+
+PLUGIN_NAME = "skin_weights_command"
+# Writes queued for the weightEditorSetWeights command, see skin_weights_command.py
+PENDING_WRITES = []
+TOPOLOGY_CACHE_SIZE = 8  # Mesh topologies whose derived data is kept
+
+
+def get_mobject(node):
+    selection = om.MSelectionList()
+    selection.add(node)
+    return selection.getDependNode(0)
+
+
+def get_shape_path(mesh):
+    selection = om.MSelectionList()
+    selection.add(mesh)
+    return selection.getDagPath(0).extendToShape()
+
+
+def load_weights_plugin():
+    # The plugin is looked up next to this file first and on MAYA_PLUG_IN_PATH otherwise
+    if cmds.pluginInfo(PLUGIN_NAME, query=True, loaded=True):
+        return
+    plugin_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), f"{PLUGIN_NAME}.py")
+    cmds.loadPlugin(plugin_path if os.path.exists(plugin_path) else PLUGIN_NAME, quiet=True)
+
+
+def selection_by_mesh(selection=None):
+    # Group the selection by mesh without flattening it, so 20k selected vertices stay a few
+    # range strings like "body.vtx[0:19999]". Whole objects map to an empty component list.
+    if selection is None:
+        selection = cmds.ls(selection=True)
+    meshes = {}
+    for item in selection:
+        if "." in item:
+            meshes.setdefault(item.split(".")[0], []).append(item)
+        else:
+            meshes.setdefault(item, [])
+    return meshes
+
+
+class InfluenceCache(object):
+    # Caches mesh -> skinCluster and skinCluster -> influences so a selection change costs one
+    # lookup per mesh the first time and none afterwards. Influence lists are dropped when a
+    # matrix connection of their skinCluster changes (influence added or removed), the mesh
+    # lookups whenever a skinCluster is created or deleted.
+
+    def __init__(self):
+        self.skin_clusters = {}
+        self.influences = {}
+        self.skin_callbacks = {}
+        self.callbacks = [
+            om.MDGMessage.addNodeAddedCallback(self.skin_cluster_added, "skinCluster"),
+            om.MDGMessage.addNodeRemovedCallback(self.skin_cluster_removed, "skinCluster"),
+        ]
+
+    def skin_cluster_added(self, *args):
+        self.skin_clusters = {}
+
+    def skin_cluster_removed(self, node, *args):
+        self.skin_clusters = {}
+        skin_cluster = om.MFnDependencyNode(node).name()
+        self.influences.pop(skin_cluster, None)
+        if skin_cluster in self.skin_callbacks:
+            om.MMessage.removeCallback(self.skin_callbacks.pop(skin_cluster))
+
+    def influences_changed(self, message, plug, other_plug, skin_cluster):
+        if message & (om.MNodeMessage.kConnectionMade | om.MNodeMessage.kConnectionBroken):
+            if om.MFnAttribute(plug.attribute()).name() == "matrix":
+                self.influences.pop(skin_cluster, None)
+
+    def skin_cluster(self, mesh):
+        if mesh not in self.skin_clusters:
+            skin_clusters = cmds.ls(cmds.listHistory(mesh, pruneDagObjects=True) or [], type="skinCluster")
+            self.skin_clusters[mesh] = skin_clusters[0] if skin_clusters else None
+        return self.skin_clusters[mesh]
+
+    def get_influences(self, skin_cluster):
+        if skin_cluster not in self.influences:
+            self.influences[skin_cluster] = cmds.skinCluster(skin_cluster, query=True, influence=True) or []
+            if skin_cluster not in self.skin_callbacks:
+                self.skin_callbacks[skin_cluster] = om.MNodeMessage.addAttributeChangedCallback(
+                    get_mobject(skin_cluster), self.influences_changed, skin_cluster)
+        return self.influences[skin_cluster]
+
+    def influences_for(self, meshes):
+        # Influences of all the meshes' skinClusters, in skinCluster order without duplicates
+        influences = []
+        seen = set()
+        for mesh in meshes:
+            skin_cluster = self.skin_cluster(mesh)
+            if skin_cluster:
+                for influence in self.get_influences(skin_cluster):
+                    if influence not in seen:
+                        seen.add(influence)
+                        influences.append(influence)
+        return influences
+
+    def remove_callbacks(self):
+        for callback in self.callbacks + list(self.skin_callbacks.values()):
+            om.MMessage.removeCallback(callback)
+        self.callbacks = []
+        self.skin_callbacks = {}
+
+
+def read_locks(influences):
+    # Lock state (.liw) of all influences through one selection list instead of a getAttr per
+    # influence. Influences without the attribute read as unlocked.
+    selection = om.MSelectionList()
+    plugs = []
+    for influence in influences:
+        try:
+            selection.add(f"{influence}.liw")
+        except RuntimeError:
+            plugs.append((influence, None))
+            continue
+        plugs.append((influence, selection.length() - 1))
+    return {influence: index is not None and selection.getPlug(index).asBool() for influence, index in plugs}
+
+
+def selected_vertices(mesh, components=None):
+    # Sorted vertex indices of the given component strings of a mesh, or all of its vertices
+    # when there are none
+    if not components:
+        return list(range(om.MFnMesh(get_shape_path(mesh)).numVertices))
+
+    selection = om.MSelectionList()
+    for item in cmds.polyListComponentConversion(components, toVertex=True) or []:
+        selection.add(item)
+    indices = set()
+    for i in range(selection.length()):
+        indices.update(om.MFnSingleIndexedComponent(selection.getComponent(i)[1]).getElements())
+    return sorted(indices)
+
+
+def vertex_chunks(vertices, chunk_size):
+    # Vertex components of at most chunk_size of the given vertices each
+    for start in range(0, len(vertices), chunk_size):
+        component_fn = om.MFnSingleIndexedComponent()
+        component = component_fn.create(om.MFn.kMeshVertComponent)
+        component_fn.addElements(list(vertices[start:start + chunk_size]))
+        yield component
+
+
+def read_weights(skin_cluster, mesh, components=None, dtype=None):
+    # The weights of the selected vertices of one mesh as sparse rows
+    return read_vertex_weights(skin_cluster, mesh, selected_vertices(mesh, components), dtype)
+
+
+def skin_influences(skin_fn):
+    # Influence names in influenceObjects() order. getWeights returns its columns in this order
+    # and setWeights takes positions in it, which after removing and re-adding influences need
+    # not match the skinCluster's sparse logical indices or the order skinCluster -q -inf gives.
+    return [path.partialPathName() for path in skin_fn.influenceObjects()]
+
+
+def read_vertex_weights(skin_cluster, mesh, vertices, dtype=None):
+    # The weights of the given vertices as sparse rows. Read in chunks so only a chunk is ever
+    # dense; a single getWeights call for vertex sets that fit one chunk.
+    np = require_numpy()
+    skin_fn = oma.MFnSkinCluster(get_mobject(skin_cluster))
+    shape = get_shape_path(mesh)
+    vertices = [int(vertex) for vertex in vertices]
+    influences = skin_influences(skin_fn)
+    blocks = []
+    for component in vertex_chunks(vertices, chunk_rows(len(influences))):
+        weights, influence_count = skin_fn.getWeights(shape, component)
+        blocks.append(SparseWeights.from_flat(np.array(weights), influence_count, dtype))
+    return WeightMatrix(mesh, skin_cluster, influences, vertices,
+                        SparseWeights.vstack(blocks, len(influences), dtype))
+
+
+def set_weights(skin_cluster, mesh, vertices, weights):
+    # One undoable setWeights call writing full dense weight rows for the given vertices
+    load_weights_plugin()
+    component_fn = om.MFnSingleIndexedComponent()
+    component = component_fn.create(om.MFn.kMeshVertComponent)
+    component_fn.addElements(list(vertices))
+    skin_fn = oma.MFnSkinCluster(get_mobject(skin_cluster))
+    influences = om.MIntArray(list(range(weights.shape[1])))
+    values = om.MDoubleArray(weights.ravel().tolist())
+    PENDING_WRITES.append((skin_fn, get_shape_path(mesh), component, influences, values))
+    cmds.weightEditorSetWeights()
+
+
+def write_weights(matrix, weights):
+    # Write the edited weights of a matrix back in one undoable setWeights call. Only the
+    # vertices the edit changed are written. Returns how many that were.
+    rows = matrix.weights.changed_rows(weights)
+    if len(rows):
+        set_weights(matrix.skin_cluster, matrix.mesh, matrix.vertices[rows].tolist(), weights.to_dense(rows))
+    return len(rows)
+
+
+def lock_mask(influences):
+    np = require_numpy()
+    locks = read_locks(influences)
+    return np.array([locks[influence] for influence in influences], dtype=bool)
+
+
+def edit_weights(selection, skin_cluster_for, operation, name):
+    # Run operation(matrix, locked) -> weights on every skinned mesh of the selection: one bulk
+    # read and one bulk write per skinCluster, all in one undo step
+    np = require_numpy()
+    meshes = selection_by_mesh(selection)
+    cmds.undoInfo(openChunk=True, chunkName=name)
+    try:
+        for mesh, components in meshes.items():
+            skin_cluster = skin_cluster_for(mesh)
+            if not skin_cluster:
+                continue
+            matrix = read_weights(skin_cluster, mesh, components, np.float64)
+            write_weights(matrix, operation(matrix, lock_mask(matrix.influences)))
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+
+def smooth_selection(selection, skin_cluster_for, topology_cache, iterations):
+    # Smooth the selected vertices of every skinned mesh in one undo step. The weights of the
+    # selection and its neighbours are read in one go; the adjacency comes from the cache.
+    np = require_numpy()
+    meshes = selection_by_mesh(selection)
+    cmds.undoInfo(openChunk=True, chunkName="Smooth Weights")
+    try:
+        for mesh, components in meshes.items():
+            skin_cluster = skin_cluster_for(mesh)
+            if not skin_cluster:
+                continue
+            vertices = np.array(selected_vertices(mesh, components), dtype=np.int64)
+            adjacency = topology_cache.adjacency(mesh)
+            region = adjacency.region(vertices)
+            indptr, indices = adjacency.local(vertices, region)
+            matrix = read_vertex_weights(skin_cluster, mesh, region, np.float64)
+            smoothed = smooth_weights(matrix.weights, np.searchsorted(region, vertices), indptr, indices,
+                                      lock_mask(matrix.influences), iterations)
+            write_weights(matrix, smoothed)
+    finally:
+        cmds.undoInfo(closeChunk=True)
+
+
+def mirror_selection(selection, skin_cluster_for, topology_cache, axis, direction):
+    # Mirror the weights of the selected vertices (or whole meshes) from the direction side of
+    # the axis to the other, in one undo step: the destination and source rows are read in one
+    # go, gathered, moved to the mirror influences and scattered back. Locked influences keep
+    # their weights. Returns the number of vertices that had no symmetric counterpart and the
+    # sided influences without an other side influence, per mesh.
+    np = require_numpy()
+    meshes = selection_by_mesh(selection)
+    unmatched = {}
+    missing = {}
+    cmds.undoInfo(openChunk=True, chunkName="Mirror Weights")
+    try:
+        for mesh, components in meshes.items():
+            skin_cluster = skin_cluster_for(mesh)
+            if not skin_cluster:
+                continue
+            symmetry = topology_cache.symmetry(mesh, axis)
+            if len(symmetry.unmatched):
+                unmatched[mesh] = len(symmetry.unmatched)
+            destinations = symmetry.destinations(selected_vertices(mesh, components), direction)
+            if not len(destinations):
+                continue
+            sources = symmetry.mirror[destinations]
+            region = np.union1d(destinations, sources)
+            matrix = read_vertex_weights(skin_cluster, mesh, region, np.float64)
+            if missing_mirror_influences(matrix.influences):
+                missing[mesh] = missing_mirror_influences(matrix.influences)
+            mirrored = mirror_weights(matrix.weights, np.searchsorted(region, destinations),
+                                      np.searchsorted(region, sources), influence_mirror_map(matrix.influences),
+                                      lock_mask(matrix.influences))
+            write_weights(matrix, mirrored)
+    finally:
+        cmds.undoInfo(closeChunk=True)
+    return unmatched, missing
+
+
+def mesh_positions(mesh, world_space=False):
+    # Vertex positions as an (n, 3) array, through one MFnMesh.getPoints call
+    np = require_numpy()
+    points = om.MFnMesh(get_shape_path(mesh)).getPoints(om.MSpace.kWorld if world_space else om.MSpace.kObject)
+    return np.array(points, dtype=np.float64).reshape(-1, 4)[:, :3]
+
+
+def bind_shape(mesh):
+    # The intermediate (Orig) shape a deformed mesh is computed from, i.e. the mesh in its bind
+    # pose, or the mesh itself when it is not deformed. listHistory lists upstream nodes last.
+    shapes = cmds.ls(cmds.listHistory(mesh) or [], type="mesh", intermediateObjects=True)
+    return shapes[-1] if shapes else mesh
+
+
+def mesh_triangles(mesh):
+    # The mesh's triangulation as an (n, 3) array of vertex indices
+    np = require_numpy()
+    _, triangle_vertices = om.MFnMesh(get_shape_path(mesh)).getTriangles()
+    return np.array(triangle_vertices, dtype=np.int64).reshape(-1, 3)
+
+
+def ensure_influences(skin_cluster, mesh, influences):
+    # The skinCluster of mesh with all the influences, binding the mesh to them when it has no
+    # skinCluster yet and adding missing ones with zero weight otherwise
+    if not skin_cluster:
+        return cmds.skinCluster(influences, mesh, toSelectedBones=True)[0]
+    existing = skin_influences(oma.MFnSkinCluster(get_mobject(skin_cluster)))
+    for influence in influences:
+        if influence not in existing:
+            cmds.skinCluster(skin_cluster, edit=True, addInfluence=influence, weight=0.0)
+    return skin_cluster
+
+
+def transfer_selection(source, selection, skin_cluster_for):
+    # Copy weights from the source mesh onto the selected vertices (or whole meshes) by closest
+    # surface point in world space, blending the closest triangle's corner weights. The source
+    # is read and indexed once; each target is read and written in bulk, all in one undo step.
+    # Returns the number of vertices transferred.
+    np = require_numpy()
+    source_skin_cluster = skin_cluster_for(source)
+    if not source_skin_cluster:
+        raise RuntimeError(f"{source} has no skinCluster to transfer from.")
+    source_matrix = read_weights(source_skin_cluster, source, None, np.float64)
+    locator = TriangleLocator(mesh_positions(source, world_space=True), mesh_triangles(source))
+
+    transferred = 0
+    cmds.undoInfo(openChunk=True, chunkName="Transfer Weights")
+    try:
+        for mesh, components in selection_by_mesh(selection).items():
+            if mesh == source:
+                continue
+            skin_cluster = ensure_influences(skin_cluster_for(mesh), mesh, source_matrix.influences)
+            vertices = selected_vertices(mesh, components)
+            matrix = read_vertex_weights(skin_cluster, mesh, vertices, np.float64)
+            column_map = np.array([matrix.influences.index(influence) for influence in source_matrix.influences],
+                                  dtype=np.int64)
+            corners, coordinates = locator.closest(mesh_positions(mesh, world_space=True)[vertices])
+            write_weights(matrix, transfer_weights(source_matrix.weights, corners, coordinates, column_map,
+                                                   matrix.weights, lock_mask(matrix.influences)))
+            transferred += len(vertices)
+    finally:
+        cmds.undoInfo(closeChunk=True)
+    return transferred
+
+
+def mesh_topology(mesh):
+    # Vertex count and face-vertex lists (per-face counts, flat vertex indices) of a mesh
+    np = require_numpy()
+    mesh_fn = om.MFnMesh(get_shape_path(mesh))
+    face_counts, face_vertices = mesh_fn.getVertices()
+    return mesh_fn.numVertices, np.array(face_counts, dtype=np.int32), np.array(face_vertices, dtype=np.int32)
+
+
+class TopologyCache(object):
+    # Data derived from mesh shapes, so repeated operations on a mesh build it once. The most
+    # recently used TOPOLOGY_CACHE_SIZE entries are kept. Entries are keyed by the shape's
+    # MObjectHandle and its vertex, edge and face counts, which cost nothing to read on every
+    # click; a topology-changed callback per shape drops its entries for edits that keep the
+    # counts. Symmetry maps are built from the points of the bind shape, since the posed points
+    # of a skinned mesh are rarely symmetric, and kept in the bind shape's entry; a dirty plug
+    # callback on the bind shape drops them when its points are edited.
+
+    def __init__(self):
+        self.entries = OrderedDict()
+        self.callbacks = {}
+
+    def entry(self, key):
+        if key in self.entries:
+            self.entries.move_to_end(key)
+        else:
+            self.entries[key] = {}
+            while len(self.entries) > TOPOLOGY_CACHE_SIZE:
+                self.entries.popitem(last=False)
+        return self.entries[key]
+
+    def clear(self):
+        self.entries = OrderedDict()
+
+    def shape_key(self, mesh):
+        shape = get_shape_path(mesh)
+        handle = om.MObjectHandle(shape.node())
+        mesh_fn = om.MFnMesh(shape)
+        key = ("shape", handle.hashCode(), mesh_fn.numVertices, mesh_fn.numEdges, mesh_fn.numPolygons)
+        # The hash code of a deleted shape can come back on a new one
+        stored = self.entries.get(key, {}).get("handle")
+        if stored is not None and not (stored.isAlive() and stored == handle):
+            del self.entries[key]
+        if (handle.hashCode(), "topology") not in self.callbacks:
+            self.callbacks[(handle.hashCode(), "topology")] = om.MPolyMessage.addPolyTopologyChangedCallback(
+                shape.node(), self.topology_changed, handle.hashCode())
+        return key, handle
+
+    def topology_changed(self, node, hash_code):
+        for key in [key for key in self.entries if key[0] == "shape" and key[1] == hash_code]:
+            del self.entries[key]
+
+    def points_changed(self, node, plug, hash_code):
+        # Any change upstream of the shape's output mesh, e.g. tweaks or a vertex edit
+        if plug.partialName(useLongNames=True) != "outMesh":
+            return
+        for key in [key for key in self.entries if key[0] == "shape" and key[1] == hash_code]:
+            self.entries[key].pop("symmetry", None)
+
+    def remove_callbacks(self):
+        for callback in self.callbacks.values():
+            om.MMessage.removeCallback(callback)
+        self.callbacks = {}
+
+    def adjacency(self, mesh):
+        key, handle = self.shape_key(mesh)
+        entry = self.entry(key)
+        if "adjacency" not in entry:
+            entry["handle"] = handle
+            entry["adjacency"] = VertexAdjacency(*mesh_topology(mesh))
+        return entry["adjacency"]
+
+    def symmetry(self, mesh, axis):
+        shape = bind_shape(mesh)
+        key, handle = self.shape_key(shape)
+        if (handle.hashCode(), "points") not in self.callbacks:
+            self.callbacks[(handle.hashCode(), "points")] = om.MNodeMessage.addNodeDirtyPlugCallback(
+                handle.object(), self.points_changed, handle.hashCode())
+        entry = self.entry(key)
+        entry["handle"] = handle
+        maps = entry.setdefault("symmetry", {})
+        if axis not in maps:
+            maps[axis] = SymmetryMap(mesh_positions(shape), axis)
+        return maps[axis]
+
+
+def mesh_topology_hash(mesh):
+    return topology_hash(*mesh_topology(mesh))
+
+
+def read_weight_chunks(skin_cluster, mesh, chunk_size=None):
+    # The mesh's weights as float32 blocks of chunk_size vertices, one getWeights call each
+    np = require_numpy()
+    skin_fn = oma.MFnSkinCluster(get_mobject(skin_cluster))
+    shape = get_shape_path(mesh)
+    vertex_count = om.MFnMesh(shape).numVertices
+    chunk_size = chunk_size or chunk_rows(len(skin_fn.influenceObjects()))
+    for component in vertex_chunks(range(vertex_count), chunk_size):
+        weights, influence_count = skin_fn.getWeights(shape, component)
+        yield np.array(weights, dtype=np.float32).reshape(-1, influence_count)
+
+
+def export_weights(path, meshes, skin_cluster_for):
+    # Write the whole-mesh weights of every skinned mesh to a weight file. Returns the meshes
+    # written.
+    exported = []
+    with WeightFileWriter(path) as writer:
+        for mesh in meshes:
+            skin_cluster = skin_cluster_for(mesh)
+            if not skin_cluster:
+                continue
+            influences = skin_influences(oma.MFnSkinCluster(get_mobject(skin_cluster)))
+            vertex_count = om.MFnMesh(get_shape_path(mesh)).numVertices
+            writer.add_mesh(mesh, skin_cluster, influences, vertex_count, mesh_topology_hash(mesh),
+                            read_weight_chunks(skin_cluster, mesh))
+            exported.append(mesh)
+    return exported
+
+
+def import_weights(path, skin_cluster_for, meshes=None):
+    # Load a weight file back chunk by chunk in one undo step. Meshes are matched by name
+    # (limited to meshes when given) and must have the stored topology; meshes without a
+    # skinCluster are bound to the stored influences first. Returns the meshes loaded.
+    np = require_numpy()
+    weight_file = WeightFile(path)
+    imported = []
+    cmds.undoInfo(openChunk=True, chunkName="Import Skin Weights")
+    try:
+        for entry in weight_file.meshes:
+            mesh = entry["mesh"]
+            if meshes is not None and mesh not in meshes:
+                continue
+            if not cmds.objExists(mesh):
+                cmds.warning(f"Skipping {mesh}: not found in the scene.")
+                continue
+            if mesh_topology_hash(mesh) != entry["topology_hash"]:
+                cmds.warning(f"Skipping {mesh}: its topology differs from the exported mesh.")
+                continue
+            missing = [influence for influence in entry["influences"] if not cmds.objExists(influence)]
+            if missing:
+                cmds.warning(f"Skipping {mesh}: missing influences {', '.join(missing)}.")
+                continue
+
+            skin_cluster = ensure_influences(skin_cluster_for(mesh), mesh, entry["influences"])
+            influences = skin_influences(oma.MFnSkinCluster(get_mobject(skin_cluster)))
+            # File column -> setWeights position; influences missing from the file get zero
+            columns = [influences.index(influence) for influence in entry["influences"]]
+
+            for start, block in weight_file.chunks(entry):
+                rows = np.zeros((block.shape[0], len(influences)))
+                rows[:, columns] = block.to_dense()
+                set_weights(skin_cluster, mesh, range(start, start + block.shape[0]), rows)
+            imported.append(mesh)
+    finally:
+        cmds.undoInfo(closeChunk=True)
+    return imported
@@ -0,0 +1,58 @@
+import maya.api.OpenMaya as om
+
+import skin_data
+
+# setWeights through the API is not undoable on its own, so bulk writes go through this command:
+# skin_data.write_weights queues the write and calls it, and Maya keeps the command on its undo
+# queue together with the old weights setWeights hands back.
+
+
+def maya_useNewAPI():
+    pass
+
+
+class SetSkinWeightsCommand(om.MPxCommand):
+    kCommandName = "weightEditorSetWeights"
+
+    def __init__(self):
+        super(SetSkinWeightsCommand, self).__init__()
+        self.write = None
+        self.old_weights = None
+
+    @staticmethod
+    def creator():
+        return SetSkinWeightsCommand()
+
+    def isUndoable(self):
+        return True
+
+    def doIt(self, args):
+        if not skin_data.PENDING_WRITES:
+            raise RuntimeError(f"{self.kCommandName} is called by the weight editor and has nothing to write.")
+        self.write = skin_data.PENDING_WRITES.pop(0)
+        self.redoIt()
+
+    def redoIt(self):
+        skin_fn, shape, component, influences, weights = self.write
+        self.old_weights = skin_fn.setWeights(shape, component, influences, weights, False, True)
+
+    def undoIt(self):
+        skin_fn, shape, component, influences, weights = self.write
+        skin_fn.setWeights(shape, component, influences, self.old_weights, False, False)
+
+
+def initializePlugin(mobject):
+    mplugin = om.MFnPlugin(mobject)
+
+    try:
+        mplugin.registerCommand(SetSkinWeightsCommand.kCommandName, SetSkinWeightsCommand.creator)
+    except RuntimeError as e:
+        om.MGlobal.displayError(f"Failed to register command: {e}")
+
+def uninitializePlugin(mobject):
+    mplugin = om.MFnPlugin(mobject)
+
+    try:
+        mplugin.deregisterCommand(SetSkinWeightsCommand.kCommandName)
+    except RuntimeError as e:
+        om.MGlobal.displayError(f"Failed to deregister command: {e}")
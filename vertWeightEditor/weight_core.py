@@ -0,0 +1,893 @@
+# Maya-free weight data used by the weight editor, so it can also be benchmarked outside Maya.
+# The bulk operations need NumPy; it is imported on first use so the editor itself still opens
+# in a Maya without it.
+import hashlib
+import json
+import struct
+
+np = None
+_numpy_checked = False
+
+
+def load_numpy():
+    # Import NumPy on first use and return the module, or None when it is not installed
+    global np, _numpy_checked
+    if not _numpy_checked:
+        _numpy_checked = True
+        try:
+            import numpy
+            np = numpy
+        except ImportError:
+            np = None
+    return np
+
+
+def require_numpy():
+    if load_numpy() is None:
+        raise RuntimeError("The weight editor's bulk weight operations need NumPy, which is not available in this Python.")
+    return np
+
+
+def spans(starts, counts):
+    # Concatenated ranges starts[i]:starts[i] + counts[i]
+    entries = np.repeat(starts - np.cumsum(np.concatenate([[0], counts[:-1]])), counts)
+    return entries + np.arange(len(entries))
+
+
+def row_spans(indptr, rows):
+    # Positions of the stored entries of the given CSR rows, row after row, and their counts
+    rows = np.asarray(rows, dtype=np.int64)
+    counts = indptr[rows + 1] - indptr[rows]
+    return spans(indptr[rows], counts), counts
+
+
+class SparseWeights(object):
+    # Vertices x influences weights in CSR form: the non-zero weights of row i are
+    # data[indptr[i]:indptr[i + 1]], on the influence columns in indices at the same positions.
+    # A skinned vertex has a handful of non-zero weights however many influences the skin has,
+    # so this stays small where a dense array grows with the influence count, and column ops
+    # only touch the stored entries.
+
+    def __init__(self, indptr, indices, data, shape):
+        require_numpy()
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.data = np.asarray(data)
+        self.shape = (int(shape[0]), int(shape[1]))
+        self._rows = None
+
+    @classmethod
+    def from_dense(cls, weights, dtype=None):
+        require_numpy()
+        weights = np.asarray(weights, dtype=dtype or np.float32)
+        rows, columns = np.nonzero(weights)
+        indptr = np.zeros(weights.shape[0] + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=weights.shape[0]), out=indptr[1:])
+        return cls(indptr, columns, weights[rows, columns], weights.shape)
+
+    @classmethod
+    def from_entries(cls, keys, values, shape):
+        # From unsorted row * column count + column keys; values of repeated keys are summed
+        require_numpy()
+        if not len(keys):
+            return cls(np.zeros(shape[0] + 1), keys, values, shape)
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        starts = np.flatnonzero(np.concatenate([[True], keys[1:] != keys[:-1]]))
+        values = np.add.reduceat(values[order], starts)
+        keys = keys[starts]
+        indptr = np.zeros(shape[0] + 1, dtype=np.int64)
+        np.cumsum(np.bincount(keys // shape[1], minlength=shape[0]), out=indptr[1:])
+        return cls(indptr, keys % shape[1], values, shape)
+
+    @classmethod
+    def from_flat(cls, values, influence_count, dtype=None):
+        # From the flat vertex-major array MFnSkinCluster.getWeights returns
+        require_numpy()
+        return cls.from_dense(np.asarray(values).reshape(-1, influence_count), dtype)
+
+    @classmethod
+    def vstack(cls, blocks, influence_count, dtype=None):
+        # Stack blocks of rows, e.g. built chunk by chunk from separate getWeights calls
+        require_numpy()
+        blocks = list(blocks)
+        if not blocks:
+            return cls(np.zeros(1), [], np.zeros(0, dtype=dtype or np.float32), (0, influence_count))
+        offsets = np.cumsum([0] + [block.indptr[-1] for block in blocks[:-1]])
+        indptr = np.concatenate([[0]] + [block.indptr[1:] + offset for block, offset in zip(blocks, offsets)])
+        return cls(indptr, np.concatenate([block.indices for block in blocks]),
+                   np.concatenate([block.data for block in blocks]),
+                   (sum(block.shape[0] for block in blocks), influence_count))
+
+    @property
+    def nnz(self):
+        return len(self.data)
+
+    @property
+    def nbytes(self):
+        return self.indptr.nbytes + self.indices.nbytes + self.data.nbytes
+
+    @property
+    def rows(self):
+        # Row of every stored entry, built once
+        if self._rows is None:
+            self._rows = np.repeat(np.arange(self.shape[0], dtype=np.int32), np.diff(self.indptr))
+        return self._rows
+
+    def copy(self, data=None):
+        result = SparseWeights(self.indptr, self.indices, self.data.copy() if data is None else data, self.shape)
+        result._rows = self._rows
+        return result
+
+    def value(self, row, column):
+        start, stop = self.indptr[row], self.indptr[row + 1]
+        for i in range(start, stop):
+            if self.indices[i] == column:
+                return float(self.data[i])
+        return 0.0
+
+    def column(self, column):
+        # One influence's weights as a dense vector over the rows
+        result = np.zeros(self.shape[0], dtype=self.data.dtype)
+        entries = self.indices == column
+        result[self.rows[entries]] = self.data[entries]
+        return result
+
+    def row_sums(self, columns=None):
+        # Per-row total, over all columns or over those set in the columns mask
+        if columns is None:
+            return np.bincount(self.rows, weights=self.data, minlength=self.shape[0])
+        entries = columns[self.indices]
+        return np.bincount(self.rows[entries], weights=self.data[entries], minlength=self.shape[0])
+
+    def to_dense(self, rows=None):
+        # Dense weights of all rows, or of the given row indices
+        if rows is None:
+            result = np.zeros(self.shape, dtype=self.data.dtype)
+            result[self.rows, self.indices] = self.data
+            return result
+        entries, counts = row_spans(self.indptr, rows)
+        result = np.zeros((len(rows), self.shape[1]), dtype=self.data.dtype)
+        result[np.repeat(np.arange(len(rows)), counts), self.indices[entries]] = self.data[entries]
+        return result
+
+    def to_flat(self, rows=None):
+        # Vertex-major flat weights, as MFnSkinCluster.setWeights takes them
+        return self.to_dense(rows).ravel()
+
+    def drop(self, entries):
+        # Copy without the stored entries set in the entries mask
+        keep = ~entries
+        indptr = np.zeros(self.shape[0] + 1, dtype=np.int64)
+        np.cumsum(np.bincount(self.rows[keep], minlength=self.shape[0]), out=indptr[1:])
+        return SparseWeights(indptr, self.indices[keep], self.data[keep], self.shape)
+
+    def changed_rows(self, other, tolerance=1e-9):
+        # Indices of the rows that differ from other, so only those get written and undone
+        influence_count = self.shape[1]
+        keys = np.concatenate([self.rows.astype(np.int64) * influence_count + self.indices,
+                               other.rows.astype(np.int64) * influence_count + other.indices])
+        unique, inverse = np.unique(keys, return_inverse=True)
+        difference = np.zeros(len(unique))
+        np.add.at(difference, inverse, np.concatenate([self.data, -other.data]))
+        return np.unique(unique[np.abs(difference) > tolerance] // influence_count)
+
+
+class WeightMatrix(object):
+    # Weights of some vertices of one skinned mesh, read in bulk: weights is a SparseWeights
+    # whose row i holds vertex vertices[i] and whose column j is influences[j]. Display uses
+    # float32; edits use float64 so untouched weights are written back exactly.
+
+    def __init__(self, mesh, skin_cluster, influences, vertices, weights):
+        require_numpy()
+        self.mesh = mesh
+        self.skin_cluster = skin_cluster
+        self.influences = list(influences)
+        self.vertices = np.asarray(vertices, dtype=np.int32)
+        self.weights = weights
+
+    @property
+    def vertex_count(self):
+        return len(self.vertices)
+
+    @property
+    def influence_count(self):
+        return len(self.influences)
+
+    @property
+    def nbytes(self):
+        return self.vertices.nbytes + self.weights.nbytes
+
+
+def influence_mask(influences, names):
+    # Boolean column mask of the influences that are in names
+    require_numpy()
+    names = set(names)
+    return np.array([influence in names for influence in influences], dtype=bool)
+
+
+def remove_influences(weights, removed, locked):
+    # Zero the removed columns and hand their weight to the other unlocked influences in
+    # proportion to what those already have, so every vertex keeps its total. Locked columns
+    # never change; vertices whose freed weight has nowhere to go are left as they are and
+    # returned as the second value (row indices), so the caller can report them.
+    require_numpy()
+    removed = removed & ~locked
+    receivers = ~(removed | locked)
+    freed = weights.row_sums(removed)
+    receiving = weights.row_sums(receivers)
+    moved = (freed > 0) & (receiving > 0)
+    stranded = np.flatnonzero((freed > 0) & (receiving <= 0))
+    if not moved.any():
+        return weights.copy(), stranded
+
+    scale = np.ones(weights.shape[0])
+    scale[moved] = (receiving[moved] + freed[moved]) / receiving[moved]
+    data = weights.data.copy()
+    entries = receivers[weights.indices]
+    data[entries] *= scale[weights.rows[entries]]
+    result = weights.copy(data)
+    return result.drop(removed[result.indices] & moved[result.rows]), stranded
+
+
+def normalize_weights(weights, locked, rows=None):
+    # Scale each row's unlocked weights so the row sums to one again, for all rows or only
+    # those set in the rows mask. Locked weights never change; rows without unlocked weight are
+    # left as they are.
+    require_numpy()
+    unlocked = ~locked
+    target = np.clip(1.0 - weights.row_sums(locked), 0.0, None)
+    current = weights.row_sums(unlocked)
+    scale = np.ones(weights.shape[0])
+    np.divide(target, current, out=scale, where=current > 0)
+    if rows is not None:
+        scale[~rows] = 1.0
+    data = weights.data.copy()
+    entries = unlocked[weights.indices]
+    data[entries] *= scale[weights.rows[entries]]
+    return weights.copy(data)
+
+
+def weights_min_to_max(weights, locked):
+    # Push every vertex to its extremes: the strongest unlocked influence takes the whole
+    # unlocked weight and the other unlocked influences drop to zero
+    require_numpy()
+    entries = ~locked[weights.indices] & (weights.data > 0)
+    if not entries.any():
+        return weights.copy()
+
+    # Per row, the stored entry with the largest unlocked weight (first one on ties)
+    values = np.where(entries, weights.data, -1.0)
+    filled = np.flatnonzero(np.diff(weights.indptr))
+    row_max = np.full(weights.shape[0], -1.0)
+    row_max[filled] = np.maximum.reduceat(values, weights.indptr[filled])
+    candidates = np.flatnonzero(entries & (values == row_max[weights.rows]))
+    rows = weights.rows[candidates]
+    first = np.ones(len(candidates), dtype=bool)
+    first[1:] = rows[1:] != rows[:-1]
+    strongest = candidates[first]
+
+    data = weights.data.copy()
+    data[strongest] = weights.row_sums(~locked)[weights.rows[strongest]]
+    cleared = entries.copy()
+    cleared[strongest] = False
+    data[cleared] = 0.0
+    return weights.copy(data).drop(cleared)
+
+
+def topology_hash(vertex_count, face_counts, face_vertices):
+    # Hash of a mesh's vertex count and face-vertex lists. Two meshes with the same hash have
+    # the same vertex order, so per-vertex data can be moved between them by index.
+    require_numpy()
+    digest = hashlib.sha1(np.int64(vertex_count).tobytes())
+    digest.update(np.asarray(face_counts, dtype=np.int32).tobytes())
+    digest.update(np.asarray(face_vertices, dtype=np.int32).tobytes())
+    return digest.hexdigest()
+
+
+class VertexAdjacency(object):
+    # Edge neighbours of every vertex of a mesh in CSR form: the neighbours of vertex v are
+    # indices[indptr[v]:indptr[v + 1]], sorted. Built once from the face-vertex lists and only
+    # valid for meshes of the topology it was built from.
+
+    def __init__(self, vertex_count, face_counts, face_vertices):
+        require_numpy()
+        face_counts = np.asarray(face_counts, dtype=np.int64)
+        face_vertices = np.asarray(face_vertices, dtype=np.int64)
+        # Each face-vertex connects to the next one of its face, the last one back to the first
+        face_starts = np.repeat(np.cumsum(face_counts) - face_counts, face_counts)
+        positions = np.arange(len(face_vertices))
+        following = positions + 1
+        ends = np.cumsum(face_counts) - 1
+        following[ends] = face_starts[ends]
+        first = np.concatenate([face_vertices, face_vertices[following]])
+        second = np.concatenate([face_vertices[following], face_vertices])
+        edges = np.sort(first * vertex_count + second)
+        edges = edges[np.concatenate([[True], edges[1:] != edges[:-1]])]
+
+        self.vertex_count = vertex_count
+        self.indices = (edges % vertex_count).astype(np.int32)
+        self.indptr = np.zeros(vertex_count + 1, dtype=np.int64)
+        np.cumsum(np.bincount(edges // vertex_count, minlength=vertex_count), out=self.indptr[1:])
+
+    @property
+    def nbytes(self):
+        return self.indptr.nbytes + self.indices.nbytes
+
+    def neighbour_entries(self, vertices):
+        # Positions in indices of the neighbours of the given vertices, row after row
+        return row_spans(self.indptr, vertices)
+
+    def region(self, vertices):
+        # The vertices together with all their neighbours, sorted
+        entries, _ = self.neighbour_entries(vertices)
+        return np.union1d(np.asarray(vertices, dtype=np.int64), self.indices[entries])
+
+    def local(self, vertices, region):
+        # Neighbour lists of the vertices as positions in region, which must hold them all
+        entries, counts = self.neighbour_entries(vertices)
+        indptr = np.zeros(len(counts) + 1, dtype=np.int64)
+        np.cumsum(counts, out=indptr[1:])
+        return indptr, np.searchsorted(region, self.indices[entries])
+
+
+SMOOTH_STRENGTH = 0.5
+
+
+def smooth_weights(weights, rows, indptr, indices, locked, iterations=1, strength=SMOOTH_STRENGTH):
+    # Smooth the given rows of a region's weights towards the average of their neighbours
+    # (indptr, indices, as returned by VertexAdjacency.local). Each iteration is one sparse
+    # product with the smoothing matrix: a smoothed row keeps 1 - strength of itself and takes
+    # strength spread evenly over its neighbours. The other region rows only feed their weights
+    # in. Locked columns keep their weights and the unlocked ones are renormalized every time.
+    require_numpy()
+    rows = np.asarray(rows, dtype=np.int64)
+    counts = np.diff(indptr)
+    smoothed = rows[counts > 0]
+    result = weights.copy()
+    if not len(smoothed) or iterations < 1:
+        return result
+
+    # The smoothing matrix as (target row, source row, coefficient) triplets
+    targets = np.concatenate([np.repeat(rows, counts), smoothed])
+    sources = np.concatenate([indices, smoothed])
+    coefficients = np.concatenate([np.repeat(strength / np.maximum(counts, 1), counts),
+                                   np.full(len(smoothed), 1.0 - strength)])
+    is_smoothed = np.zeros(weights.shape[0], dtype=bool)
+    is_smoothed[smoothed] = True
+    influence_count = weights.shape[1]
+
+    for _ in range(iterations):
+        entries, entry_counts = row_spans(result.indptr, sources)
+        columns = result.indices[entries]
+        moving = ~locked[columns]
+        keys = np.repeat(targets, entry_counts)[moving] * influence_count + columns[moving]
+        values = (result.data[entries] * np.repeat(coefficients, entry_counts))[moving]
+        # Entries that stay: every entry of the rows not smoothed, locked entries of the rest
+        fixed = ~is_smoothed[result.rows] | locked[result.indices]
+        keys = np.concatenate([keys, result.rows[fixed].astype(np.int64) * influence_count + result.indices[fixed]])
+        values = np.concatenate([values, result.data[fixed]])
+        result = normalize_weights(SparseWeights.from_entries(keys, values.astype(weights.data.dtype), weights.shape),
+                                   locked, is_smoothed)
+    return result
+
+
+POINTS_PER_CELL = 2
+QUERY_BATCH = 32768
+MAX_SEARCH_RING = 8  # Queries still open after this many cell rings are searched exhaustively
+BRUTE_FORCE_PAIRS = 4 * 1024 * 1024  # Query-point distances computed at once when searching exhaustively
+
+
+def group_minimum(groups, values):
+    # For values in runs of equal groups: the group of each run, the position of the run's
+    # (first) smallest value and that value
+    starts = np.flatnonzero(np.concatenate([[True], groups[1:] != groups[:-1]]))
+    runs = np.repeat(np.arange(len(starts)), np.diff(np.append(starts, len(values))))
+    minimum = np.minimum.reduceat(values, starts)
+    hits = np.flatnonzero(values == minimum[runs])
+    hits = hits[np.concatenate([[True], runs[hits][1:] != runs[hits][:-1]])]
+    return groups[starts], hits, minimum
+
+
+class CellGrid(object):
+    # Uniform grid of cells over [lower, upper] holding items (points, triangles). Items are
+    # sorted by cell so each occupied cell is one range. Searches go ring by ring of cells around
+    # a query's cell: anything in a cell more than ring cells away is at least ring cells plus the
+    # query's distance outside the grid away.
+
+    def cell_coords(self, points):
+        return np.floor((points - self.lower) / self.cell_size).astype(np.int64)
+
+    def cell_keys(self, cells):
+        return (cells[:, 0] * self.dims[1] + cells[:, 1]) * self.dims[2] + cells[:, 2]
+
+    def fill(self, keys, items):
+        order = np.argsort(keys, kind="stable")
+        self.items = items[order]
+        self.keys, self.starts, self.counts = np.unique(keys[order], return_index=True, return_counts=True)
+        self.shells = {}
+
+    def shell(self, ring):
+        # Cell offsets at exactly ring cells from the centre cell, leaving out those wider than
+        # the grid (a flat grid only gets offsets in its plane)
+        if ring not in self.shells:
+            axes = [np.arange(-min(ring, dim - 1), min(ring, dim - 1) + 1) for dim in self.dims]
+            offsets = np.stack(np.meshgrid(*axes, indexing="ij"), axis=-1).reshape(-1, 3)
+            self.shells[ring] = offsets[np.abs(offsets).max(axis=1) == ring]
+        return self.shells[ring]
+
+    def start_cells(self, queries):
+        # Queries outside the grid search from the nearest cell inside it; their squared distance
+        # to the grid is added to every bound
+        outside_d2 = ((np.maximum(self.lower - queries, 0.0) ** 2).sum(axis=1)
+                      + (np.maximum(queries - self.upper, 0.0) ** 2).sum(axis=1))
+        return np.clip(self.cell_coords(queries), 0, self.dims - 1), outside_d2
+
+    def ring_items(self, cells, queries, ring):
+        # (query, item) pairs for the items of the occupied cells ring cells away from each
+        # query's cell, grouped by query
+        offsets = self.shell(ring)
+        pair_cells = (cells[queries][:, None, :] + offsets[None]).reshape(-1, 3)
+        pair_queries = np.repeat(queries, len(offsets))
+        inside = np.all((pair_cells >= 0) & (pair_cells < self.dims), axis=1)
+        keys = self.cell_keys(pair_cells[inside])
+        pair_queries = pair_queries[inside]
+        slots = np.minimum(np.searchsorted(self.keys, keys), len(self.keys) - 1)
+        occupied = self.keys[slots] == keys
+        slots = slots[occupied]
+        return (np.repeat(pair_queries[occupied], self.counts[slots]),
+                self.items[spans(self.starts[slots], self.counts[slots])])
+
+
+class PointIndex(CellGrid):
+    # Uniform grid over a point cloud for exact nearest point queries in bulk: a query searches
+    # rings of cells around its own until nothing closer can be left outside the rings searched.
+    # Used where a KD-tree would be, as SciPy is not part of Maya's Python.
+
+    def __init__(self, points, points_per_cell=POINTS_PER_CELL):
+        require_numpy()
+        self.points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        count = len(self.points)
+        self.lower = self.points.min(axis=0) if count else np.zeros(3)
+        self.upper = self.points.max(axis=0) if count else np.zeros(3)
+        extent = self.upper - self.lower
+        # Near-flat axes (a plane, a 2D profile) are left out when sizing the cells
+        spread = extent[extent > extent.max() * 1e-3]
+        if count > 1 and len(spread):
+            self.cell_size = float((np.prod(spread) * points_per_cell / count) ** (1.0 / len(spread)))
+        else:
+            self.cell_size = 1.0
+
+        # Sized for a filled volume first; points on a surface crowd into fewer cells, so shrink
+        # the cells (by the square root, as for a surface) until the occupied ones hold about
+        # points_per_cell points
+        for _ in range(3):
+            self.dims = (extent // self.cell_size).astype(np.int64) + 1
+            self.fill(self.cell_keys(self.cell_coords(self.points)), np.arange(count))
+            occupancy = count / max(1, len(self.keys))
+            if occupancy <= 2 * points_per_cell:
+                break
+            self.cell_size *= (points_per_cell / occupancy) ** 0.5
+
+    def nearest(self, queries):
+        # Index of and distance to the nearest point of every query point
+        queries = np.asarray(queries, dtype=np.float64).reshape(-1, 3)
+        indices = np.full(len(queries), -1, dtype=np.int64)
+        distances = np.full(len(queries), np.inf)
+        if len(self.points):
+            for start in range(0, len(queries), QUERY_BATCH):
+                batch = slice(start, start + QUERY_BATCH)
+                indices[batch], distances[batch] = self.nearest_batch(queries[batch])
+        return indices, distances
+
+    def nearest_batch(self, queries):
+        best = np.full(len(queries), -1, dtype=np.int64)
+        best_d2 = np.full(len(queries), np.inf)
+        cells, outside_d2 = self.start_cells(queries)
+        remaining = np.arange(len(queries))
+        ring = 0
+        while len(remaining) and ring <= MAX_SEARCH_RING:
+            self.update_nearest(queries, *self.ring_items(cells, remaining, ring), best, best_d2)
+            bound = (ring * self.cell_size) ** 2 + outside_d2[remaining]
+            remaining = remaining[best_d2[remaining] > bound]
+            ring += 1
+
+        # Far outside the grid: compare against every point, a few queries at a time
+        step = max(1, BRUTE_FORCE_PAIRS // len(self.points))
+        for start in range(0, len(remaining), step):
+            batch = remaining[start:start + step]
+            self.update_nearest(queries, np.repeat(batch, len(self.points)),
+                                np.tile(np.arange(len(self.points)), len(batch)), best, best_d2)
+        return best, np.sqrt(best_d2)
+
+    def update_nearest(self, queries, candidate_queries, candidates, best, best_d2):
+        # candidate_queries is grouped by query; keep each group's closest if it beats the best
+        if not len(candidates):
+            return
+        d2 = ((self.points[candidates] - queries[candidate_queries]) ** 2).sum(axis=1)
+        group_queries, hits, group_min = group_minimum(candidate_queries, d2)
+        closer = group_min < best_d2[group_queries]
+        best[group_queries[closer]] = candidates[hits[closer]]
+        best_d2[group_queries[closer]] = group_min[closer]
+
+
+MIRROR_TOLERANCE = 1e-3  # Of the bounding box diagonal: closer counts as symmetric, or as on the axis
+SIDE_TOKENS = {
+    "L": "R", "R": "L", "l": "r", "r": "l", "Lf": "Rt", "Rt": "Lf", "lf": "rt", "rt": "lf",
+    "left": "right", "right": "left", "Left": "Right", "Right": "Left", "LEFT": "RIGHT", "RIGHT": "LEFT",
+}
+SIDE_PREFIXES = {"left": "right", "right": "left", "Left": "Right", "Right": "Left"}
+
+
+class SymmetryMap(object):
+    # For every vertex of a mesh the vertex at its mirrored position across one axis, found
+    # once with a PointIndex. side is -1, 0 or 1 per vertex (0 on the mirror plane) and
+    # unmatched lists the vertices without a counterpart within the tolerance.
+
+    def __init__(self, positions, axis=0):
+        require_numpy()
+        positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+        tolerance = MIRROR_TOLERANCE * (np.linalg.norm(np.ptp(positions, axis=0)) if len(positions) else 0.0)
+        mirrored = positions.copy()
+        mirrored[:, axis] *= -1.0
+        self.axis = axis
+        self.mirror, distances = PointIndex(positions).nearest(mirrored)
+        self.side = np.sign(positions[:, axis]).astype(np.int8)
+        self.side[np.abs(positions[:, axis]) <= tolerance] = 0
+        self.unmatched = np.flatnonzero(distances > tolerance)
+
+    def destinations(self, vertices, direction):
+        # Vertices to overwrite when mirroring from the direction side (1 or -1): selected
+        # vertices on the other side plus the counterparts of selected source side vertices
+        vertices = np.asarray(vertices, dtype=np.int64)
+        side = self.side[vertices]
+        destinations = np.union1d(vertices[side == -direction], self.mirror[vertices[side == direction]])
+        return destinations[self.side[destinations] == -direction]
+
+
+def mirror_influence_name(name):
+    # The other side's name of an influence (L_arm -> R_arm, spine_left_01 -> spine_right_01,
+    # leftHand -> rightHand), or the name itself for a centre influence. Paths and namespaces
+    # are kept.
+    split = max(name.rfind("|"), name.rfind(":")) + 1
+    tokens = name[split:].split("_")
+    for i, token in enumerate(tokens):
+        if token in SIDE_TOKENS:
+            tokens[i] = SIDE_TOKENS[token]
+            return name[:split] + "_".join(tokens)
+    for prefix, other in SIDE_PREFIXES.items():
+        token = tokens[0]
+        if token.startswith(prefix) and len(token) > len(prefix) and not token[len(prefix)].islower():
+            tokens[0] = other + token[len(prefix):]
+            return name[:split] + "_".join(tokens)
+    return name
+
+
+def influence_mirror_map(influences):
+    # Column of every influence's mirror influence, its own column when there is none
+    require_numpy()
+    columns = {influence: i for i, influence in enumerate(influences)}
+    return np.array([columns.get(mirror_influence_name(influence), i) for i, influence in enumerate(influences)],
+                    dtype=np.int64)
+
+
+def missing_mirror_influences(influences):
+    # Sided influences whose other side's influence is not in the list; influence_mirror_map
+    # maps them onto themselves
+    return [influence for influence in influences
+            if mirror_influence_name(influence) != influence and mirror_influence_name(influence) not in influences]
+
+
+def mirror_weights(weights, rows, source_rows, column_map, locked=None):
+    # Replace the given rows with the weights of their source rows, moved to the mirror
+    # influences' columns: one gather of the source entries and one scatter into the rows.
+    # Locked influences keep their weights in the replaced rows and the mirrored unlocked
+    # weights are scaled to fill the rest; rows that would get no unlocked weight are left as
+    # they are.
+    require_numpy()
+    rows = np.asarray(rows, dtype=np.int64)
+    if locked is None:
+        locked = np.zeros(weights.shape[1], dtype=bool)
+    entries, counts = row_spans(weights.indptr, source_rows)
+    columns = column_map[weights.indices[entries]]
+    targets = np.repeat(rows, counts)
+    moving = ~locked[columns]
+    received = np.bincount(targets[moving], weights=weights.data[entries][moving], minlength=weights.shape[0])
+
+    replaced = np.zeros(weights.shape[0], dtype=bool)
+    replaced[rows[received[rows] > 0]] = True
+    moving &= replaced[targets]
+    keep = ~replaced[weights.rows] | locked[weights.indices]
+    influence_count = weights.shape[1]
+    keys = np.concatenate([weights.rows[keep].astype(np.int64) * influence_count + weights.indices[keep],
+                           targets[moving] * influence_count + columns[moving]])
+    values = np.concatenate([weights.data[keep], weights.data[entries][moving]])
+    result = SparseWeights.from_entries(keys, values, weights.shape)
+    return normalize_weights(result, locked, replaced) if locked.any() else result
+
+
+def closest_on_triangles(points, a, b, c):
+    # Barycentric coordinates (n, 3) of the closest point on each triangle a, b, c to each
+    # point, by the Voronoi regions of the triangle's corners, edges and face
+    require_numpy()
+    dot = lambda x, y: np.einsum("ij,ij->i", x, y)
+    ab, ac = b - a, c - a
+    ap, bp, cp = points - a, points - b, points - c
+    d1, d2 = dot(ab, ap), dot(ac, ap)
+    d3, d4 = dot(ab, bp), dot(ac, bp)
+    d5, d6 = dot(ab, cp), dot(ac, cp)
+    va, vb, vc = d3 * d6 - d5 * d4, d5 * d2 - d1 * d6, d1 * d4 - d3 * d2
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # Inside the face, then each region in turn overriding the ones before it
+        total = va + vb + vc
+        v, w = vb / total, vc / total
+        result = np.stack([1.0 - v - w, v, w], axis=1)
+        regions = [
+            ((va <= 0) & (d4 - d3 >= 0) & (d5 - d6 >= 0), lambda t: (0.0 * t, 1.0 - t, t),
+             (d4 - d3) / ((d4 - d3) + (d5 - d6))),
+            ((vb <= 0) & (d2 >= 0) & (d6 <= 0), lambda t: (1.0 - t, 0.0 * t, t), d2 / (d2 - d6)),
+            ((d6 >= 0) & (d5 <= d6), lambda t: (0.0 * t, 0.0 * t, 0.0 * t + 1.0), d6),
+            ((vc <= 0) & (d1 >= 0) & (d3 <= 0), lambda t: (1.0 - t, t, 0.0 * t), d1 / (d1 - d3)),
+            ((d3 >= 0) & (d4 <= d3), lambda t: (0.0 * t, 0.0 * t + 1.0, 0.0 * t), d3),
+            ((d1 <= 0) & (d2 <= 0), lambda t: (0.0 * t + 1.0, 0.0 * t, 0.0 * t), d1),
+        ]
+        for mask, coordinates, t in regions:
+            result[mask] = np.stack(coordinates(t[mask]), axis=1)
+    # Degenerate triangles: fall back to the first corner
+    result[~np.isfinite(result).all(axis=1)] = (1.0, 0.0, 0.0)
+    return result
+
+
+TRIANGLE_CELL_ENTRIES = 8  # Upper bound on grid cell entries per triangle when sizing the cells
+TRIANGLE_QUERY_BATCH = 4096
+
+
+class TriangleLocator(CellGrid):
+    # Closest point on a triangulated mesh for points in bulk. Every triangle is entered in each
+    # grid cell its bounding box overlaps. The nearest vertex (from a PointIndex) bounds the
+    # distance to the closest triangle, and triangles are then taken ring by ring of cells, those
+    # whose bounding box is further away than the best so far skipped, until no cell left can
+    # hold anything closer. Triangles of any size are found, not only those around the vertex.
+
+    def __init__(self, positions, triangles):
+        require_numpy()
+        self.positions = np.asarray(positions, dtype=np.float64).reshape(-1, 3)
+        self.triangles = np.asarray(triangles, dtype=np.int64).reshape(-1, 3)
+        if not len(self.triangles):
+            self.index = PointIndex(self.positions)
+            return
+        self.index_vertices = np.unique(self.triangles)
+        self.index = PointIndex(self.positions[self.index_vertices])
+
+        corners = self.positions[self.triangles]
+        self.box_lower = corners.min(axis=1)
+        self.box_upper = corners.max(axis=1)
+        self.lower = self.box_lower.min(axis=0)
+        self.upper = self.box_upper.max(axis=0)
+        extent = self.upper - self.lower
+
+        # Cells about the size of a typical triangle, grown while large triangles would be
+        # entered in too many of them
+        self.cell_size = float(np.median((self.box_upper - self.box_lower).max(axis=1)))
+        self.cell_size = max(self.cell_size, extent.max() / 65536.0) or 1.0
+        while True:
+            lower_cells = self.cell_coords(self.box_lower)
+            box_cells = self.cell_coords(self.box_upper) - lower_cells + 1
+            entry_counts = box_cells.prod(axis=1)
+            if entry_counts.sum() <= TRIANGLE_CELL_ENTRIES * len(self.triangles):
+                break
+            self.cell_size *= 2.0
+        self.dims = (extent // self.cell_size).astype(np.int64) + 1
+
+        # One entry per triangle and overlapped cell
+        items = np.repeat(np.arange(len(self.triangles)), entry_counts)
+        local = spans(np.zeros(len(entry_counts), dtype=np.int64), entry_counts)
+        sizes = box_cells[items]
+        offsets = np.stack([local // (sizes[:, 1] * sizes[:, 2]), local // sizes[:, 2] % sizes[:, 1],
+                            local % sizes[:, 2]], axis=1)
+        self.fill(self.cell_keys(lower_cells[items] + offsets), items)
+
+    def closest(self, points):
+        # Corner vertices (n, 3) and barycentric weights (n, 3) of the closest surface point of
+        # every point. Without triangles, every point gets its nearest vertex alone.
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        nearest, distances = self.index.nearest(points)
+        if not len(self.triangles):
+            return np.repeat(nearest[:, None], 3, axis=1), np.tile([1.0, 0.0, 0.0], (len(points), 1))
+
+        # Start from the nearest vertex; the triangles around it are at most that far away, so a
+        # little slack makes sure one of them replaces it
+        corners = np.repeat(self.index_vertices[nearest][:, None], 3, axis=1)
+        weights = np.tile([1.0, 0.0, 0.0], (len(points), 1))
+        best_d2 = distances ** 2 * (1.0 + 1e-9) + 1e-18
+        for start in range(0, len(points), TRIANGLE_QUERY_BATCH):
+            batch = slice(start, start + TRIANGLE_QUERY_BATCH)
+            self.closest_batch(points[batch], best_d2[batch], corners[batch], weights[batch])
+        return corners, weights
+
+    def closest_batch(self, points, best_d2, corners, weights):
+        cells, outside_d2 = self.start_cells(points)
+        remaining = np.arange(len(points))
+        ring = 0
+        while len(remaining) and ring <= MAX_SEARCH_RING:
+            self.update_closest(points, *self.ring_items(cells, remaining, ring), best_d2, corners, weights)
+            bound = (ring * self.cell_size) ** 2 + outside_d2[remaining]
+            remaining = remaining[best_d2[remaining] > bound]
+            ring += 1
+
+        # Far outside the grid: test every triangle, a few queries at a time
+        count = len(self.triangles)
+        step = max(1, BRUTE_FORCE_PAIRS // count)
+        for start in range(0, len(remaining), step):
+            batch = remaining[start:start + step]
+            self.update_closest(points, np.repeat(batch, count), np.tile(np.arange(count), len(batch)),
+                                best_d2, corners, weights)
+
+    def update_closest(self, points, candidate_queries, candidates, best_d2, corners, weights):
+        # candidate_queries is grouped by query; keep each group's closest if it is no further
+        # than the best. Triangles whose bounding box is further away are left out first.
+        queried = points[candidate_queries]
+        box_d2 = ((np.maximum(self.box_lower[candidates] - queried, 0.0) ** 2).sum(axis=1)
+                  + (np.maximum(queried - self.box_upper[candidates], 0.0) ** 2).sum(axis=1))
+        near = box_d2 <= best_d2[candidate_queries]
+        if not near.any():
+            return
+        candidate_queries, candidates, queried = candidate_queries[near], candidates[near], queried[near]
+
+        triangles = self.triangles[candidates]
+        a, b, c = (self.positions[triangles[:, i]] for i in range(3))
+        coordinates = closest_on_triangles(queried, a, b, c)
+        closest = coordinates[:, :1] * a + coordinates[:, 1:2] * b + coordinates[:, 2:] * c
+        d2 = ((closest - queried) ** 2).sum(axis=1)
+        group_queries, hits, group_min = group_minimum(candidate_queries, d2)
+        closer = group_min <= best_d2[group_queries]
+        group_queries, hits = group_queries[closer], hits[closer]
+        best_d2[group_queries] = group_min[closer]
+        corners[group_queries] = triangles[hits]
+        weights[group_queries] = coordinates[hits]
+
+
+def transfer_weights(source, corners, coordinates, column_map, target, locked):
+    # Target weights blended from the source rows of each target row's corners by their
+    # barycentric coordinates, with source columns moved to target columns by column_map.
+    # Locked target columns keep their weights and the rest is renormalized.
+    require_numpy()
+    influence_count = target.shape[1]
+    entries, counts = row_spans(source.indptr, corners.ravel())
+    columns = column_map[source.indices[entries]]
+    values = source.data[entries] * np.repeat(coordinates.ravel(), counts)
+    moving = ~locked[columns] & (values != 0)
+    keys = np.repeat(np.repeat(np.arange(target.shape[0]), 3), counts)[moving] * influence_count + columns[moving]
+    fixed = locked[target.indices]
+    keys = np.concatenate([keys, target.rows[fixed].astype(np.int64) * influence_count + target.indices[fixed]])
+    values = np.concatenate([values[moving], target.data[fixed]])
+    return normalize_weights(SparseWeights.from_entries(keys, values, target.shape), locked)
+
+
+# Skin weight container (.skw): a fixed header, the weights of each mesh as sparse blocks of
+# consecutive vertices, and a JSON directory at the end naming each mesh, its influences,
+# topology hash and blocks. A block is a CSR row range: little-endian int64 row pointers,
+# int32 influence columns and float32 weights, each array aligned so it can be memory mapped
+# in place. Skinned vertices have a handful of non-zero weights, so this is a fraction of a
+# dense vertices x influences block.
+WEIGHT_FILE_MAGIC = b"SKWEIGHT"
+WEIGHT_FILE_VERSION = 2
+WEIGHT_FILE_HEADER = struct.Struct("<8sIIQQ")  # magic, version, reserved, directory offset, size
+WEIGHT_FILE_ALIGNMENT = 64
+WEIGHT_FILE_DTYPE = "<f4"
+WEIGHT_FILE_INDPTR_DTYPE = "<i8"
+WEIGHT_FILE_INDEX_DTYPE = "<i4"
+CHUNK_BYTES = 8 * 1024 * 1024  # Weights moved per chunk when streaming to or from a file
+
+
+def chunk_rows(influence_count):
+    # Vertices per chunk, so a chunk stays around CHUNK_BYTES whatever the influence count
+    return max(1, CHUNK_BYTES // (4 * max(1, influence_count)))
+
+
+class WeightFileWriter(object):
+    # Streams meshes into a container chunk by chunk, so a mesh never has to be held whole
+
+    def __init__(self, path):
+        require_numpy()
+        self.path = path
+        self.meshes = []
+        self.file = open(path, "wb")
+        self.file.write(WEIGHT_FILE_HEADER.pack(WEIGHT_FILE_MAGIC, WEIGHT_FILE_VERSION, 0, 0, 0))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write_array(self, values, dtype):
+        self.file.write(b"\0" * (-self.file.tell() % WEIGHT_FILE_ALIGNMENT))
+        offset = self.file.tell()
+        np.ascontiguousarray(values, dtype=dtype).tofile(self.file)
+        return offset
+
+    def add_mesh(self, mesh, skin_cluster, influences, vertex_count, topology, chunks):
+        # chunks yields the weights of the vertices in order, as dense (rows, len(influences))
+        # blocks or SparseWeights; each is written as one sparse block
+        blocks = []
+        rows = 0
+        for chunk in chunks:
+            if not isinstance(chunk, SparseWeights):
+                chunk = SparseWeights.from_dense(np.asarray(chunk).reshape(-1, len(influences)), np.float32)
+            blocks.append({
+                "start": rows,
+                "rows": chunk.shape[0],
+                "nnz": chunk.nnz,
+                "indptr": self.write_array(chunk.indptr - chunk.indptr[0], WEIGHT_FILE_INDPTR_DTYPE),
+                "indices": self.write_array(chunk.indices, WEIGHT_FILE_INDEX_DTYPE),
+                "data": self.write_array(chunk.data, WEIGHT_FILE_DTYPE),
+            })
+            rows += chunk.shape[0]
+        if rows != vertex_count:
+            raise ValueError(f"{mesh}: {rows} weight rows written for {vertex_count} vertices.")
+        self.meshes.append({
+            "mesh": mesh,
+            "skin_cluster": skin_cluster,
+            "influences": list(influences),
+            "vertex_count": vertex_count,
+            "topology_hash": topology,
+            "blocks": blocks,
+        })
+
+    def close(self):
+        if self.file.closed:
+            return
+        directory = json.dumps({"meshes": self.meshes}).encode("utf-8")
+        directory_offset = self.file.tell()
+        self.file.write(directory)
+        self.file.seek(0)
+        self.file.write(WEIGHT_FILE_HEADER.pack(
+            WEIGHT_FILE_MAGIC, WEIGHT_FILE_VERSION, 0, directory_offset, len(directory)))
+        self.file.close()
+
+
+class WeightFile(object):
+    # Reads a container: the directory is parsed up front, blocks are memory mapped on demand
+
+    def __init__(self, path):
+        require_numpy()
+        self.path = path
+        with open(path, "rb") as f:
+            header = f.read(WEIGHT_FILE_HEADER.size)
+            if len(header) < WEIGHT_FILE_HEADER.size:
+                raise ValueError(f"{path} is not a skin weight file.")
+            magic, version, _, directory_offset, directory_size = WEIGHT_FILE_HEADER.unpack(header)
+            if magic != WEIGHT_FILE_MAGIC:
+                raise ValueError(f"{path} is not a skin weight file.")
+            if version > WEIGHT_FILE_VERSION:
+                raise ValueError(f"{path} was written by a newer version (format {version}).")
+            if version < WEIGHT_FILE_VERSION:
+                raise ValueError(f"{path} holds dense weights (format {version}); export it again.")
+            f.seek(directory_offset)
+            self.meshes = json.loads(f.read(directory_size).decode("utf-8"))["meshes"]
+
+    def mesh(self, name):
+        for entry in self.meshes:
+            if entry["mesh"] == name:
+                return entry
+        return None
+
+    def array(self, offset, dtype, count):
+        # Read-only memory map of one stored array; pages are only read when touched
+        if not count:
+            return np.zeros(0, dtype=dtype)
+        return np.memmap(self.path, dtype=dtype, mode="r", offset=offset, shape=(count,))
+
+    def block(self, entry, block):
+        # One block of a mesh as SparseWeights over the block's rows
+        return SparseWeights(self.array(block["indptr"], WEIGHT_FILE_INDPTR_DTYPE, block["rows"] + 1),
+                             self.array(block["indices"], WEIGHT_FILE_INDEX_DTYPE, block["nnz"]),
+                             self.array(block["data"], WEIGHT_FILE_DTYPE, block["nnz"]),
+                             (block["rows"], len(entry["influences"])))
+
+    def chunks(self, entry):
+        # (first vertex, SparseWeights) pairs covering the mesh in order
+        for block in entry["blocks"]:
+            yield block["start"], self.block(entry, block)